@@ -160,12 +160,11 @@ function LeadProjects() {
     const { email, projectname, id, message } = confirm;
     setRequestLoading(true);
     try {
-      await axiosInstance.post("api/projectmembers/", {
-        owner: user.email,
-        email,
-        projectname,
-        message,
-      });
+      await axiosInstance.post(
+        "api/projectmembers/",
+        { owner: user.email, email, projectname, message },
+        { headers: { "Idempotency-Key": `accept-${id}` } }
+      );
 
       await axiosInstance.delete(`api/projectrequests/${id}/`);
       await fetchRequests(projectname);
@@ -191,12 +190,11 @@ function LeadProjects() {
     const { email, projectname, id, message } = confirm;
     setRequestLoading(true);
     try {
-      await axiosInstance.post("api/projectreject/", {
-        owner: user.email,
-        email,
-        projectname,
-        message,
-      });
+      await axiosInstance.post(
+        "api/projectreject/",
+        { owner: user.email, email, projectname, message },
+        { headers: { "Idempotency-Key": `reject-${id}` } }
+      );
 
       await axiosInstance.delete(`api/projectrequests/${id}/`);
       await fetchRequests(projectname);
@@ -115,7 +115,9 @@ function JoinTeam() {
     };
 
     try {
-      await axiosInstance.post("api/projectrequests/", new_request);
+      await axiosInstance.post("api/projectrequests/", new_request, {
+        headers: { "Idempotency-Key": crypto.randomUUID() },
+      });
       setSuccess("Request sent successfully!");
       triggerRefresh();
       setRefresh((prev) => !prev);
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:15
+
+from django.db import migrations, models
+from django.db.models import F
+
+# Bits of the legacy booleans in the skill registry (accounts/skills.py)
+FRONTEND = 1 << 0
+BACKEND = 1 << 1
+
+
+def map_flags(apps, schema_editor):
+    """Fold the frontend/backend booleans into the skills mask."""
+    Users = apps.get_model("accounts", "Users")
+    Users.objects.filter(frontend=True).update(skills=F("skills").bitor(FRONTEND))
+    Users.objects.filter(backend=True).update(skills=F("skills").bitor(BACKEND))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='users',
+            name='skills',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(map_flags, migrations.RunPython.noop),
+    ]
@@ -13,6 +13,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.utils import timezone
 from .manager import UserManager
+from .skills import sync_skill_flags
 
 
 class Users(AbstractBaseUser, PermissionsMixin):
@@ -21,7 +22,7 @@ class Users(AbstractBaseUser, PermissionsMixin):
 
     This model uses email instead of username for user authentication.
     It also stores additional profile fields such as first name,
-    last name, and skill preferences (frontend/backend).
+    last name, and skills (a bitmask over the registry in `skills.py`).
 
     Inherits:
         AbstractBaseUser:
@@ -41,6 +42,9 @@ class Users(AbstractBaseUser, PermissionsMixin):
             Indicates whether the user prefers frontend development.
         backend (BooleanField):
             Indicates whether the user prefers backend development.
+        skills (BigIntegerField):
+            Bitmask of the user's skills; `frontend`/`backend` mirror
+            its first two bits.
         is_active (BooleanField):
             Determines whether the account is active.
         is_staff (BooleanField):
@@ -60,6 +64,8 @@ class Users(AbstractBaseUser, PermissionsMixin):
             with proper validation.
 
     Methods:
+        save():
+            Keeps the skills mask and the legacy booleans in sync.
         __str__():
             Returns the user's email as a string representation.
     """
@@ -69,6 +75,7 @@ class Users(AbstractBaseUser, PermissionsMixin):
     lastname = models.CharField(max_length=50)
     frontend = models.BooleanField(default=False)
     backend = models.BooleanField(default=False)
+    skills = models.BigIntegerField(default=0)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
@@ -78,6 +85,10 @@ class Users(AbstractBaseUser, PermissionsMixin):
 
     objects = UserManager()
 
+    def save(self, *args, **kwargs):
+        sync_skill_flags(self)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         """Return the user's email for readable string representation."""
         return self.email
\ No newline at end of file
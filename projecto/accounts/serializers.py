@@ -10,6 +10,7 @@ Author: Pranav Singh
 
 from rest_framework import serializers
 from .models import Users
+from .skills import SkillsField
 from django.contrib.auth import get_user_model, authenticate
 
 User = get_user_model()
@@ -34,7 +35,8 @@ class UsersCreateSerializer(serializers.ModelSerializer):
             Custom user model used for authentication.
         fields (tuple):
             Fields expected from the frontend, including:
-                firstname, lastname, email, password, frontend, backend
+                firstname, lastname, email, password, frontend, backend,
+                skills (list of registry names, optional)
 
     Methods:
         create(validated_data):
@@ -49,9 +51,11 @@ class UsersCreateSerializer(serializers.ModelSerializer):
                     Newly created user object.
     """
 
+    skills = SkillsField(required=False)
+
     class Meta:
         model = Users
-        fields = ("firstname", "lastname", "email", "password", "frontend", "backend")
+        fields = ("firstname", "lastname", "email", "password", "frontend", "backend", "skills")
 
     def create(self, validated_data):
         """
@@ -72,6 +76,7 @@ class UsersCreateSerializer(serializers.ModelSerializer):
             password=validated_data["password"],
             frontend=validated_data["frontend"],
             backend=validated_data["backend"],
+            skills=validated_data.get("skills", 0),
         )
         return user
 
@@ -87,9 +92,11 @@ class UsersSerializer(serializers.ModelSerializer):
         model (Users):
             Custom user model.
         fields (list[str]):
-            firstname, lastname, email, frontend, backend
+            firstname, lastname, email, frontend, backend, skills
     """
 
+    skills = SkillsField(read_only=True)
+
     class Meta:
         model = Users
-        fields = ["firstname", "lastname", "email", "frontend", "backend"]
\ No newline at end of file
+        fields = ["firstname", "lastname", "email", "frontend", "backend", "skills"]
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+skills.py
+
+This module defines the skill registry shared by users and projects. Each
+skill owns one bit of a 64-bit integer mask, stored in the `skills` column
+of `Users` (skills a user has) and `ProjectLead` (skills a project needs),
+so matching a user to a project is a single bitwise AND:
+
+    project.skills & user.skills != 0
+
+The registry is append-only: a skill's position is its bit, so existing
+entries must never be reordered or removed. `frontend` and `backend` keep
+bits 0 and 1 and stay mirrored in the legacy boolean columns.
+"""
+
+from rest_framework import serializers
+
+SKILLS = (
+    "frontend",
+    "backend",
+    "python",
+    "javascript",
+    "typescript",
+    "java",
+    "c",
+    "cpp",
+    "csharp",
+    "go",
+    "rust",
+    "ruby",
+    "php",
+    "kotlin",
+    "swift",
+    "sql",
+    "react",
+    "vue",
+    "angular",
+    "django",
+    "flask",
+    "nodejs",
+    "spring",
+    "android",
+    "ios",
+    "devops",
+    "docker",
+    "kubernetes",
+    "aws",
+    "gcp",
+    "azure",
+    "machine_learning",
+    "data_science",
+    "data_engineering",
+    "ui_ux",
+    "testing",
+    "security",
+    "embedded",
+    "game_dev",
+    "blockchain",
+    "technical_writing",
+)
+
+# The mask is stored in a signed 64-bit column
+assert len(SKILLS) <= 63, "skill registry exceeds the 63 usable bits"
+
+BITS = {name: 1 << position for position, name in enumerate(SKILLS)}
+
+FRONTEND = BITS["frontend"]
+BACKEND = BITS["backend"]
+
+
+def mask_for(names):
+    """
+    Combine skill names into a mask.
+
+    Raises:
+        KeyError: If a name is not in the registry.
+    """
+    mask = 0
+    for name in names:
+        mask |= BITS[name]
+    return mask
+
+
+def names_for(mask):
+    """Return the skill names set in a mask, in registry order."""
+    return [name for name, bit in BITS.items() if mask & bit]
+
+
+def flags_mask(frontend, backend):
+    """Mask equivalent of the legacy frontend/backend booleans."""
+    return (FRONTEND if frontend else 0) | (BACKEND if backend else 0)
+
+
+def sync_skill_flags(instance):
+    """
+    Keep a model's `skills` mask and legacy `frontend`/`backend` booleans
+    consistent before it is saved.
+
+    On creation the booleans are folded into the mask, so callers that only
+    set the booleans keep working. Afterwards the mask is authoritative and
+    the booleans are derived from it; updates that change only the booleans
+    go through `SkillFlagsMixin`, which applies them to the mask.
+    """
+    if instance._state.adding:
+        instance.skills |= flags_mask(instance.frontend, instance.backend)
+
+    instance.frontend = bool(instance.skills & FRONTEND)
+    instance.backend = bool(instance.skills & BACKEND)
+
+
+class SkillsField(serializers.Field):
+    """
+    Serializes a skills mask as a list of skill names.
+
+    Rejects names that are not in the registry.
+    """
+
+    default_error_messages = {
+        "not_a_list": "Expected a list of skill names.",
+        "unknown": "Unknown skills: {names}.",
+    }
+
+    def to_representation(self, value):
+        return names_for(value)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, (list, tuple)):
+            self.fail("not_a_list")
+
+        unknown = [name for name in data if name not in BITS]
+        if unknown:
+            self.fail("unknown", names=", ".join(map(str, unknown)))
+
+        return mask_for(data)
+
+
+class SkillFlagsMixin:
+    """
+    Serializer mixin applying the legacy `frontend`/`backend` booleans of an
+    update to the `skills` mask, since the model derives the booleans from
+    the mask on save. An update sending both the mask and booleans that
+    disagree with it is rejected.
+    """
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        flags = {name: attrs[name] for name in ("frontend", "backend") if name in attrs}
+        if self.instance is None or not flags:
+            return attrs
+
+        if "skills" in attrs:
+            errors = {
+                name: "Disagrees with skills." for name, value in flags.items()
+                if value != bool(attrs["skills"] & BITS[name])
+            }
+            if errors:
+                raise serializers.ValidationError(errors)
+            return attrs
+
+        mask = self.instance.skills
+        for name, value in flags.items():
+            mask = mask | BITS[name] if value else mask & ~BITS[name]
+        attrs["skills"] = mask
+        return attrs
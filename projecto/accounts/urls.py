@@ -11,5 +11,6 @@ urlpatterns specific for the signin application, which includes the path for all
 urlpatterns = [
     path('home/',views.HomeView.as_view(),name='home'),
     path('me/',views.RetrieveUserView.as_view()),
+    path('skills/',views.SkillsView.as_view()),
     path('logout/',views.LogOutView.as_view(),name='logout')
 ]
\ No newline at end of file
@@ -13,11 +13,13 @@ from django.http import HttpResponse, JsonResponse
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from projects.deletion import request_account_deletion
 from .serializers import UsersCreateSerializer, UsersSerializer
 from .models import Users
+from .skills import SKILLS, names_for
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -54,6 +56,7 @@ class HomeView(APIView):
             "email": user.email,
             "frontend": user.frontend,
             "backend": user.backend,
+            "skills": names_for(user.skills),
         })
 
 
@@ -140,7 +143,8 @@ class RetrieveUserView(APIView):
     Returns complete profile of the authenticated user.
 
     Endpoints:
-        - GET /api/user/ - retrieve full serialized user profile.
+        - GET /api/accounts/me/ - retrieve full serialized user profile.
+        - DELETE /api/accounts/me/ - delete the account.
 
     This endpoint provides all user information using `UsersSerializer`
     and requires authentication.
@@ -160,4 +164,40 @@ class RetrieveUserView(APIView):
         """
         user = request.user
         serializer = UsersSerializer(user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        """
+        Delete the authenticated user's account.
+
+        The account is deactivated and its tokens revoked at once; its data
+        is deleted afterwards by the `process_account_deletions` command.
+
+        Returns:
+            Response: 202 Accepted with the time of the request.
+        """
+        deletion = request_account_deletion(request.user)
+        return Response(
+            {"status": "scheduled", "requested_at": deletion.requested_at}, status=status.HTTP_202_ACCEPTED
+        )
+
+class SkillsView(APIView):
+    """
+    Lists the skill registry.
+
+    Endpoints:
+        - GET /api/accounts/skills/ - skill names in registry (bit) order.
+
+    Used by the registration and project forms; no authentication required.
+    """
+
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """
+        Return the names of all registered skills.
+
+        Returns:
+            Response: {"skills": [...]}.
+        """
+        return Response({"skills": list(SKILLS)}, status=status.HTTP_200_OK)
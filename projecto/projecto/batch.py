@@ -0,0 +1,217 @@
+"""
+batch.py
+
+This module defines the batch endpoint, which runs an ordered list of API
+sub-requests inside a single HTTP request. Each sub-request is dispatched
+through the regular URL resolver and viewsets, so validation, permissions
+and serialization behave exactly as if it had been sent on its own.
+
+The outer request is authenticated once; sub-requests reuse the resulting
+user and token instead of decoding the JWT again, and share a lookup scope
+so users and projects referenced by several sub-requests are resolved once
+(projects only until the next sub-request that may write).
+Headers that describe one particular request (`Idempotency-Key` and the
+conditional headers) are not passed on from the outer request; a
+sub-request sets its own in `headers`.
+"""
+
+import io
+import json
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework import serializers, status
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from projects.lookups import forget_projects, lookup_scope
+
+SUBREQUEST_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+
+# Outer request headers that must not apply to every sub-request
+PER_REQUEST_HEADERS = (
+    "HTTP_IDEMPOTENCY_KEY",
+    "HTTP_IF_MATCH",
+    "HTTP_IF_NONE_MATCH",
+    "HTTP_IF_MODIFIED_SINCE",
+    "HTTP_IF_UNMODIFIED_SINCE",
+)
+
+
+class SubRequestSerializer(serializers.Serializer):
+    """
+    Validates a single sub-request of a batch.
+
+    Fields:
+        method (str): HTTP method.
+        path (str): API path, optionally with a query string.
+        body (Any, optional): JSON-compatible request body.
+        headers (dict, optional): Extra headers such as If-None-Match or
+                                  Idempotency-Key.
+    """
+
+    method = serializers.ChoiceField(choices=SUBREQUEST_METHODS)
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False, default=None)
+    headers = serializers.DictField(child=serializers.CharField(), required=False, default=dict)
+
+
+class BatchSerializer(serializers.Serializer):
+    """
+    Validates a batch submission.
+
+    Fields:
+        requests (list): Ordered sub-requests.
+        atomic (bool): Run all sub-requests in one transaction, stopping and
+                       rolling back at the first failure.
+    """
+
+    requests = SubRequestSerializer(many=True, allow_empty=False)
+    atomic = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        limit = getattr(settings, "BATCH_MAX_REQUESTS", 25)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"A batch may contain at most {limit} requests.")
+        return value
+
+
+class BatchView(APIView):
+    """
+    Executes several API calls in one round trip.
+
+    Endpoint:
+        POST /api/batch/
+
+    Request body:
+        {
+            "atomic": false,
+            "requests": [
+                {"method": "GET", "path": "/api/projectcount/?email=a@b.com"},
+                {"method": "POST", "path": "/api/projectrequests/", "body": {...}}
+            ]
+        }
+
+    Response body:
+        {
+            "committed": true,
+            "responses": [{"status": 200, "headers": {...}, "body": {...}}, ...]
+        }
+
+    In atomic mode execution stops at the first sub-response with a 4xx/5xx
+    status, the whole batch is rolled back and `committed` is false.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """
+        Run the sub-requests in order and return their responses.
+
+        Parameters:
+            request (Request): Authenticated POST request with the batch.
+
+        Returns:
+            Response:
+                - 200 OK with the ordered sub-responses.
+                - 400 Bad Request if the batch itself is malformed.
+        """
+        serializer = BatchSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        subrequests = serializer.validated_data["requests"]
+        atomic = serializer.validated_data["atomic"]
+        responses = []
+        committed = True
+
+        with lookup_scope(request.user):
+            if atomic:
+                with transaction.atomic():
+                    for subrequest in subrequests:
+                        responses.append(self.dispatch_subrequest(request, subrequest))
+                        if responses[-1]["status"] >= 400:
+                            transaction.set_rollback(True)
+                            committed = False
+                            break
+            else:
+                for subrequest in subrequests:
+                    responses.append(self.dispatch_subrequest(request, subrequest))
+
+        return Response({"committed": committed, "responses": responses})
+
+    def dispatch_subrequest(self, request, subrequest):
+        """
+        Run one sub-request through the URL resolver and its view.
+
+        Parameters:
+            request (Request): The outer, already authenticated request.
+            subrequest (dict): Validated sub-request.
+
+        Returns:
+            dict: Status, selected headers and body of the sub-response.
+        """
+        url = urlsplit(subrequest["path"])
+
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            return {"status": status.HTTP_404_NOT_FOUND, "headers": {}, "body": {"error": "Not found"}}
+
+        if getattr(match.func, "view_class", None) is BatchView:
+            return {
+                "status": status.HTTP_400_BAD_REQUEST,
+                "headers": {},
+                "body": {"error": "Batches cannot be nested"},
+            }
+
+        body = b""
+        if subrequest["body"] is not None:
+            body = json.dumps(subrequest["body"]).encode()
+
+        environ = {
+            key: value for key, value in request._request.META.items()
+            if not key.startswith("wsgi.")
+            and key not in ("CONTENT_LENGTH", "CONTENT_TYPE")
+            and key not in PER_REQUEST_HEADERS
+        }
+        environ.update({
+            "REQUEST_METHOD": subrequest["method"],
+            "PATH_INFO": url.path,
+            "QUERY_STRING": url.query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(body)),
+            "HTTP_ACCEPT": "application/json",
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.url_scheme": request.scheme,
+        })
+        for name, value in subrequest["headers"].items():
+            environ["HTTP_" + name.upper().replace("-", "_")] = value
+
+        sub = WSGIRequest(environ)
+        # Reuse the outer request's authentication instead of decoding the JWT again
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+
+        response = match.func(sub, *match.args, **match.kwargs)
+        if subrequest["method"] not in SAFE_METHODS:
+            forget_projects()
+
+        if hasattr(response, "data"):
+            payload = response.data
+        elif response.content:
+            try:
+                payload = json.loads(response.content)
+            except ValueError:
+                payload = response.content.decode(errors="replace")
+        else:
+            payload = None
+
+        headers = {name: response[name] for name in ("ETag", "Location") if response.has_header(name)}
+
+        return {"status": response.status_code, "headers": headers, "body": payload}
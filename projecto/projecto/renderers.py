@@ -0,0 +1,96 @@
+"""
+renderers.py
+
+This module defines the MessagePack renderer and parser used for content
+negotiation across all API views. Clients that send
+`Accept: application/msgpack` receive a binary MessagePack body, and clients
+that send `Content-Type: application/msgpack` can post MessagePack payloads.
+JSON remains the default for every endpoint.
+
+Values that MessagePack cannot represent natively (datetimes, decimals,
+UUIDs, lazy strings) are converted with DRF's own JSON encoder so both
+formats carry exactly the same data.
+"""
+
+import msgpack
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+_json_encoder = JSONEncoder()
+
+
+def _default(obj):
+    """
+    Convert values unknown to MessagePack the same way the JSON renderer does.
+
+    Parameters:
+        obj (Any): Value that MessagePack could not serialize.
+
+    Returns:
+        Any: A MessagePack-compatible representation of the value.
+    """
+    return _json_encoder.default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders response data as MessagePack.
+
+    Selected when the request's Accept header contains
+    `application/msgpack` (or `?format=msgpack` is used).
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Serialize data into MessagePack bytes.
+
+        Parameters:
+            data (Any): Response data produced by the view.
+            accepted_media_type (str): Negotiated media type.
+            renderer_context (dict): View, request and response context.
+
+        Returns:
+            bytes: Encoded payload, or an empty body when data is None.
+        """
+        if data is None:
+            return b""
+
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses MessagePack request bodies into Python data.
+
+    Selected when the request's Content-Type is `application/msgpack`.
+    """
+
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Decode a MessagePack request body.
+
+        Parameters:
+            stream (IO): Request body stream.
+            media_type (str): Content type of the request.
+            parser_context (dict): View and request context.
+
+        Returns:
+            Any: Decoded request data.
+
+        Raises:
+            ParseError: If the body is not valid MessagePack.
+        """
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as e:
+            raise ParseError(f"MessagePack parse error - {e}")
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import dj_database_url
+from corsheaders.defaults import default_headers as default_cors_headers
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -63,10 +64,25 @@ CORS_ALLOWED_ORIGINS = [
     os.environ.get("CORS_ALLOWED_ORIGIN",default="http://localhost:5173"),
 ]
 
+# Let the dashboard revalidate list responses with If-None-Match
+CORS_EXPOSE_HEADERS = ["ETag"]
+CORS_ALLOW_HEADERS = (*default_cors_headers, "if-none-match", "idempotency-key")
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'projecto.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'projecto.renderers.MessagePackParser',
+    ],
 }
 
 SIMPLE_JWT= {
@@ -113,6 +129,145 @@ DATABASES = {
 }
 
 
+# Data version counters behind the list ETags. Set the alias to a cache shared
+# by every server process (Redis, Memcached...) to validate ETags without a
+# database read; leave it as None to read the counters from the database.
+DATA_VERSION_CACHE_ALIAS = os.getenv("DATA_VERSION_CACHE_ALIAS") or None
+DATA_VERSION_CACHE_TIMEOUT = 300
+
+# Response cache for the read viewsets: a process-local LRU (L1) in front of
+# the cache alias below (L2). Point "default" at a shared backend in production.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+RESPONSE_CACHE_ALIAS = "default"
+RESPONSE_CACHE_TIMEOUT = 300
+RESPONSE_CACHE_L1_SIZE = 1024
+
+# Delta sync cursors are rewound by this much to catch late commits
+SYNC_CURSOR_OVERLAP_SECONDS = 5
+
+# Maximum number of sub-requests accepted by /api/batch/
+BATCH_MAX_REQUESTS = 25
+
+# How long responses stored under an Idempotency-Key are replayed, and after
+# how long a key reserved by a request that never finished is released
+IDEMPOTENCY_KEY_TTL_HOURS = 24
+IDEMPOTENCY_KEY_LOCK_SECONDS = 60
+
+# Maximum number of projects in one bulk join request submission
+BULK_REQUEST_MAX_ITEMS = 50
+
+# Group-commit buffer for join requests: queue inserts in-process and commit
+# them in micro-batches of up to MAX_ROWS rows or MAX_DELAY_MS milliseconds
+PROJECT_REQUEST_BUFFER_ENABLED = os.getenv("PROJECT_REQUEST_BUFFER_ENABLED", "False") == "True"
+PROJECT_REQUEST_BUFFER_MAX_ROWS = 200
+PROJECT_REQUEST_BUFFER_MAX_DELAY_MS = 5
+PROJECT_REQUEST_BUFFER_TIMEOUT = 10
+
+# In-memory skill index behind candidate search: rebuilt in the background
+# after MAX_AGE seconds (picks up users saved by other processes); ranked
+# candidate lists are kept for up to CACHE_SIZE distinct skill sets
+CANDIDATE_INDEX_MAX_AGE = 300
+CANDIDATE_INDEX_CACHE_SIZE = 256
+
+# Page size limit of candidate search and size limit of one bulk invitation
+CANDIDATE_PAGE_MAX_SIZE = 100
+BULK_INVITE_MAX_ITEMS = 100
+
+# In-memory collaboration graph: reloaded in the background after MAX_AGE
+# seconds; membership changes are folded into its CSR arrays, also in the
+# background, once COMPACT_THRESHOLD edge changes have accumulated;
+# PAGE_MAX_SIZE limits each list returned by /api/collaborators/
+COLLAB_GRAPH_MAX_AGE = 300
+COLLAB_GRAPH_COMPACT_THRESHOLD = 10000
+COLLAB_GRAPH_PAGE_MAX_SIZE = 100
+
+# In-memory TF-IDF index of similar projects: reloaded in the background
+# after MAX_AGE seconds; rebuilt with fresh IDF weights once COMPACT_THRESHOLD
+# projects have been created, edited or deleted; PAGE_MAX_SIZE limits the
+# suggestions returned by /api/projects/<id>/similar/
+SIMILAR_PROJECTS_MAX_AGE = 300
+SIMILAR_PROJECTS_COMPACT_THRESHOLD = 1000
+SIMILAR_PROJECTS_PAGE_MAX_SIZE = 100
+
+# Trending projects: join requests and accepts are counted per process in
+# BUCKET_SECONDS buckets and added to the rollup table every
+# CHECKPOINT_SECONDS; the best TOP_SIZE projects of each window are ranked
+# and at most PAGE_MAX_SIZE are returned by /api/projects/trending/
+TRENDING_BUCKET_SECONDS = 300
+TRENDING_CHECKPOINT_SECONDS = 60
+TRENDING_TOP_SIZE = 500
+TRENDING_PAGE_MAX_SIZE = 100
+
+# Longest period, in days, the analytics endpoints report on
+ANALYTICS_MAX_DAYS = 366
+
+# Join requests still pending after this many days are expired by the
+# expire_requests command
+PROJECT_REQUEST_EXPIRY_DAYS = 30
+
+# Rejections are kept this many months before the current one; on
+# PostgreSQL prune_rejections drops the older monthly partitions and creates
+# the partitions of this many months ahead
+REJECTION_RETENTION_MONTHS = 12
+REJECTION_PARTITIONS_AHEAD = 3
+
+# Database task queue (run_tasks): a claimed task is queued again if its
+# worker has not finished it within the lease; failed tasks are retried
+# after TASK_RETRY_BASE_SECONDS, doubled per attempt up to the maximum
+TASK_LEASE_SECONDS = 300
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_BASE_SECONDS = 10
+TASK_RETRY_MAX_SECONDS = 3600
+TASK_POLL_SECONDS = 1
+
+# Transactional outbox (relay_outbox): consumers by name, events relayed per
+# batch, and how old an event must be before it is relayed (longer than any
+# write transaction, so an event committing late is not skipped). Relayed
+# events are deleted after OUTBOX_RETENTION_DAYS
+OUTBOX_CONSUMERS = {
+    "analytics": "projects.outbox.AnalyticsConsumer",
+    "notifications": "projects.outbox.NotificationConsumer",
+    "webhooks": "projects.webhooks.WebhookConsumer",
+}
+OUTBOX_BATCH_SIZE = 500
+OUTBOX_RELAY_LAG_SECONDS = 5
+OUTBOX_RETENTION_DAYS = 7
+OUTBOX_POLL_SECONDS = 1
+
+# Outbound webhooks (deliver_webhooks): deliveries claimed per batch,
+# requests in flight at once and their timeout. A claimed batch is leased
+# for as long as sending it can take plus WEBHOOK_LEASE_SECONDS.
+# Failed deliveries are retried after WEBHOOK_RETRY_BASE_SECONDS, doubled
+# per attempt up to the maximum, and dead-lettered after WEBHOOK_MAX_ATTEMPTS.
+# Endpoints must resolve to public addresses unless private ones are allowed
+# (for development only: owners could otherwise reach internal services)
+WEBHOOK_BATCH_SIZE = 500
+WEBHOOK_LEASE_SECONDS = 120
+WEBHOOK_CONCURRENCY = 50
+WEBHOOK_TIMEOUT_SECONDS = 10
+WEBHOOK_MAX_ATTEMPTS = 8
+WEBHOOK_RETRY_BASE_SECONDS = 30
+WEBHOOK_RETRY_MAX_SECONDS = 6 * 3600
+WEBHOOK_POLL_SECONDS = 1
+WEBHOOK_ALLOW_PRIVATE_ADDRESSES = os.environ.get("WEBHOOK_ALLOW_PRIVATE_ADDRESSES") == "1"
+
+# Daily digest emails (send_digests): owners with requests received in the
+# last --hours (24 by default) get a summary of their pending requests,
+# rendered and sent DIGEST_BATCH_SIZE per connection by DIGEST_WORKERS
+# processes
+DIGEST_WORKERS = 4
+DIGEST_BATCH_SIZE = 500
+DIGEST_DASHBOARD_URL = os.environ.get("DIGEST_DASHBOARD_URL", default="http://localhost:5173/home")
+
+# Notification emails; printed to the console unless configured
+EMAIL_BACKEND = os.environ.get("EMAIL_BACKEND", default="django.core.mail.backends.console.EmailBackend")
+DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", default="no-reply@projecto.local")
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,105 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from projects.models import ProjectLead, ProjectMembers, ProjectRequest
+
+User = get_user_model()
+
+
+class BatchTests(TestCase):
+    """
+    Verifies that /api/batch/ dispatches sub-requests through the regular
+    views, in order, with optional all-or-nothing semantics.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email="owner@example.com", password="pass", firstname="Own", lastname="Er"
+        )
+        self.member = User.objects.create_user(
+            email="member@example.com", password="pass", firstname="Mem", lastname="Ber"
+        )
+        ProjectLead.objects.create(owner=self.owner, projectname="Alpha", description="First")
+        ProjectLead.objects.create(owner=self.owner, projectname="Beta", description="Second")
+        ProjectLead.objects.create(owner=self.owner, projectname="Gamma", description="Third")
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def join(self, projectname):
+        return {
+            "method": "POST",
+            "path": "/api/projectrequests/",
+            "body": {
+                "owner_email": "owner@example.com",
+                "projectname": projectname,
+                "member_email": "member@example.com",
+                "message": "Hi",
+            },
+        }
+
+    def test_sub_requests_run_in_order(self):
+        response = self.client.post("/api/batch/", {"requests": [
+            {"method": "GET", "path": "/api/accounts/me/"},
+            self.join("Alpha"),
+            {"method": "GET", "path": "/api/projectcount/?email=member@example.com"},
+        ]}, format="json")
+
+        results = response.json()["responses"]
+        self.assertEqual([r["status"] for r in results], [200, 201, 200])
+        self.assertEqual(results[0]["body"]["email"], "member@example.com")
+        self.assertEqual(results[2]["body"]["pendingrequests"], 1)
+
+    def test_atomic_batch_rolls_back_on_failure(self):
+        response = self.client.post("/api/batch/", {"atomic": True, "requests": [
+            self.join("Alpha"),
+            self.join("Missing"),
+        ]}, format="json")
+
+        data = response.json()
+        self.assertFalse(data["committed"])
+        self.assertEqual([r["status"] for r in data["responses"]], [201, 400])
+        self.assertFalse(ProjectRequest.objects.exists())
+
+    def test_unknown_path_returns_404_sub_response(self):
+        response = self.client.post("/api/batch/", {"requests": [
+            {"method": "GET", "path": "/api/nowhere/"},
+        ]}, format="json")
+        self.assertEqual(response.json()["responses"][0]["status"], 404)
+
+    def test_outer_per_request_headers_are_not_passed_on(self):
+        response = self.client.post(
+            "/api/batch/",
+            {"requests": [
+                {"method": "GET", "path": "/api/projectcount/?email=member@example.com"},
+                self.join("Alpha"),
+                self.join("Gamma"),
+                {**self.join("Beta"), "headers": {"Idempotency-Key": "beta"}},
+                {**self.join("Beta"), "headers": {"Idempotency-Key": "beta"}},
+            ]},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="outer",
+            HTTP_IF_NONE_MATCH="*",
+        )
+
+        results = response.json()["responses"]
+        self.assertEqual([r["status"] for r in results], [200, 201, 201, 201, 201])
+        self.assertEqual(
+            sorted(ProjectRequest.objects.values_list("project__projectname", flat=True)),
+            ["Alpha", "Beta", "Gamma"],
+        )
+
+    def test_project_archived_by_a_sub_request_is_not_reused(self):
+        alpha = ProjectLead.objects.get(projectname="Alpha")
+        self.client.force_authenticate(self.owner)
+
+        response = self.client.post("/api/batch/", {"requests": [
+            self.join("Alpha"),
+            {"method": "DELETE", "path": f"/api/projectleads/{alpha.pk}/"},
+            {"method": "POST", "path": "/api/projectmembers/", "body": {
+                "email": "member@example.com", "owner": "owner@example.com", "projectname": "Alpha", "message": "Hi",
+            }},
+        ]}, format="json")
+
+        self.assertEqual([r["status"] for r in response.json()["responses"]], [201, 204, 400])
+        self.assertFalse(ProjectMembers.objects.exists())
@@ -4,6 +4,7 @@ from rest_framework import routers
 from rest_framework_simplejwt import views as jwt_views
 from accounts import views as user_views
 from projects import views as project_views
+from projecto.batch import BatchView
 '''
 Author: Pranav Singh
 '''
@@ -31,6 +32,11 @@ urlpatterns = [
     path('api/token/refresh/',jwt_views.TokenRefreshView.as_view()),
     path('api/token/verify/',jwt_views.TokenVerifyView.as_view()),
     path('api/accounts/',include('accounts.urls')),
+    path('api/sync/',project_views.SyncView.as_view()),
+    path('api/collaborators/',project_views.CollaboratorsView.as_view()),
+    path('api/analytics/',project_views.AnalyticsView.as_view()),
+    path('api/analytics/mine/',project_views.OwnerAnalyticsView.as_view()),
+    path('api/batch/',BatchView.as_view()),
     path('admin/', admin.site.urls),
     path('api/',include(router.urls)),
 ]
@@ -0,0 +1,253 @@
+"""
+analytics.py
+
+This module maintains the daily analytics rollups (`DailyOwnerStats` and
+`DailySkillRequests`) and answers the analytics endpoints from them.
+
+The rollups are kept current incrementally: creating a project, sending a
+join request, accepting or rejecting one records an outbox event, and the
+outbox relay's analytics consumer adds each batch of events to the counters
+of the owners and days (one `INSERT ... ON CONFLICT DO UPDATE` per table
+touched, see `outbox.py`). Reading statistics therefore never scans the
+request, member or rejection tables; platform-wide figures sum the owner
+rows of the requested days.
+
+History written before the rollups existed is loaded by `backfill()` (the
+`backfill_analytics` command), which walks each source table in primary key
+order, one chunk at a time.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from accounts.skills import SKILLS, names_for
+from .models import DailyOwnerStats, DailySkillRequests, ProjectLead, ProjectMembers, ProjectRequest, ProjectRequestRejected
+
+COUNTERS = ["projects_created", "requests", "accepted", "rejected", "timed_decisions", "decision_seconds"]
+
+
+def _day(when):
+    return timezone.localdate(when)
+
+
+def _add_owner_stats(stats):
+    """Add `{(owner_id, day): {counter: amount}}` to the owner rollups."""
+    DailyOwnerStats.objects.add(
+        ("owner", "day"),
+        [{"owner": owner_id, "day": day, **counts} for (owner_id, day), counts in stats.items()],
+    )
+
+
+def count_projects(projects):
+    """
+    Count created projects.
+
+    Parameters:
+        projects (Iterable[tuple]): `(owner_id, created_at)` per project.
+    """
+    stats = {}
+    for owner_id, created_at in projects:
+        counts = stats.setdefault((owner_id, _day(created_at)), {"projects_created": 0})
+        counts["projects_created"] += 1
+    _add_owner_stats(stats)
+
+
+def count_requests(requests):
+    """
+    Count join requests, per owner and per skill the project needs.
+
+    Parameters:
+        requests (Iterable[tuple]): `(owner_id, project_skills, created_at)`
+                                    per request.
+    """
+    stats, skills = {}, {}
+    for owner_id, mask, created_at in requests:
+        day = _day(created_at)
+        counts = stats.setdefault((owner_id, day), {"requests": 0})
+        counts["requests"] += 1
+        for position in range(len(SKILLS)):
+            if mask >> position & 1:
+                skills[owner_id, day, position] = skills.get((owner_id, day, position), 0) + 1
+
+    _add_owner_stats(stats)
+    DailySkillRequests.objects.add(
+        ("owner", "day", "skill"),
+        [
+            {"owner": owner_id, "day": day, "skill": skill, "requests": total}
+            for (owner_id, day, skill), total in skills.items()
+        ],
+    )
+
+
+def count_decisions(outcome, decisions):
+    """
+    Count accepted or rejected requests and their time to decision.
+
+    Parameters:
+        outcome (str): "accepted" or "rejected".
+        decisions (Iterable[tuple]): `(owner_id, requested_at, decided_at)`
+                                     per decision; `requested_at` is None
+                                     when the request is no longer known.
+    """
+    stats = {}
+    for owner_id, requested_at, decided_at in decisions:
+        counts = stats.setdefault(
+            (owner_id, _day(decided_at)), {outcome: 0, "timed_decisions": 0, "decision_seconds": 0}
+        )
+        counts[outcome] += 1
+        if requested_at is not None:
+            counts["timed_decisions"] += 1
+            counts["decision_seconds"] += max(int((decided_at - requested_at).total_seconds()), 0)
+    _add_owner_stats(stats)
+
+
+def request_times(pairs):
+    """
+    When users asked to join projects, from the join requests still stored.
+
+    Parameters:
+        pairs (set[tuple[int, int]]): `(project_id, member_id)` pairs.
+
+    Returns:
+        dict[tuple[int, int], datetime]: Request time of the pairs found.
+    """
+    if not pairs:
+        return {}
+    return {
+        (project_id, member_id): created_at
+        for project_id, member_id, created_at in ProjectRequest.objects.filter(
+            project_id__in={project_id for project_id, _ in pairs},
+            member_id__in={member_id for _, member_id in pairs},
+        ).values_list("project_id", "member_id", "created_at")
+        if (project_id, member_id) in pairs
+    }
+
+
+def _rates(row):
+    """Add acceptance rate and average decision time to summed counters."""
+    decided = row["accepted"] + row["rejected"]
+    row["acceptance_rate"] = round(row["accepted"] / decided, 4) if decided else None
+    row["avg_decision_hours"] = (
+        round(row["decision_seconds"] / row["timed_decisions"] / 3600, 2) if row["timed_decisions"] else None
+    )
+    del row["timed_decisions"], row["decision_seconds"]
+    return row
+
+
+def summarize(days, owner=None):
+    """
+    Read the statistics of the last `days` days from the rollups (two
+    queries).
+
+    Parameters:
+        days (int): Number of days, today included.
+        owner (Users, optional): Only count this owner's projects.
+
+    Returns:
+        dict: `from` and `to` dates, `totals`, one entry per active day in
+        `days`, and `skills` (requests per skill name, most requested
+        first).
+    """
+    today = timezone.localdate()
+    since = today - timedelta(days=days - 1)
+
+    stats = DailyOwnerStats.objects.filter(day__gte=since)
+    skill_rows = DailySkillRequests.objects.filter(day__gte=since)
+    if owner is not None:
+        stats = stats.filter(owner=owner)
+        skill_rows = skill_rows.filter(owner=owner)
+
+    daily = list(
+        stats.values("day").annotate(**{name: Sum(name) for name in COUNTERS}).order_by("day")
+    )
+    totals = {name: sum(row[name] for row in daily) for name in COUNTERS}
+
+    skills = {}
+    for row in skill_rows.values("skill").annotate(total=Sum("requests")).order_by("-total", "skill"):
+        skills[names_for(1 << row["skill"])[0]] = row["total"]
+
+    return {
+        "from": since,
+        "to": today,
+        "totals": _rates(totals),
+        "days": [_rates(row) for row in daily],
+        "skills": skills,
+    }
+
+
+def _chunks(queryset, fields, chunk_size):
+    """Yield `values_list` rows of a queryset in primary key order, by chunk."""
+    last = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last).order_by("pk").values_list("pk", *fields)[:chunk_size])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def _decisions(rows):
+    """
+    Split member or rejection rows `(pk, project_id, user_id, owner_id,
+    skills, decided_at)` into decisions and requests to count.
+
+    A decision whose request row is gone (deleted after the decision) has
+    no known request time; its request is counted on the decision day.
+    """
+    requested = request_times({(row[1], row[2]) for row in rows})
+
+    decisions, lost_requests = [], []
+    for _, project_id, user_id, owner_id, mask, decided_at in rows:
+        requested_at = requested.get((project_id, user_id))
+        decisions.append((owner_id, requested_at, decided_at))
+        if requested_at is None:
+            lost_requests.append((owner_id, mask, decided_at))
+    return decisions, lost_requests
+
+
+def backfill(chunk_size=5000):
+    """
+    Rebuild the rollups from the source tables.
+
+    The rollups are emptied first; events older than that moment are then
+    counted chunk by chunk, while newer ones keep being counted by the live
+    code paths.
+
+    Parameters:
+        chunk_size (int): Source rows read per query.
+
+    Yields:
+        tuple[str, int]: Source table and number of rows of each chunk.
+    """
+    with transaction.atomic():
+        cutoff = timezone.now()
+        DailyOwnerStats.objects.all().delete()
+        DailySkillRequests.objects.all().delete()
+
+    projects = ProjectLead.all_objects.filter(created_at__lt=cutoff)
+    for rows in _chunks(projects, ["owner_id", "created_at"], chunk_size):
+        with transaction.atomic():
+            count_projects((owner_id, created_at) for _, owner_id, created_at in rows)
+        yield "projects", len(rows)
+
+    requests = ProjectRequest.objects.filter(created_at__lt=cutoff)
+    for rows in _chunks(requests, ["project__owner_id", "project__skills", "created_at"], chunk_size):
+        with transaction.atomic():
+            count_requests(row[1:] for row in rows)
+        yield "requests", len(rows)
+
+    sources = [
+        ("accepted", ProjectMembers.objects.filter(joined_on__lt=cutoff), "member_id", "joined_on"),
+        ("rejected", ProjectRequestRejected.objects.filter(rejected_on__lt=cutoff), "user_id", "rejected_on"),
+    ]
+    for outcome, queryset, user_field, decided_field in sources:
+        fields = ["project_id", user_field, "project__owner_id", "project__skills", decided_field]
+        for rows in _chunks(queryset, fields, chunk_size):
+            decisions, lost_requests = _decisions(rows)
+            with transaction.atomic():
+                count_decisions(outcome, decisions)
+                count_requests(lost_requests)
+            yield outcome, len(rows)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
+
+    def ready(self):
+        # Connect the model signal handlers that keep data versions current
+        from . import signals  # noqa: F401
+        # Register the task queue's task functions
+        from . import tasks  # noqa: F401
@@ -0,0 +1,175 @@
+"""
+archival.py
+
+This module archives (soft-deletes) projects and purges archived projects
+in the background.
+
+Deleting a project cascades to every join request, member, rejection and
+invitation of the project in one transaction, which keeps all those rows
+locked until it commits. Archiving only stamps `ProjectLead.archived_at`:
+the default manager leaves archived projects out of every query, so they
+disappear from the API at once, and the partial indexes over active projects
+never contain them. Like a deletion, archiving bumps the versions of the
+owner, members and applicants and leaves a tombstone for delta sync.
+
+`purge_archived()` (the `purge_archived_projects` command) then deletes the
+rows of archived projects table by table, one short transaction per batch,
+leaving tombstones for the removed join requests and memberships, and
+finally deletes each emptied project. A project archived through the API
+is also purged right away by a queued task (`projects.purge_project`).
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .collabgraph import collaboration_graph
+from .models import (
+    ExpiredProjectRequest, ProjectInvitation, ProjectLead, ProjectMembers, ProjectRequest, ProjectRequestRejected,
+    Task, Tombstone, TrendingRollup,
+)
+from .similarity import similar_projects_index
+from .taskqueue import enqueue
+from .versioning import PROJECTS_KEY, bump_versions, project_key, user_key
+
+# Rows that reference a project, with the tombstone kind and user field of
+# the rows delta sync clients know about
+CHILDREN = [
+    (ProjectRequest, Tombstone.REQUEST, "member_id"),
+    (ProjectMembers, Tombstone.MEMBER, "member_id"),
+    (ProjectRequestRejected, None, None),
+    (ProjectInvitation, None, None),
+    (ExpiredProjectRequest, None, None),
+    (TrendingRollup, None, None),
+]
+
+
+def archive_projects(projects):
+    """
+    Archive projects with one `UPDATE`.
+
+    Parameters:
+        projects (QuerySet): Active projects to archive.
+
+    Returns:
+        int: Number of projects archived.
+    """
+    with transaction.atomic():
+        rows = list(
+            projects.select_for_update(of=("self",)).order_by("id").values_list("id", "owner__email", "projectname")
+        )
+        if not rows:
+            return 0
+
+        ids = [project_id for project_id, _, _ in rows]
+        now = timezone.now()
+        ProjectLead.objects.filter(id__in=ids).update(archived_at=now, updated_at=now)
+        Tombstone.objects.bulk_create([Tombstone(kind=Tombstone.PROJECT, object_id=project_id) for project_id in ids])
+
+        # Joined and pending lists of other users showed the projects too
+        keys = {PROJECTS_KEY}
+        for _, owner_email, projectname in rows:
+            keys.update([user_key(owner_email), project_key(owner_email, projectname)])
+        for model in (ProjectMembers, ProjectRequest):
+            emails = model.objects.filter(project_id__in=ids).values_list("member__email", flat=True).distinct()
+            keys.update(user_key(email) for email in emails)
+        bump_versions(keys)
+
+        def unindex():
+            for project_id in ids:
+                collaboration_graph.apply(("drop", project_id))
+                similar_projects_index.apply(("remove", project_id))
+
+        transaction.on_commit(unindex)
+
+    return len(ids)
+
+
+def archive_project(project):
+    """
+    Archive a project and queue its purge.
+
+    Parameters:
+        project (ProjectLead): The project to archive.
+
+    Returns:
+        bool: Whether the project was archived; False if it already was.
+    """
+    with transaction.atomic():
+        archived = archive_projects(ProjectLead.objects.filter(pk=project.pk)) > 0
+        if archived:
+            enqueue("projects.purge_project", lane=Task.LOW, project_id=project.pk)
+    return archived
+
+
+def delete_rows(model, ids):
+    """
+    Delete rows by id with a plain `DELETE`: the ORM would fetch every row
+    again to send the delete signals, whose work callers do for the batch.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+
+
+def _purge_batch(project, model, kind, user_field, batch_size):
+    """
+    Delete one batch of an archived project's rows of one table.
+
+    Returns:
+        int: Number of rows deleted.
+    """
+    fields = ["id"] + ([user_field] if kind is not None else [])
+
+    with transaction.atomic():
+        rows = list(model.objects.filter(project_id=project.pk).order_by("id").values_list(*fields)[:batch_size])
+        if not rows:
+            return 0
+
+        delete_rows(model, [row[0] for row in rows])
+
+        if kind is not None:
+            Tombstone.objects.bulk_create([
+                Tombstone(kind=kind, object_id=row_id, user_id=user_id)
+                for row_id, member_id in rows
+                for user_id in {member_id, project.owner_id}
+            ])
+
+    return len(rows)
+
+
+def purge_step(project, batch_size=1000):
+    """
+    Run one bounded step of purging an archived project: delete a batch of
+    its rows or, once none is left, the project itself.
+
+    Returns:
+        tuple[str, int] | None: Table and number of rows deleted, or None
+        when the project is gone.
+    """
+    for model, kind, user_field in CHILDREN:
+        deleted = _purge_batch(project, model, kind, user_field, batch_size)
+        if deleted:
+            return model._meta.db_table, deleted
+
+    # Rows added since the last batch are removed by the cascade, a few at most
+    with transaction.atomic():
+        deleted, _ = ProjectLead.all_objects.filter(pk=project.pk, archived_at__isnull=False).delete()
+    return (ProjectLead._meta.db_table, 1) if deleted else None
+
+
+def purge_archived(batch_size=1000):
+    """
+    Delete every archived project and its rows, in batches.
+
+    Parameters:
+        batch_size (int): Rows deleted per transaction.
+
+    Yields:
+        tuple[str, int]: Table and number of rows of each batch; the
+        project itself is reported as one `projects_projectlead` row.
+    """
+    archived = ProjectLead.all_objects.filter(archived_at__isnull=False).order_by("archived_at", "id")
+
+    for project in list(archived):
+        while (step := purge_step(project, batch_size)) is not None:
+            yield step
@@ -0,0 +1,419 @@
+"""
+bulk_io.py
+
+This module implements bulk import and export of projects as CSV or NDJSON,
+used by the `import_projects` / `export_projects` management commands and
+the owner-scoped import/export endpoints, and the streaming export of a
+project's roster (join requests, members and rejections).
+
+Both directions work on streams in fixed-size chunks, so memory use does not
+depend on the size of the file:
+
+- Import on PostgreSQL copies each chunk into a temporary staging table with
+  `COPY ... FROM STDIN` and inserts it with one `INSERT ... SELECT` joined to
+  the users table on the owner email. Other databases resolve the chunk's
+  owner emails with one query and insert with `bulk_create`.
+- Export on PostgreSQL writes with `COPY ... TO STDOUT`; the HTTP endpoint
+  and other databases stream rows from a server-side cursor.
+
+Rows that duplicate an existing project (same owner and name) are skipped.
+
+Imports bypass the model signals, so each chunk does their work for the
+projects it created: it bumps the data versions, records the outbox events
+and, once committed, adds the projects to the in-memory collaboration graph
+and similar-projects index.
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.skills import BACKEND, FRONTEND, flags_mask
+
+from .collabgraph import collaboration_graph
+from .models import OutboxEvent, ProjectLead, ProjectMembers, ProjectRequest, ProjectRequestRejected
+from .outbox import event, record_many
+from .similarity import project_text, similar_projects_index
+from .versioning import PROJECTS_KEY, bump_versions, user_key
+
+User = get_user_model()
+
+FIELDS = ["owner_email", "projectname", "description", "frontend", "backend"]
+ROSTER_FIELDS = ["status", "email", "firstname", "lastname", "message", "date"]
+FORMATS = ("csv", "ndjson")
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+STAGE_TABLE = "projects_import_stage"
+
+
+class BulkImportError(ValueError):
+    """
+    Raised for malformed import input.
+
+    Attributes:
+        totals (dict | None): Counts of `import_projects()` for the chunks
+                              committed before the error.
+    """
+
+    totals = None
+
+
+def _as_bool(value):
+    """Parse a CSV/NDJSON boolean cell."""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "t", "1", "yes", "y")
+
+
+def read_rows(lines, fmt):
+    """
+    Parse an iterable of text lines into project dicts, lazily.
+
+    Parameters:
+        lines (Iterable[str]): Lines of the input file.
+        fmt (str): "csv" (with a header row) or "ndjson".
+
+    Yields:
+        dict: Row with the keys in `FIELDS` (owner_email may be missing).
+
+    Raises:
+        BulkImportError: If a row cannot be parsed or lacks a project name.
+    """
+    if fmt == "csv":
+        records = csv.DictReader(lines)
+    else:
+        records = _parse_ndjson(lines)
+
+    for number, record in enumerate(records, start=1):
+        if not isinstance(record, dict) or not record.get("projectname"):
+            raise BulkImportError(f"Row {number}: projectname is required")
+
+        yield {
+            "owner_email": (record.get("owner_email") or "").strip(),
+            "projectname": record["projectname"][:100],
+            "description": (record.get("description") or "")[:500],
+            "frontend": _as_bool(record.get("frontend", False)),
+            "backend": _as_bool(record.get("backend", False)),
+        }
+
+
+def _parse_ndjson(lines):
+    """Yield one decoded JSON value per non-empty line."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            raise BulkImportError(f"Line {number}: invalid JSON")
+
+
+def chunked(iterable, size):
+    """Yield lists of at most `size` items from an iterable."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _supports_copy():
+    """Return whether the default connection can run COPY through psycopg2."""
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        return hasattr(cursor.cursor, "copy_expert")
+
+
+def import_projects(rows, owner=None, chunk_size=1000):
+    """
+    Import projects from an iterable of row dicts.
+
+    Parameters:
+        rows (Iterable[dict]): Rows as produced by `read_rows()`.
+        owner (Users, optional): Import every row for this owner, ignoring
+                                 the owner_email column.
+        chunk_size (int): Rows processed per statement.
+
+    Returns:
+        dict: Counts of `created`, `skipped` (duplicates) and
+              `unknown_owner` rows.
+
+    Raises:
+        BulkImportError: If a row is malformed or the input is not UTF-8.
+                         Each chunk commits on its own, so the chunks before
+                         it stay imported; the error's `totals` count them.
+    """
+    totals = {"created": 0, "skipped": 0, "unknown_owner": 0}
+    use_copy = _supports_copy()
+
+    try:
+        for chunk in chunked(rows, chunk_size):
+            if owner is not None:
+                for row in chunk:
+                    row["owner_email"] = owner.email
+
+            with transaction.atomic():
+                if use_copy:
+                    new_projects, unknown = _import_chunk_copy(chunk)
+                else:
+                    new_projects, unknown = _import_chunk_orm(chunk)
+
+                bump_versions(
+                    [PROJECTS_KEY] + [user_key(email) for email in {row["owner_email"] for row in chunk}]
+                )
+                record_many([
+                    event(
+                        OutboxEvent.PROJECT_CREATED, project_id, owner_id, created_at,
+                        owner=owner_id, projectname=projectname,
+                    )
+                    for project_id, owner_id, projectname, _, created_at in new_projects
+                ])
+                transaction.on_commit(lambda new_projects=new_projects: _index_projects(new_projects))
+
+            created = len(new_projects)
+            totals["created"] += created
+            totals["unknown_owner"] += unknown
+            totals["skipped"] += len(chunk) - created - unknown
+    except (BulkImportError, UnicodeDecodeError) as e:
+        # Raised while reading the next chunk: the earlier ones are committed
+        error = e if isinstance(e, BulkImportError) else BulkImportError(str(e))
+        error.totals = totals
+        raise error
+
+    return totals
+
+
+def _index_projects(new_projects):
+    """Add imported projects to the in-memory indexes, as the signals would."""
+    for project_id, owner_id, projectname, description, _ in new_projects:
+        collaboration_graph.apply(("project", project_id, owner_id))
+        similar_projects_index.apply(("upsert", project_id, project_text(projectname, description)))
+
+
+def committed_rows(totals):
+    """Number of input rows, from the first, an import has committed."""
+    return totals["created"] + totals["skipped"] + totals["unknown_owner"]
+
+
+def _import_chunk_copy(chunk):
+    """
+    Import a chunk on PostgreSQL: COPY into a staging table, then insert
+    with one set-based join on the owner email.
+
+    Returns:
+        tuple[list[tuple], int]: `(id, owner_id, projectname, description,
+        created_at)` of the projects created, and the number of rows with an
+        unknown owner.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in chunk:
+        writer.writerow([row[field] for field in FIELDS])
+    buffer.seek(0)
+
+    now = timezone.now()
+    users = User._meta.db_table
+    projects = ProjectLead._meta.db_table
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {STAGE_TABLE} ("
+            "owner_email varchar(254), projectname varchar(100), description varchar(500), "
+            "frontend boolean, backend boolean) ON COMMIT DELETE ROWS"
+        )
+        cursor.cursor.copy_expert(
+            f"COPY {STAGE_TABLE} ({', '.join(FIELDS)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+        cursor.execute(
+            f"INSERT INTO {projects} "
+            "(owner_id, projectname, description, frontend, backend, skills, seats_taken, created_at, updated_at) "
+            "SELECT u.id, s.projectname, s.description, s.frontend, s.backend, "
+            "(CASE WHEN s.frontend THEN %s ELSE 0 END) | (CASE WHEN s.backend THEN %s ELSE 0 END), 0, %s, %s "
+            f"FROM {STAGE_TABLE} s JOIN {users} u ON u.email = s.owner_email "
+            "ON CONFLICT (owner_id, projectname) WHERE archived_at IS NULL DO NOTHING "
+            "RETURNING id, owner_id, projectname, description",
+            [FRONTEND, BACKEND, now, now],
+        )
+        created = [(*row, now) for row in cursor.fetchall()]
+        cursor.execute(
+            f"SELECT count(*) FROM {STAGE_TABLE} s "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {users} u WHERE u.email = s.owner_email)"
+        )
+        unknown = cursor.fetchone()[0]
+
+    return created, unknown
+
+
+def _import_chunk_orm(chunk):
+    """
+    Import a chunk on other databases: resolve owner emails with one query
+    and insert with `bulk_create`.
+
+    Returns:
+        tuple[list[tuple], int]: `(id, owner_id, projectname, description,
+        created_at)` of the projects created, and the number of rows with an
+        unknown owner.
+    """
+    owners = dict(
+        User.objects.filter(email__in={row["owner_email"] for row in chunk}).values_list("email", "id")
+    )
+
+    known = [row for row in chunk if row["owner_email"] in owners]
+    existing = set(
+        ProjectLead.objects.filter(
+            owner_id__in={owners[row["owner_email"]] for row in known},
+            projectname__in={row["projectname"] for row in known},
+        ).values_list("owner_id", "projectname")
+    )
+
+    new_projects = {}
+    for row in known:
+        key = (owners[row["owner_email"]], row["projectname"])
+        if key not in existing and key not in new_projects:
+            new_projects[key] = ProjectLead(
+                owner_id=key[0],
+                projectname=row["projectname"],
+                description=row["description"],
+                frontend=row["frontend"],
+                backend=row["backend"],
+                skills=flags_mask(row["frontend"], row["backend"]),
+            )
+
+    ProjectLead.objects.bulk_create(new_projects.values(), ignore_conflicts=True)
+
+    # Conflicts leave the new rows without primary keys; look them up
+    ids = {}
+    if new_projects:
+        ids = {
+            (owner_id, projectname): project_id
+            for project_id, owner_id, projectname in ProjectLead.objects.filter(
+                owner_id__in={owner_id for owner_id, _ in new_projects},
+                projectname__in={projectname for _, projectname in new_projects},
+            ).values_list("id", "owner_id", "projectname")
+        }
+
+    created = [
+        (ids[key], project.owner_id, project.projectname, project.description, project.created_at)
+        for key, project in new_projects.items() if key in ids
+    ]
+    return created, len(chunk) - len(known)
+
+
+def _queryset(owner=None):
+    """Projects to export, optionally restricted to one owner."""
+    queryset = ProjectLead.objects.order_by("id")
+    if owner is not None:
+        queryset = queryset.filter(owner=owner)
+    return queryset
+
+
+def _encode_lines(fmt, fields, rows):
+    """
+    Encode rows of values as CSV (with a header line) or NDJSON text.
+
+    Parameters:
+        fmt (str): "csv" or "ndjson".
+        fields (list[str]): Column names, in value order.
+        rows (Iterable[Sequence]): Rows of values.
+
+    Yields:
+        str: One encoded line per row.
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def line(values):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(values)
+            return buffer.getvalue()
+
+        yield line(fields)
+        for values in rows:
+            yield line(["true" if v is True else "false" if v is False else v for v in values])
+    else:
+        for values in rows:
+            yield json.dumps(dict(zip(fields, values)), default=str) + "\n"
+
+
+def iter_export(fmt, owner=None, chunk_size=1000):
+    """
+    Stream projects as CSV or NDJSON text through a server-side cursor.
+
+    Parameters:
+        fmt (str): "csv" or "ndjson".
+        owner (Users, optional): Only export this owner's projects.
+        chunk_size (int): Rows fetched per round trip.
+
+    Yields:
+        str: Encoded lines (the CSV header first).
+    """
+    rows = _queryset(owner).values_list(
+        "owner__email", "projectname", "description", "frontend", "backend"
+    ).iterator(chunk_size=chunk_size)
+
+    return _encode_lines(fmt, FIELDS, rows)
+
+
+def iter_roster(fmt, project, chunk_size=1000):
+    """
+    Stream a project's join requests, members and rejections as CSV or NDJSON.
+
+    Each table is read with one query joined to the users table and consumed
+    through a server-side cursor, one after the other, so memory use does not
+    depend on the number of rows.
+
+    Parameters:
+        fmt (str): "csv" or "ndjson".
+        project (ProjectLead): Project to export.
+        chunk_size (int): Rows fetched per round trip.
+
+    Yields:
+        str: Encoded lines with the columns in `ROSTER_FIELDS`.
+    """
+    sources = [
+        ("requested", ProjectRequest.objects.filter(project=project), "member", "updated_at"),
+        ("member", ProjectMembers.objects.filter(project=project), "member", "joined_on"),
+        ("rejected", ProjectRequestRejected.objects.filter(project=project), "user", "rejected_on"),
+    ]
+
+    def rows():
+        for label, queryset, user, date in sources:
+            values = queryset.order_by("id").values_list(
+                f"{user}__email", f"{user}__firstname", f"{user}__lastname", "message", date
+            )
+            for email, firstname, lastname, message, when in values.iterator(chunk_size=chunk_size):
+                yield (label, email, firstname, lastname, message, when.isoformat())
+
+    return _encode_lines(fmt, ROSTER_FIELDS, rows())
+
+
+def export_projects(out, fmt, owner=None, chunk_size=1000):
+    """
+    Write projects to a text file object, using COPY TO STDOUT when possible.
+
+    Parameters:
+        out (TextIO): Destination file.
+        fmt (str): "csv" or "ndjson".
+        owner (Users, optional): Only export this owner's projects.
+        chunk_size (int): Rows fetched per round trip on the fallback path.
+    """
+    if fmt == "csv" and _supports_copy():
+        sql, params = (
+            _queryset(owner)
+            .values_list("owner__email", "projectname", "description", "frontend", "backend")
+            .query.sql_with_params()
+        )
+        with connection.cursor() as cursor:
+            query = cursor.mogrify(sql, params).decode()
+            out.write(",".join(FIELDS) + "\n")
+            cursor.cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv)", out)
+        return
+
+    for line in iter_export(fmt, owner, chunk_size):
+        out.write(line)
@@ -0,0 +1,248 @@
+"""
+caching.py
+
+This module implements the two-level response cache used by the read
+viewsets. Serialized list data is cached in a process-local LRU (L1) in front
+of a shared Django cache backend (L2).
+
+Entries are keyed by endpoint, user and query parameters, and tagged with the
+data version scopes the list depends on (see `versioning.py`). The current
+version of every tag is folded into the cache key, so bumping a tag from the
+model signals invalidates every entry carrying it without having to find and
+delete those entries; stale generations simply age out of both levels.
+
+Concurrent misses for the same key inside a process are coalesced into a
+single computation (single-flight), so an expired entry for a popular list
+costs one query per process rather than one per request.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+from .versioning import ConditionalListMixin
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded least-recently-used cache with expiry.
+
+    Attributes:
+        maxsize (int): Maximum number of entries kept.
+        timeout (float): Seconds an entry stays valid.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return a cached value and mark it as recently used.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used entries if full.
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent computations of the same key.
+
+    The first caller for a key runs the computation; callers arriving while
+    it is in flight wait for it and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Run `fn` once for all concurrent callers of `key`.
+
+        Parameters:
+            key (str): Identifier of the computation.
+            fn (Callable[[], Any]): Computation to run.
+
+        Returns:
+            Any: The computation's result.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event()}
+
+        if not leader:
+            call["done"].wait()
+            if "error" in call:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = fn()
+            return call["result"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+
+
+class ResponseCache:
+    """
+    Two-level tag-versioned cache for serialized response data.
+    """
+
+    def __init__(self):
+        self.local = LRUCache(
+            maxsize=getattr(settings, "RESPONSE_CACHE_L1_SIZE", 1024),
+            timeout=getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300),
+        )
+        self.flights = SingleFlight()
+
+    @property
+    def shared(self):
+        """The shared (L2) Django cache backend."""
+        return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+    def make_key(self, endpoint, user_id, params, versions):
+        """
+        Build the cache key for an endpoint, user, query and tag versions.
+
+        Parameters:
+            endpoint (str): View basename.
+            user_id (int | None): Authenticated user's id.
+            params (list[tuple[str, list[str]]]): Sorted query parameters.
+            versions (dict[str, int]): Current version of every tag.
+
+        Returns:
+            str: Cache key.
+        """
+        parts = [endpoint, str(user_id), repr(params)]
+        parts += [f"{tag}={versions[tag]}" for tag in sorted(versions)]
+        return "response:" + hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for `key`, computing and storing it on a miss.
+
+        Parameters:
+            key (str): Cache key from `make_key()`.
+            compute (Callable[[], Any]): Produces the value on a miss, or
+                None for a result that must not be cached.
+
+        Returns:
+            Any: Cached or freshly computed value.
+        """
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        def load():
+            value = self.shared.get(key)
+            if value is None:
+                value = compute()
+                if value is None:
+                    return None
+                self.shared.set(key, value, getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300))
+            self.local.set(key, value)
+            return value
+
+        return self.flights.do(key, load)
+
+
+response_cache = ResponseCache()
+
+
+class CachedListMixin(ConditionalListMixin):
+    """
+    Serves a viewset's `list` action from the response cache.
+
+    Builds on `ConditionalListMixin`: the version scopes returned by
+    `get_version_keys()` are used both for the ETag and as cache tags.
+    Only successful responses are cached; lists without version scopes are
+    never cached.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """
+        Serve the list from the cache, computing it on a miss.
+        """
+        return self.conditional_response(
+            request,
+            lambda: self.cached_response(
+                request, lambda: super(ConditionalListMixin, self).list(request, *args, **kwargs)
+            ),
+        )
+
+    def cached_response(self, request, build_response):
+        """
+        Return a response whose data comes from the cache when possible.
+
+        Must be called from within `conditional_response()`, which reads the
+        tag versions the cache key is built from.
+
+        Parameters:
+            request (Request): Incoming GET request.
+            build_response (Callable[[], Response]): Produces the full response.
+
+        Returns:
+            Response: Cached or freshly built response.
+        """
+        if self.data_versions is None:
+            return build_response()
+
+        key = response_cache.make_key(
+            self.basename, request.user.pk, sorted(request.query_params.lists()), self.data_versions
+        )
+        uncacheable = []
+
+        def compute():
+            response = build_response()
+            if response.status_code != status.HTTP_200_OK:
+                uncacheable.append(response)
+                return None
+            return response.data
+
+        data = response_cache.get_or_compute(key, compute)
+        if data is None:
+            # Another caller's failure, or our own: rebuild rather than cache it
+            return uncacheable[0] if uncacheable else build_response()
+
+        return Response(data)
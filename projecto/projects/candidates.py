@@ -0,0 +1,258 @@
+"""
+candidates.py
+
+This module implements candidate search for project owners: active users
+whose skills overlap a project's needs, ranked by the number of needed skills
+they have.
+
+Users are found through an in-memory inverted index from skill bit to the
+set of user ids having that skill, built once per process from the users
+table and kept current by the `Users` save/delete signals. The ranked list
+for a skill mask is computed once from the posting sets and cached until a
+user with one of those skills changes, so paging through it costs a slice
+plus one query for the page's user rows.
+
+Changes made by other processes are picked up by a background reload once
+the index is older than `CANDIDATE_INDEX_MAX_AGE` seconds (see
+`memindex.py`). Page rows are re-checked against the database, so a stale
+entry is dropped rather than shown.
+"""
+
+import bisect
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F
+
+from accounts.skills import SKILLS
+
+from .memindex import ProcessIndex
+from .models import ProjectInvitation, ProjectMembers, ProjectRequest, ProjectRequestRejected
+
+User = get_user_model()
+
+
+def _bits(mask):
+    """Return the positions of the set bits of a mask."""
+    return [position for position in range(len(SKILLS)) if mask >> position & 1]
+
+
+class SkillIndex(ProcessIndex):
+    """
+    Inverted index from skill to the ids of active users having it.
+
+    State:
+        (postings, skills): One set of user ids per skill bit, and the mask
+        of every indexed user.
+
+    Changes:
+        (user_id, mask): The user's current skills; 0 removes the user.
+
+    Attributes:
+        max_age (float): Seconds after which the index is reloaded.
+        cache_size (int): Number of ranked lists kept.
+    """
+
+    name = "skill-index"
+
+    def __init__(self, max_age, cache_size):
+        super().__init__(max_age)
+        self.cache_size = cache_size
+        self._ranked = OrderedDict()
+
+    def _installed(self):
+        self._ranked.clear()
+
+    def _load(self):
+        """Read every active user with skills from the database."""
+        postings = [set() for _ in SKILLS]
+        skills = {}
+        users = User.objects.filter(is_active=True).exclude(skills=0).values_list("id", "skills")
+
+        for user_id, mask in users.iterator(chunk_size=10_000):
+            skills[user_id] = mask
+            for position in _bits(mask):
+                postings[position].add(user_id)
+
+        return postings, skills
+
+    def _apply(self, state, change):
+        postings, skills = state
+        user_id, mask = change
+
+        old = skills.pop(user_id, 0)
+        if mask:
+            skills[user_id] = mask
+
+        for position in _bits(old & ~mask):
+            postings[position].discard(user_id)
+        for position in _bits(mask & ~old):
+            postings[position].add(user_id)
+
+        if old != mask and state is self._state:
+            changed = old | mask
+            for key in [key for key in self._ranked if key & changed]:
+                del self._ranked[key]
+
+    def update(self, user_id, mask):
+        """Record a user's current skills; a mask of 0 removes the user."""
+        self.apply((user_id, mask))
+
+    def ranked(self, mask):
+        """
+        Return the users sharing a skill with `mask`, best first.
+
+        Users are grouped by the number of skills in common with `mask`;
+        each group is sorted by id.
+
+        Returns:
+            list[tuple[int, list[int]]]: `(score, user_ids)` groups, highest
+            score first.
+        """
+        self._ensure_built()
+
+        with self._lock:
+            if mask in self._ranked:
+                self._ranked.move_to_end(mask)
+                return self._ranked[mask]
+
+            postings, _ = self._state
+            counts = Counter()
+            for position in _bits(mask):
+                counts.update(postings[position])
+
+            groups = {}
+            for user_id, score in counts.items():
+                groups.setdefault(score, []).append(user_id)
+            for user_ids in groups.values():
+                user_ids.sort()
+            entry = sorted(groups.items(), reverse=True)
+
+            self._ranked[mask] = entry
+            while len(self._ranked) > self.cache_size:
+                self._ranked.popitem(last=False)
+
+        return entry
+
+    def page(self, mask, offset, limit, excluded=()):
+        """
+        Return one page of the ranked candidates for `mask`.
+
+        Excluded users are skipped without copying the ranked list: their
+        positions, found by binary search in their score group, tell how far
+        past `offset` the page really starts.
+
+        Parameters:
+            mask (int): Skills being looked for.
+            offset (int): Number of candidates to skip.
+            limit (int): Page size.
+            excluded (Iterable[int]): User ids to leave out.
+
+        Returns:
+            tuple[int, list[int]]: Total number of candidates and the ids on
+            the page.
+        """
+        # The groups and the skills they were ranked from must come from the
+        # same state, or excluded users would be looked for in the wrong group
+        with self._lock:
+            groups = self.ranked(mask)
+            _, skills = self._state
+            excluded_scores = {
+                user_id: (skills.get(user_id, 0) & mask).bit_count() for user_id in set(excluded)
+            }
+
+        by_score = dict(groups)
+        group_start = {}
+        total = 0
+        for score, user_ids in groups:
+            group_start[score] = total
+            total += len(user_ids)
+
+        skipped = set()
+        for user_id, score in excluded_scores.items():
+            if score not in by_score:
+                continue
+            user_ids = by_score[score]
+            index = bisect.bisect_left(user_ids, user_id)
+            if index < len(user_ids) and user_ids[index] == user_id:
+                skipped.add(group_start[score] + index)
+
+        # Smallest start such that exactly `offset` kept candidates precede it
+        start = offset
+        for position in sorted(skipped):
+            if position <= start:
+                start += 1
+            else:
+                break
+
+        page = []
+        for score, user_ids in groups:
+            first = group_start[score]
+            if start >= first + len(user_ids):
+                continue
+            for index in range(max(start - first, 0), len(user_ids)):
+                if len(page) == limit:
+                    return total - len(skipped), page
+                if first + index not in skipped:
+                    page.append(user_ids[index])
+
+        return total - len(skipped), page
+
+
+skill_index = SkillIndex(
+    max_age=getattr(settings, "CANDIDATE_INDEX_MAX_AGE", 300),
+    cache_size=getattr(settings, "CANDIDATE_INDEX_CACHE_SIZE", 256),
+)
+
+
+def excluded_user_ids(project):
+    """
+    Return the ids of users who should not be suggested for a project: the
+    owner, members, pending requesters, rejected and already invited users.
+    Runs one query.
+    """
+    members = ProjectMembers.objects.filter(project=project).values_list("member_id")
+    requesters = ProjectRequest.objects.filter(project=project).values_list("member_id")
+    rejected = ProjectRequestRejected.objects.filter(project=project).values_list("user_id")
+    invited = ProjectInvitation.objects.filter(project=project).values_list("user_id")
+
+    ids = {user_id for (user_id,) in members.union(requesters, rejected, invited, all=True)}
+    ids.add(project.owner_id)
+    return ids
+
+
+def suggest_candidates(project, offset=0, limit=20):
+    """
+    Rank users by skill fit for a project.
+
+    Parameters:
+        project (ProjectLead): The project to find candidates for.
+        offset (int): Number of candidates to skip.
+        limit (int): Page size.
+
+    Returns:
+        tuple[int, list[Users]]: Total number of candidates and the users
+        on the page, best first, each annotated with `score` (the number of
+        the project's skills they have).
+    """
+    if not project.skills:
+        return 0, []
+
+    total, ids = skill_index.page(project.skills, offset, limit, excluded_user_ids(project))
+    if not ids:
+        return total, []
+
+    users = User.objects.filter(id__in=ids, is_active=True).annotate(
+        matched=F("skills").bitand(project.skills)
+    ).filter(matched__gt=0)
+    by_id = {user.id: user for user in users}
+
+    page = []
+    for user_id in ids:
+        user = by_id.get(user_id)
+        if user is not None:
+            user.score = user.matched.bit_count()
+            page.append(user)
+
+    return total, page
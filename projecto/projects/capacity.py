@@ -0,0 +1,72 @@
+"""
+capacity.py
+
+This module enforces team size limits. A seat is taken with a single
+conditional UPDATE on the project row:
+
+    UPDATE ... SET seats_taken = seats_taken + 1
+    WHERE id = %s AND (max_members IS NULL OR seats_taken < max_members)
+
+The database re-checks the condition against the latest committed row while
+holding its row lock, so concurrent accepts can never overbook a project,
+without a count query or a table lock.
+"""
+
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import HAS_OPEN_SEATS, ProjectLead
+from .versioning import PROJECTS_KEY, bump_versions
+
+
+class ProjectFull(APIException):
+    """Raised when accepting a member into a project with no open seats."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "This project has no open seats."
+    default_code = "project_full"
+
+
+def take_seat(project):
+    """
+    Reserve one seat on a project.
+
+    Must run in the same transaction as the member insert, so that a failed
+    insert releases the seat again.
+
+    Parameters:
+        project (ProjectLead): Project being joined.
+
+    Returns:
+        bool: True if a seat was reserved, False if the project is full.
+    """
+    # update() leaves the auto_now field alone; set it so delta sync reports
+    # the seat change
+    taken = ProjectLead.objects.filter(HAS_OPEN_SEATS, pk=project.pk).update(
+        seats_taken=F("seats_taken") + 1, updated_at=timezone.now()
+    )
+
+    # The discovery list shows seats_taken, and a capped project may just
+    # have filled up and left it
+    if taken:
+        bump_versions([PROJECTS_KEY])
+
+    return bool(taken)
+
+
+def release_seat(project_id):
+    """
+    Give back one seat on a project, e.g. after a member was removed.
+
+    Parameters:
+        project_id (int): Id of the project.
+    """
+    released = ProjectLead.objects.filter(pk=project_id, seats_taken__gt=0).update(
+        seats_taken=F("seats_taken") - 1, updated_at=timezone.now()
+    )
+
+    # A full project may have reopened
+    if released:
+        bump_versions([PROJECTS_KEY])
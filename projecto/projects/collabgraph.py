@@ -0,0 +1,289 @@
+"""
+collabgraph.py
+
+This module maintains the collaboration graph: users are nodes, and two
+users are connected when they have been on the same project (as owner or
+accepted member), weighted by the number of projects they share.
+
+The graph lives in memory in compressed sparse row (CSR) form: `indptr`,
+`indices` and `weights` NumPy arrays, where the neighbours of node `i` are
+`indices[indptr[i]:indptr[i + 1]]`. Membership changes are not written into
+the arrays; they go to a small per-node delta overlay that is merged on read
+and folded into fresh arrays (recomputed from a copy of the in-memory teams
+on the index's background thread, without touching the database) once it
+grows past `COLLAB_GRAPH_COMPACT_THRESHOLD` entries.
+
+Two-hop queries ("friends of collaborators") gather the rows of the user's
+collaborators and aggregate them with vectorized NumPy operations, instead
+of a recursive self-join over the membership tables.
+"""
+
+import numpy as np
+from django.conf import settings
+
+from .memindex import ProcessIndex
+from .models import ProjectLead, ProjectMembers
+
+EMPTY = np.empty(0, dtype=np.int64)
+
+
+class _Graph:
+    """
+    Graph state: teams, node numbering, CSR arrays and delta overlay.
+
+    Attributes:
+        teams (dict[int, set[int]]): User ids on each project.
+        owners (dict[int, int]): Owner id of each project.
+        node (dict[int, int]): Node number of each user id.
+        users (list[int]): User id of each node number.
+        indptr, indices, weights (ndarray): CSR arrays.
+        delta (dict[int, dict[int, int]]): Weight changes per node pair not
+            yet folded into the arrays.
+        delta_size (int): Number of pairs in `delta`.
+    """
+
+    def __init__(self, teams, owners):
+        self.teams = teams
+        self.owners = owners
+        self.node = {}
+        self.users = []
+        for team in teams.values():
+            for user_id in team:
+                self.node_of(user_id)
+        self.compact()
+
+    def node_of(self, user_id):
+        """Return the node number of a user, numbering new users."""
+        number = self.node.get(user_id)
+        if number is None:
+            number = self.node[user_id] = len(self.users)
+            self.users.append(user_id)
+        return number
+
+    def compact(self):
+        """Rebuild the CSR arrays from the teams and clear the overlay."""
+        size = len(self.users)
+        sources, targets = [], []
+
+        for team in self.teams.values():
+            if len(team) < 2:
+                continue
+            members = np.fromiter((self.node[user_id] for user_id in team), dtype=np.int64, count=len(team))
+            sources.append(np.repeat(members, len(members)))
+            targets.append(np.tile(members, len(members)))
+
+        if sources:
+            src = np.concatenate(sources)
+            dst = np.concatenate(targets)
+            keep = src != dst
+            # Pairs shared by several projects collapse into one weighted edge
+            pairs, weights = np.unique(src[keep] * size + dst[keep], return_counts=True)
+            src, dst = np.divmod(pairs, size)
+        else:
+            src = dst = weights = EMPTY
+
+        self.indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=size), out=self.indptr[1:])
+        self.indices = dst.astype(np.int64)
+        self.weights = weights.astype(np.int64)
+        self.delta = {}
+        self.delta_size = 0
+
+    def _bump(self, a, b, amount):
+        """Change the weight of edge a-b (both directions) in the overlay."""
+        for x, y in ((a, b), (b, a)):
+            row = self.delta.setdefault(x, {})
+            if y not in row:
+                self.delta_size += 1
+            row[y] = row.get(y, 0) + amount
+
+    def join(self, project_id, owner_id, user_id):
+        """Add a user to a project's team."""
+        team = self.teams.setdefault(project_id, set())
+        self.owners.setdefault(project_id, owner_id)
+        for member_id in (owner_id, user_id):
+            if member_id in team:
+                continue
+            number = self.node_of(member_id)
+            for other in team:
+                self._bump(number, self.node[other], 1)
+            team.add(member_id)
+
+    def leave(self, project_id, user_id):
+        """Remove a user from a project's team."""
+        team = self.teams.get(project_id)
+        if not team or user_id not in team or user_id == self.owners.get(project_id):
+            return
+        team.discard(user_id)
+        number = self.node[user_id]
+        for other in team:
+            self._bump(number, self.node[other], -1)
+
+    def drop(self, project_id):
+        """Remove a whole project."""
+        team = self.teams.pop(project_id, set())
+        self.owners.pop(project_id, None)
+        members = [self.node[user_id] for user_id in team]
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                self._bump(a, b, -1)
+
+    def row(self, number):
+        """
+        Return the neighbours of a node and the edge weights.
+
+        Returns:
+            tuple[ndarray, ndarray]: Neighbour node numbers and weights.
+        """
+        if number + 1 < len(self.indptr):
+            start, end = self.indptr[number], self.indptr[number + 1]
+            indices, weights = self.indices[start:end], self.weights[start:end]
+        else:
+            indices = weights = EMPTY
+
+        changes = self.delta.get(number)
+        if not changes:
+            return indices, weights
+
+        merged = dict(zip(indices.tolist(), weights.tolist()))
+        for neighbour, amount in changes.items():
+            merged[neighbour] = merged.get(neighbour, 0) + amount
+        merged = {neighbour: weight for neighbour, weight in merged.items() if weight > 0}
+        return (
+            np.fromiter(merged.keys(), dtype=np.int64, count=len(merged)),
+            np.fromiter(merged.values(), dtype=np.int64, count=len(merged)),
+        )
+
+
+class CollaborationGraph(ProcessIndex):
+    """
+    In-memory collaboration graph with one- and two-hop queries.
+
+    Changes:
+        ("project", project_id, owner_id): A project was created.
+        ("join", project_id, owner_id, user_id): A member was accepted.
+        ("leave", project_id, user_id): A member was removed.
+        ("drop", project_id): A project was deleted.
+
+    Attributes:
+        max_age (float): Seconds after which the graph is reloaded.
+        compact_threshold (int): Overlay size that triggers a compaction.
+    """
+
+    name = "collab-graph"
+
+    def __init__(self, max_age, compact_threshold):
+        super().__init__(max_age)
+        self.compact_threshold = compact_threshold
+
+    def _load(self):
+        """Read every project team from the database (two queries)."""
+        teams, owners = {}, {}
+
+        for project_id, owner_id in ProjectLead.objects.values_list("id", "owner_id").iterator(chunk_size=10_000):
+            teams[project_id] = {owner_id}
+            owners[project_id] = owner_id
+
+        members = ProjectMembers.objects.values_list("project_id", "member_id")
+        for project_id, member_id in members.iterator(chunk_size=10_000):
+            if project_id in teams:
+                teams[project_id].add(member_id)
+
+        return _Graph(teams, owners)
+
+    def _apply(self, state, change):
+        kind, project_id, *rest = change
+
+        if kind == "project":
+            state.join(project_id, rest[0], rest[0])
+        elif kind == "join":
+            state.join(project_id, *rest)
+        elif kind == "leave":
+            state.leave(project_id, *rest)
+        elif kind == "drop":
+            state.drop(project_id)
+
+    def _snapshot(self, state):
+        if state.delta_size <= self.compact_threshold:
+            return None
+        return {project_id: set(team) for project_id, team in state.teams.items()}, dict(state.owners)
+
+    def _compact(self, snapshot):
+        return _Graph(*snapshot)
+
+    def collaborators(self, user_id):
+        """
+        Return the users a user has shared a project with.
+
+        Returns:
+            list[tuple[int, int]]: `(user_id, shared_projects)`, most shared
+            first.
+        """
+        self._ensure_built()
+
+        with self._lock:
+            graph = self._state
+            if user_id not in graph.node:
+                return []
+
+            indices, weights = graph.row(graph.node[user_id])
+            order = np.lexsort((indices, -weights))
+            return [(graph.users[i], int(w)) for i, w in zip(indices[order].tolist(), weights[order].tolist())]
+
+    def suggestions(self, user_id, limit=20):
+        """
+        Return friends of collaborators: users two hops away who are not
+        already collaborators.
+
+        Each suggestion is scored by the sum, over the mutual collaborators,
+        of the product of the two edge weights.
+
+        Returns:
+            list[tuple[int, int, int]]: `(user_id, score, mutual)`, best
+            first, at most `limit` entries.
+        """
+        self._ensure_built()
+
+        with self._lock:
+            graph = self._state
+            if user_id not in graph.node:
+                return []
+
+            me = graph.node[user_id]
+            first, first_weights = graph.row(me)
+            if not len(first):
+                return []
+
+            reached, strength = [], []
+            for neighbour, weight in zip(first.tolist(), first_weights.tolist()):
+                indices, weights = graph.row(neighbour)
+                reached.append(indices)
+                strength.append(weights * weight)
+
+            reached = np.concatenate(reached)
+            strength = np.concatenate(strength)
+
+            keep = ~np.isin(reached, first) & (reached != me)
+            nodes, inverse = np.unique(reached[keep], return_inverse=True)
+            if not len(nodes):
+                return []
+
+            scores = np.bincount(inverse, weights=strength[keep]).astype(np.int64)
+            mutual = np.bincount(inverse)
+
+            if len(nodes) > limit:
+                # Only sort the best `limit` candidates
+                top = np.argpartition(-scores, limit - 1)[:limit]
+                nodes, scores, mutual = nodes[top], scores[top], mutual[top]
+
+            order = np.lexsort((nodes, -mutual, -scores))
+            return [
+                (graph.users[n], int(s), int(m))
+                for n, s, m in zip(nodes[order].tolist(), scores[order].tolist(), mutual[order].tolist())
+            ]
+
+
+collaboration_graph = CollaborationGraph(
+    max_age=getattr(settings, "COLLAB_GRAPH_MAX_AGE", 300),
+    compact_threshold=getattr(settings, "COLLAB_GRAPH_COMPACT_THRESHOLD", 10_000),
+)
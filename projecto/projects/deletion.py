@@ -0,0 +1,257 @@
+"""
+deletion.py
+
+This module deletes user accounts without one long cascading delete.
+
+Deleting a `Users` row cascades to the user's projects (with all their
+requests, members and rejections), the user's own requests, memberships,
+rejections and tokens in a single transaction. `request_account_deletion()`
+instead only does what must happen at once: the account is deactivated (so
+its access tokens stop authenticating), its refresh tokens are blacklisted,
+its projects are archived and an `AccountDeletion` row records the request.
+
+A queued task (or the `process_account_deletions` command) then deletes the
+account's rows stage by stage (`STAGES`), one bounded batch per transaction.
+The progress row is updated and locked in the same transaction as the
+batch, so a worker that crashes loses at most an uncommitted batch and the
+next run resumes at the stage it reached, and two workers never process the
+same account. The user row itself is deleted last, when nothing references
+it any more.
+"""
+
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .archival import archive_projects, delete_rows, purge_step
+from .collabgraph import collaboration_graph
+from .models import (
+    AccountDeletion, DailyOwnerStats, DailySkillRequests, ExpiredProjectRequest, IdempotencyKey, ProjectInvitation,
+    OutboxEvent, ProjectLead, ProjectMembers, ProjectRequest, ProjectRequestRejected, Task, Tombstone,
+)
+from .outbox import event, record_many
+from .taskqueue import enqueue
+from .versioning import PROJECTS_KEY, bump_versions, project_key, user_key
+
+User = get_user_model()
+
+
+def revoke_tokens(user):
+    """Blacklist every refresh token of a user that is not blacklisted yet."""
+    tokens = OutstandingToken.objects.filter(user=user, blacklistedtoken__isnull=True).values_list("id", flat=True)
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token_id=token_id) for token_id in tokens], ignore_conflicts=True
+    )
+
+
+def request_account_deletion(user):
+    """
+    Deactivate an account, revoke its tokens and schedule its deletion.
+
+    Parameters:
+        user (Users): The account to delete.
+
+    Returns:
+        AccountDeletion: The deletion progress row (the existing one when
+        the deletion was already requested).
+    """
+    with transaction.atomic():
+        deletion, created = AccountDeletion.objects.get_or_create(user=user, defaults={"email": user.email})
+        user.is_active = False
+        user.save(update_fields=["is_active"])
+        revoke_tokens(user)
+        archive_projects(ProjectLead.objects.filter(owner=user))
+        if created:
+            enqueue("projects.process_account_deletion", lane=Task.LOW, deletion_id=deletion.pk)
+
+    return deletion
+
+
+def _rows(queryset, fields, batch_size):
+    return list(queryset.order_by("id").values_list("id", *fields)[:batch_size])
+
+
+def _delete_projects(deletion, batch_size):
+    """Purge one batch of the user's first remaining project."""
+    project = ProjectLead.all_objects.filter(owner_id=deletion.user_id).order_by("id").first()
+    if project is None:
+        return 0
+    if project.archived_at is None:
+        archive_projects(ProjectLead.objects.filter(pk=project.pk))
+        project.refresh_from_db()
+
+    step = purge_step(project, batch_size)
+    return step[1] if step else 0
+
+
+def _delete_applications(model, kind, deletion, batch_size):
+    """
+    Delete a batch of the user's join requests or memberships in other
+    users' projects, with their tombstones and version bumps.
+    """
+    rows = _rows(
+        model.objects.filter(member_id=deletion.user_id),
+        ["project_id", "project__owner_id", "project__owner__email", "project__projectname"],
+        batch_size,
+    )
+    if not rows:
+        return 0
+
+    delete_rows(model, [row[0] for row in rows])
+
+    Tombstone.objects.bulk_create([
+        Tombstone(kind=kind, object_id=row_id, user_id=user_id)
+        for row_id, _, owner_id, _, _ in rows
+        for user_id in {deletion.user_id, owner_id}
+    ])
+    keys = {user_key(deletion.email)}
+    for _, _, _, owner_email, projectname in rows:
+        keys.update([user_key(owner_email), project_key(owner_email, projectname)])
+
+    if model is ProjectMembers:
+        # Free the seats, leave the teams and tell the owners, as removed
+        # members do
+        for project_id, count in Counter(row[1] for row in rows).items():
+            ProjectLead.all_objects.filter(pk=project_id).update(seats_taken=Greatest(F("seats_taken") - count, 0))
+        keys.add(PROJECTS_KEY)
+
+        record_many([
+            event(OutboxEvent.MEMBER_LEFT, project_id, deletion.user_id, owner=owner_id, projectname=projectname)
+            for _, project_id, owner_id, _, projectname in rows
+        ])
+
+        changes = [("leave", project_id, deletion.user_id) for _, project_id, *_ in rows]
+        transaction.on_commit(lambda: [collaboration_graph.apply(change) for change in changes])
+
+    bump_versions(keys)
+    return len(rows)
+
+
+def _delete_rejections(deletion, batch_size):
+    """Delete a batch of the user's rejections and bump the owners' versions."""
+    rows = _rows(
+        ProjectRequestRejected.objects.filter(user_id=deletion.user_id),
+        ["project__owner__email", "project__projectname"],
+        batch_size,
+    )
+    if not rows:
+        return 0
+
+    delete_rows(ProjectRequestRejected, [row[0] for row in rows])
+
+    keys = {user_key(deletion.email)}
+    for _, owner_email, projectname in rows:
+        keys.update([user_key(owner_email), project_key(owner_email, projectname)])
+    bump_versions(keys)
+    return len(rows)
+
+
+def _delete_all(model, field):
+    """Stage deleting a batch of the user's rows of a table nobody else lists."""
+
+    def delete(deletion, batch_size):
+        rows = _rows(model.objects.filter(**{field: deletion.user_id}), [], batch_size)
+        if rows:
+            delete_rows(model, [row[0] for row in rows])
+        return len(rows)
+
+    return delete
+
+
+def _delete_tokens(deletion, batch_size):
+    """Delete a batch of the user's tokens and their blacklist entries."""
+    ids = [row[0] for row in _rows(OutstandingToken.objects.filter(user_id=deletion.user_id), [], batch_size)]
+    if ids:
+        OutstandingToken.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def _delete_user(deletion, batch_size):
+    """Delete the user row, which nothing references any more."""
+    if deletion.user_id is None:
+        return 0
+    User.objects.filter(pk=deletion.user_id).delete()
+    deletion.user_id = None
+    return 1
+
+
+# Deletion stages in order, each deleting one batch per call and returning
+# the number of rows deleted (0 once the stage is finished)
+STAGES = {
+    "projects": _delete_projects,
+    "requests": lambda deletion, batch_size: _delete_applications(
+        ProjectRequest, Tombstone.REQUEST, deletion, batch_size
+    ),
+    "memberships": lambda deletion, batch_size: _delete_applications(
+        ProjectMembers, Tombstone.MEMBER, deletion, batch_size
+    ),
+    "rejections": _delete_rejections,
+    "invitations": _delete_all(ProjectInvitation, "user_id"),
+    "expired_requests": _delete_all(ExpiredProjectRequest, "member_id"),
+    "owner_stats": _delete_all(DailyOwnerStats, "owner_id"),
+    "skill_stats": _delete_all(DailySkillRequests, "owner_id"),
+    "idempotency_keys": _delete_all(IdempotencyKey, "user_id"),
+    "tombstones": _delete_all(Tombstone, "user_id"),
+    "tokens": _delete_tokens,
+    "user": _delete_user,
+}
+
+
+def _step(deletion_id, batch_size):
+    """
+    Run one batch of an account deletion and record its progress.
+
+    Returns:
+        tuple[str, int] | None: Stage and rows deleted, or None when the
+        deletion is complete or being processed by another worker.
+    """
+    with transaction.atomic():
+        deletion = (
+            AccountDeletion.objects.select_for_update(skip_locked=True)
+            .filter(pk=deletion_id, completed_at__isnull=True)
+            .first()
+        )
+        if deletion is None:
+            return None
+
+        stage = deletion.stage
+        deleted = STAGES[stage](deletion, batch_size)
+
+        if deleted:
+            deletion.deleted_rows += deleted
+        else:
+            stages = list(STAGES)
+            position = stages.index(stage) + 1
+            if position < len(stages):
+                deletion.stage = stages[position]
+            else:
+                deletion.completed_at = timezone.now()
+        deletion.save()
+
+    return stage, deleted
+
+
+def process_deletion(deletion_id, batch_size=1000):
+    """
+    Delete an account's data, resuming where an earlier run stopped.
+
+    Parameters:
+        deletion_id (int): Primary key of the `AccountDeletion`.
+        batch_size (int): Rows deleted per transaction.
+
+    Yields:
+        tuple[str, int]: Stage and number of rows of each batch.
+    """
+    while (step := _step(deletion_id, batch_size)) is not None:
+        if step[1]:
+            yield step
+
+
+def pending_deletions():
+    """Account deletions not completed yet, oldest first."""
+    return AccountDeletion.objects.filter(completed_at__isnull=True).order_by("requested_at", "id")
@@ -0,0 +1,172 @@
+"""
+digests.py
+
+This module sends the daily digest emails: every owner who received join
+requests in the digest window (the last `--hours` of send_digests, one day
+by default) gets a summary of the requests waiting on their active
+projects.
+
+The summaries of all owners come from one grouped query over the pending
+requests (one row per project with its pending and new counts, in owner
+order), streamed and folded into one summary per owner, so the cost does
+not grow with a query per owner or project. The summaries are cut into
+batches of `DIGEST_BATCH_SIZE` owners, and a pool of `DIGEST_WORKERS`
+processes renders each batch from `projects/digest_email.txt` and sends it
+over one connection of the configured email backend, so both rendering and
+the mail server round trips run in parallel while the query streams on.
+
+Owners are processed in id order and batches are reported in that order
+with their last owner, so an interrupted run can resume after it instead of
+mailing everyone again (only the batches that were in flight may be sent
+twice).
+"""
+
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections
+from django.db.models import Count, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .bulk_io import chunked
+from .models import ProjectRequest
+
+
+def digest_since(hours=24):
+    """Requests received after this moment count as new."""
+    return timezone.now() - timedelta(hours=hours)
+
+
+def pending_summaries(since, start_after=0):
+    """
+    Summarize the pending join requests of every owner with one query.
+
+    Parameters:
+        since (datetime): Requests received after this are new.
+        start_after (int): Only owners with a greater id.
+
+    Yields:
+        dict: `owner_id`, `email`, `firstname`, `pending` and `new` totals
+        and `projects` (`name`, `pending`, `new`), in owner id order, for
+        owners with at least one new request.
+    """
+    rows = (
+        ProjectRequest.objects.filter(
+            project__archived_at__isnull=True,
+            project__owner__is_active=True,
+            project__owner_id__gt=start_after,
+        )
+        .values("project__owner_id", "project__owner__email", "project__owner__firstname", "project__projectname")
+        .annotate(pending=Count("id"), new=Count("id", filter=Q(created_at__gte=since)))
+        .order_by("project__owner_id", "project__projectname")
+    )
+
+    for owner_id, group in groupby(rows.iterator(chunk_size=5000), key=itemgetter("project__owner_id")):
+        projects = list(group)
+        new = sum(project["new"] for project in projects)
+        if not new:
+            continue
+        yield {
+            "owner_id": owner_id,
+            "email": projects[0]["project__owner__email"],
+            "firstname": projects[0]["project__owner__firstname"],
+            "pending": sum(project["pending"] for project in projects),
+            "new": new,
+            "projects": [
+                {"name": project["project__projectname"], "pending": project["pending"], "new": project["new"]}
+                for project in projects
+            ],
+        }
+
+
+def render_digest(summary, hours):
+    """
+    Render one owner's digest.
+
+    Parameters:
+        summary (dict): One owner's summary from `pending_summaries()`.
+        hours (int): Length of the digest window, shown in the email.
+
+    Returns:
+        tuple[str, str, str]: Subject, body and recipient.
+    """
+    new = summary["new"]
+    subject = f"{new} new join request{'s' if new != 1 else ''} for your projects"
+    body = render_to_string(
+        "projects/digest_email.txt", {**summary, "hours": hours, "dashboard_url": settings.DIGEST_DASHBOARD_URL}
+    )
+    return subject, body, summary["email"]
+
+
+def send_batch(batch, hours, backend=None):
+    """
+    Render a batch of digests and send them over one email backend
+    connection.
+
+    Returns:
+        tuple[int, int]: Emails sent and the batch's last owner id.
+    """
+    messages = [
+        EmailMessage(subject, body, to=[to])
+        for subject, body, to in (render_digest(summary, hours) for summary in batch)
+    ]
+    with get_connection(backend) as connection:
+        connection.send_messages(messages)
+    return len(messages), batch[-1]["owner_id"]
+
+
+def send_digests(since, workers=None, batch_size=None, start_after=0, backend=None):
+    """
+    Render and send the digests of every owner with new requests.
+
+    Parameters:
+        since (datetime): Requests received after this are new.
+        workers (int, optional): Processes rendering and sending batches
+                                 (`DIGEST_WORKERS`); 0 or 1 does it all in
+                                 this process.
+        batch_size (int, optional): Emails per batch (`DIGEST_BATCH_SIZE`).
+        start_after (int): Resume after this owner id.
+        backend (str, optional): Email backend path (`EMAIL_BACKEND`).
+
+    Yields:
+        tuple[int, int]: Emails sent and last owner id of each batch, in
+        owner order.
+    """
+    workers = settings.DIGEST_WORKERS if workers is None else workers
+    batch_size = batch_size or settings.DIGEST_BATCH_SIZE
+    hours = max(round((timezone.now() - since).total_seconds() / 3600), 1)
+    batches = chunked(pending_summaries(since, start_after), batch_size)
+
+    if workers <= 1:
+        for batch in batches:
+            yield send_batch(batch, hours, backend)
+        return
+
+    # Fork the workers before the query runs, so they share no open
+    # database connection (unless a transaction must be kept open), and
+    # start them all up front
+    if not connections["default"].in_atomic_block:
+        connections.close_all()
+    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"))
+    pool.submit(int).result()
+
+    # A few batches per worker are in flight while the query streams on;
+    # results are reported in order, so the last owner of a batch is a safe
+    # point to resume after
+    in_flight = deque()
+    try:
+        for batch in batches:
+            in_flight.append(pool.submit(send_batch, batch, hours, backend))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+    finally:
+        pool.shutdown(cancel_futures=True)
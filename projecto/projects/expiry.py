@@ -0,0 +1,106 @@
+"""
+expiry.py
+
+This module expires join requests that have been pending for too long: they
+are moved to `ExpiredProjectRequest` and removed from `ProjectRequest`, so
+pending lists only show live applications.
+
+Requests are processed oldest first, in batches read through the
+`(created_at, id)` index. Each batch is one short transaction that locks its
+rows with `SELECT ... FOR UPDATE SKIP LOCKED`, so rows being accepted,
+rejected or withdrawn at the same moment are skipped instead of waited
+for; they are picked up by a later run if still pending. Removed requests
+leave tombstones and bump the affected versions like a regular delete, but
+in bulk for the whole batch.
+"""
+
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ExpiredProjectRequest, ProjectRequest, Tombstone
+from .versioning import bump_versions, project_key, user_key
+
+
+def expiry_cutoff(days):
+    """Requests sent before this moment are expired."""
+    return timezone.now() - timedelta(days=days)
+
+
+def _expire_batch(cutoff, after, batch_size):
+    """
+    Expire one batch of requests sent before `cutoff`.
+
+    Parameters:
+        cutoff (datetime): Expire requests created before this.
+        after (tuple | None): `(created_at, id)` of the last request seen;
+                              the batch starts after it.
+        batch_size (int): Maximum number of requests.
+
+    Returns:
+        tuple[int, tuple | None]: Requests expired and the position of the
+        last one, or `(0, None)` when no request is left.
+    """
+    queryset = ProjectRequest.objects.filter(created_at__lt=cutoff)
+    if after is not None:
+        created_at, request_id = after
+        queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=request_id))
+
+    with transaction.atomic():
+        rows = list(
+            queryset.order_by("created_at", "id")
+            .select_for_update(skip_locked=True, of=("self",))
+            .values_list(
+                "id", "project_id", "member_id", "message", "created_at",
+                "member__email", "project__owner_id", "project__owner__email", "project__projectname",
+            )[:batch_size]
+        )
+        if not rows:
+            return 0, None
+
+        ExpiredProjectRequest.objects.bulk_create([
+            ExpiredProjectRequest(project_id=project_id, member_id=member_id, message=message, created_at=created_at)
+            for _, project_id, member_id, message, created_at, *_ in rows
+        ])
+
+        # A plain DELETE: the ORM would fetch every row again to send the
+        # delete signals, whose work is done below for the whole batch
+        table = connection.ops.quote_name(ProjectRequest._meta.db_table)
+        ids = [row[0] for row in rows]
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+
+        tombstones, touched = [], set()
+        for request_id, _, member_id, _, _, member_email, owner_id, owner_email, projectname in rows:
+            tombstones += [
+                Tombstone(kind=Tombstone.REQUEST, object_id=request_id, user_id=user_id)
+                for user_id in {member_id, owner_id}
+            ]
+            touched.update([user_key(member_email), user_key(owner_email), project_key(owner_email, projectname)])
+        Tombstone.objects.bulk_create(tombstones)
+        bump_versions(touched)
+
+    return len(rows), (rows[-1][4], rows[-1][0])
+
+
+def expire_requests(days, batch_size=1000):
+    """
+    Expire every request pending for more than `days` days.
+
+    Parameters:
+        days (int): Age after which a pending request expires.
+        batch_size (int): Requests per batch.
+
+    Yields:
+        int: Number of requests expired by each batch.
+    """
+    cutoff = expiry_cutoff(days)
+    after = None
+
+    while True:
+        expired, after = _expire_batch(cutoff, after, batch_size)
+        if not expired:
+            return
+        yield expired
@@ -0,0 +1,133 @@
+"""
+idempotency.py
+
+This module implements `Idempotency-Key` support for create endpoints. The
+first request carrying a key runs normally and its response is stored; any
+retry with the same key and the same body replays the stored response
+without touching the underlying tables. Reusing a key for a different
+request is rejected with 422.
+
+Keys are scoped per user and expire after `IDEMPOTENCY_KEY_TTL_HOURS`.
+Server errors (5xx) are never stored, so those requests can be retried.
+
+A key is reserved before the request runs, by inserting its row with no
+response yet under the (user, key) unique constraint, so two concurrent
+requests with the same key never both run: the second one waits for the
+first's insert and then gets 409 Conflict while the first is in progress,
+or the stored response once it is done. A reservation left behind by a
+request that died is taken over after `IDEMPOTENCY_KEY_LOCK_SECONDS`.
+"""
+
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+
+def request_fingerprint(request):
+    """
+    Hash the method, path and body of a request.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method}|{request.path}|{body}".encode()).hexdigest()
+
+
+def idempotent(create):
+    """
+    Decorate a viewset's `create` action to honour the `Idempotency-Key` header.
+
+    Replays the stored response for a known key, rejects a key reused for a
+    different request or still in progress, and reserves the key of a new
+    request before running it, then stores its response.
+    """
+
+    @functools.wraps(create)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return create(self, request, *args, **kwargs)
+
+        if len(key) > 255:
+            return Response(
+                {"error": "Idempotency-Key must be at most 255 characters"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fingerprint = request_fingerprint(request)
+        now = timezone.now()
+        ttl = timedelta(hours=getattr(settings, "IDEMPOTENCY_KEY_TTL_HOURS", 24))
+        lock = timedelta(seconds=getattr(settings, "IDEMPOTENCY_KEY_LOCK_SECONDS", 60))
+
+        stored = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+        if stored is not None and _expired(stored, now, ttl, lock):
+            IdempotencyKey.objects.filter(pk=stored.pk, created_at=stored.created_at).delete()
+            stored = None
+
+        if stored is None:
+            stored, reserved = IdempotencyKey.objects.insert_or_get(
+                ("user", "key"), user=request.user, key=key, fingerprint=fingerprint, status_code=None,
+            )
+            if reserved:
+                return _run_reserved(create, stored, self, request, *args, **kwargs)
+
+        return _replay(stored, fingerprint)
+
+    return wrapper
+
+
+def _expired(stored, now, ttl, lock):
+    """Whether a stored key is past its TTL, or a reservation abandoned."""
+    if stored.status_code is None:
+        return stored.created_at < now - lock
+    return stored.created_at < now - ttl
+
+
+def _replay(stored, fingerprint):
+    """Answer a request whose key is already stored or reserved."""
+    if stored.fingerprint != fingerprint:
+        return Response(
+            {"error": "Idempotency-Key was already used for a different request"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if stored.status_code is None:
+        return Response(
+            {"error": "A request with this Idempotency-Key is still in progress"},
+            status=status.HTTP_409_CONFLICT,
+        )
+    return Response(
+        stored.response_body,
+        status=stored.status_code,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def _run_reserved(create, reservation, view, request, *args, **kwargs):
+    """
+    Run a request whose key was just reserved and store its response, or
+    release the key when it fails with a server error.
+    """
+    try:
+        response = create(view, request, *args, **kwargs)
+    except BaseException:
+        reservation.delete()
+        raise
+
+    if response.status_code >= 500:
+        reservation.delete()
+    else:
+        IdempotencyKey.objects.filter(pk=reservation.pk).update(
+            status_code=response.status_code,
+            response_body=response.data,
+            created_at=timezone.now(),
+        )
+    return response
@@ -0,0 +1,87 @@
+"""
+lookups.py
+
+This module centralizes the user-by-email and project-by-name lookups used
+throughout the projects views and serializers.
+
+Outside a batch the helpers simply query the database. Inside
+`lookup_scope()` (used by the batch endpoint) successful lookups are
+memoized, so several sub-requests referring to the same users and projects
+resolve each of them only once. Remembered projects are dropped with
+`forget_projects()` after every sub-request that may write, since it may
+have archived, deleted or resized one of them.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.contrib.auth import get_user_model
+
+from .models import ProjectLead
+
+User = get_user_model()
+
+_memo = ContextVar("lookup_memo", default=None)
+
+
+@contextmanager
+def lookup_scope(*users):
+    """
+    Memoize lookups made inside the block.
+
+    Only successful lookups are remembered; a missing user or project is
+    looked up again the next time, so rows created earlier in the same
+    scope are found.
+
+    Parameters:
+        *users (Users): Already loaded users to seed the memo with,
+                        e.g. the authenticated user.
+    """
+    memo = {("user", user.email): user for user in users}
+    token = _memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _memo.reset(token)
+
+
+def get_user(email):
+    """
+    Return the user with the given email.
+
+    Raises:
+        User.DoesNotExist: If no user has this email.
+    """
+    memo = _memo.get()
+    if memo is None:
+        return User.objects.get(email=email)
+
+    key = ("user", email)
+    if key not in memo:
+        memo[key] = User.objects.get(email=email)
+    return memo[key]
+
+
+def forget_projects():
+    """Drop the projects remembered by the current scope, if any."""
+    memo = _memo.get()
+    if memo is not None:
+        for key in [key for key in memo if key[0] == "project"]:
+            del memo[key]
+
+
+def get_project(owner, projectname):
+    """
+    Return the project with the given name owned by `owner`.
+
+    Raises:
+        ProjectLead.DoesNotExist: If the owner has no such project.
+    """
+    memo = _memo.get()
+    if memo is None:
+        return ProjectLead.objects.get(owner=owner, projectname=projectname)
+
+    key = ("project", owner.pk, projectname)
+    if key not in memo:
+        memo[key] = ProjectLead.objects.get(owner=owner, projectname=projectname)
+    return memo[key]
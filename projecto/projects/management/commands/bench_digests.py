@@ -0,0 +1,78 @@
+"""
+bench_digests.py
+
+Load test for the daily digests. Creates `--owners` temporary owners
+(emails prefixed with `bench-`), each with a project and `--requests` new
+join requests, then renders and "sends" every digest through the in-memory
+email backend, reporting the time taken and digests per second. The
+temporary rows are deleted afterwards. Run it against PostgreSQL for
+representative numbers.
+
+Usage:
+    python manage.py bench_digests --owners 100000 --workers 8
+"""
+
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from projects.archival import delete_rows
+from projects.bulk_io import chunked
+from projects.digests import digest_since, send_digests
+from projects.models import ProjectLead, ProjectRequest
+
+User = get_user_model()
+
+LOCMEM_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+
+class Command(BaseCommand):
+    help = "Measure daily digest throughput with temporary owners."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--owners", type=int, default=10_000)
+        parser.add_argument("--requests", type=int, default=3)
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        run = uuid.uuid4().hex[:8]
+        prefix = f"bench-{run}-"
+        total = options["owners"]
+
+        start = time.perf_counter()
+        User.objects.bulk_create([
+            User(email=f"{prefix}{i}@example.com", firstname="Bench", lastname=str(i))
+            for i in range(total + options["requests"])
+        ], batch_size=5000)
+        users = list(User.objects.filter(email__startswith=prefix).order_by("id").values_list("id", flat=True))
+        owners, applicants = users[:total], users[total:]
+
+        ProjectLead.objects.bulk_create([
+            ProjectLead(owner_id=owner_id, projectname=f"bench-{run}", description="Load test")
+            for owner_id in owners
+        ], batch_size=5000)
+        projects = list(ProjectLead.objects.filter(projectname=f"bench-{run}").values_list("id", flat=True))
+        ProjectRequest.objects.bulk_create([
+            ProjectRequest(project_id=project_id, member_id=member_id, message="Load test")
+            for project_id in projects
+            for member_id in applicants
+        ], batch_size=5000)
+        self.stdout.write(f"created {total} owners in {time.perf_counter() - start:.1f} s")
+
+        try:
+            start = time.perf_counter()
+            sent = sum(
+                count for count, _ in send_digests(
+                    digest_since(1), options["workers"], options["batch_size"], backend=LOCMEM_BACKEND
+                )
+            )
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"sent {sent} digests in {elapsed:.1f} s ({sent / elapsed:.0f}/s)")
+        finally:
+            requests = list(ProjectRequest.objects.filter(member_id__in=applicants).values_list("id", flat=True))
+            for model, ids in [(ProjectRequest, requests), (ProjectLead, projects), (User, users)]:
+                for chunk in chunked(ids, 500):
+                    delete_rows(model, chunk)
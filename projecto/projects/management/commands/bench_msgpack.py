@@ -0,0 +1,64 @@
+"""
+bench_msgpack.py
+
+Management command that compares the JSON and MessagePack renderers/parsers
+on a synthetic project listing shaped like the `/api/projects/` and
+`/api/joinedprojects/` responses. Reports payload size and the average
+encode/decode time for each format.
+
+Usage:
+    python manage.py bench_msgpack --rows 5000 --repeat 20
+"""
+
+import io
+import timeit
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from projecto.renderers import MessagePackParser, MessagePackRenderer
+
+
+class Command(BaseCommand):
+    help = "Benchmark JSON vs MessagePack payload size and encode/decode time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        repeat = options["repeat"]
+
+        data = [
+            {
+                "owner_email": f"owner{i}@example.com",
+                "fname": f"First{i}",
+                "lname": f"Last{i}",
+                "projectname": f"Project {i}",
+                "description": "A collaborative project looking for contributors. " * 4,
+                "frontend": i % 2 == 0,
+                "backend": i % 3 == 0,
+            }
+            for i in range(rows)
+        ]
+
+        formats = [
+            ("json", JSONRenderer(), JSONParser()),
+            ("msgpack", MessagePackRenderer(), MessagePackParser()),
+        ]
+
+        self.stdout.write(f"{rows} rows, {repeat} repetitions")
+        self.stdout.write(f"{'format':<10}{'bytes':>12}{'encode ms':>12}{'decode ms':>12}")
+
+        for name, renderer, parser in formats:
+            payload = renderer.render(data)
+            assert parser.parse(io.BytesIO(payload)) == data
+
+            encode = timeit.timeit(lambda: renderer.render(data), number=repeat) / repeat
+            decode = timeit.timeit(lambda: parser.parse(io.BytesIO(payload)), number=repeat) / repeat
+
+            self.stdout.write(
+                f"{name:<10}{len(payload):>12}{encode * 1000:>12.2f}{decode * 1000:>12.2f}"
+            )
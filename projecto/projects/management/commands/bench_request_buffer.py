@@ -0,0 +1,91 @@
+"""
+bench_request_buffer.py
+
+Load test for the join request group-commit buffer. Simulates a burst of
+applicants requesting the same popular project from many concurrent threads
+and reports insert throughput with and without batching.
+
+The command creates its own temporary owner, project and applicants (emails
+prefixed with `bench-`) and deletes them afterwards. Run it against
+PostgreSQL for representative numbers.
+
+Usage:
+    python manage.py bench_request_buffer --requests 2000 --threads 32
+"""
+
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from projects.models import ProjectLead, ProjectRequest
+from projects.writebuffer import submit_project_request
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Compare join request insert throughput with and without group commit."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--threads", type=int, default=32)
+
+    def handle(self, *args, **options):
+        total = options["requests"]
+        threads = options["threads"]
+        run = uuid.uuid4().hex[:8]
+
+        owner = User.objects.create(email=f"bench-{run}-owner@example.com", firstname="Bench", lastname="Owner")
+        User.objects.bulk_create([
+            User(email=f"bench-{run}-{i}@example.com", firstname="Bench", lastname=str(i))
+            for i in range(total * 2)
+        ])
+        applicants = list(User.objects.filter(email__startswith=f"bench-{run}-").exclude(pk=owner.pk))
+        project = ProjectLead.objects.create(owner=owner, projectname=f"bench-{run}", description="Load test")
+
+        def direct(member):
+            return ProjectRequest.objects.insert_or_get(
+                ("project", "member"), project=project, member=member, message="Load test"
+            )
+
+        def buffered(member):
+            return submit_project_request(project, member, "Load test")
+
+        try:
+            self.stdout.write(f"{total} join requests from {threads} threads")
+            for name, insert, members in [
+                ("direct", direct, applicants[:total]),
+                ("buffered", buffered, applicants[total:]),
+            ]:
+                elapsed = self.burst(insert, members, threads)
+                self.stdout.write(f"{name:<10}{elapsed:>8.2f} s{total / elapsed:>12.0f} rows/s")
+        finally:
+            User.objects.filter(email__startswith=f"bench-{run}-").delete()
+
+    def burst(self, insert, members, threads):
+        """
+        Insert one request per member from `threads` concurrent workers.
+
+        Returns:
+            float: Wall-clock seconds for the whole burst.
+        """
+        chunks = [members[i::threads] for i in range(threads)]
+
+        def worker(chunk):
+            try:
+                for member in chunk:
+                    insert(member)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - start
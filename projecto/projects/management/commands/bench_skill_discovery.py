@@ -0,0 +1,103 @@
+"""
+bench_skill_discovery.py
+
+Benchmark for skill-filtered project discovery. Loads a large number of
+projects with random skill masks and times the bitwise discovery filters
+used by `ProjectsDisplayView` (count and first page) against the legacy
+boolean filter.
+
+The command creates its own temporary owner and projects (emails prefixed
+with `bench-`) and deletes them afterwards. Run it against PostgreSQL for
+representative numbers.
+
+Usage:
+    python manage.py bench_skill_discovery --projects 1000000
+"""
+
+import random
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import F
+
+from accounts.skills import SKILLS, flags_mask, mask_for
+from projects.models import HAS_OPEN_SEATS, ProjectLead
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Time skill-filtered project discovery over many projects."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--projects", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        run = uuid.uuid4().hex[:8]
+        owner = User.objects.create(email=f"bench-{run}-owner@example.com", firstname="Bench", lastname="Owner")
+
+        try:
+            start = time.perf_counter()
+            self.load(owner, options["projects"], options["batch_size"], rng)
+            self.stdout.write(f"loaded {options['projects']} projects in {time.perf_counter() - start:.1f} s")
+
+            cases = [
+                ("legacy frontend=true", lambda qs: qs.filter(frontend=True)),
+                ("one skill", self.matching(mask_for(["rust"]))),
+                ("three skills", self.matching(mask_for(["python", "django", "sql"]))),
+                ("user profile (5)", self.matching(mask_for(rng.sample(SKILLS, 5)))),
+            ]
+            base = ProjectLead.objects.filter(HAS_OPEN_SEATS, owner=owner)
+
+            self.stdout.write(f"{'filter':<24}{'matches':>10}{'count ms':>12}{'page ms':>12}")
+            for name, apply in cases:
+                queryset = apply(base)
+                matches, count_ms = self.timed(queryset.count, options["repeat"])
+                _, page_ms = self.timed(lambda: list(queryset.order_by("-id")[:20]), options["repeat"])
+                self.stdout.write(f"{name:<24}{matches:>10}{count_ms:>12.1f}{page_ms:>12.1f}")
+        finally:
+            # Plain DELETE: the ORM would load every row to run the delete signals
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {ProjectLead._meta.db_table} WHERE owner_id = %s", [owner.pk])
+            owner.delete()
+
+    def load(self, owner, total, batch_size, rng):
+        """Bulk-insert `total` projects needing one to three random skills."""
+        for offset in range(0, total, batch_size):
+            batch = []
+            for i in range(offset, min(offset + batch_size, total)):
+                skills = mask_for(rng.sample(SKILLS, rng.randint(1, 3)))
+                batch.append(ProjectLead(
+                    owner=owner,
+                    projectname=f"bench-{i}",
+                    description="Benchmark project",
+                    frontend=bool(skills & flags_mask(True, False)),
+                    backend=bool(skills & flags_mask(False, True)),
+                    skills=skills,
+                ))
+            ProjectLead.objects.bulk_create(batch)
+
+    def matching(self, mask):
+        """Return a filter keeping projects that need any skill in `mask`."""
+        return lambda qs: qs.alias(skill_match=F("skills").bitand(mask)).filter(skill_match__gt=0)
+
+    def timed(self, query, repeat):
+        """
+        Run a query `repeat` times.
+
+        Returns:
+            tuple: The last result and the best time in milliseconds.
+        """
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = query()
+            best = min(best, time.perf_counter() - start)
+        return result, best * 1000
@@ -0,0 +1,64 @@
+"""
+bench_task_queue.py
+
+Throughput benchmark of the database task queue. Enqueues `--tasks` no-op
+tasks in the high lane and drains them with a pool of workers, once per
+claim batch size, reporting enqueue and processing rates. Since the
+workers serve the whole high lane, other high-lane tasks due at the time
+are run too.
+
+Run it against PostgreSQL for representative numbers: SQLite serializes
+writers, so concurrent workers mostly measure lock waits.
+
+Usage:
+    python manage.py bench_task_queue --tasks 20000 --workers 8
+    python manage.py bench_task_queue --mode process --batch-sizes 1,10,100
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.models import Task
+from projects.taskqueue import enqueue_many, task
+
+from .run_tasks import run_pool
+
+
+@task("bench.noop")
+def noop():
+    pass
+
+
+class Command(BaseCommand):
+    help = "Measure task queue throughput with no-op tasks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=10_000)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+        parser.add_argument("--batch-sizes", default="1,10,50")
+
+    def handle(self, *args, **options):
+        try:
+            batch_sizes = [int(size) for size in options["batch_sizes"].split(",")]
+        except ValueError:
+            raise CommandError("--batch-sizes must be comma-separated integers")
+
+        total = options["tasks"]
+        self.stdout.write(f"{total} tasks, {options['workers']} {options['mode']} workers")
+        self.stdout.write(f"{'batch':>6}{'enqueue/s':>12}{'run/s':>12}")
+
+        try:
+            for batch_size in batch_sizes:
+                start = time.perf_counter()
+                enqueue_many("bench.noop", [{}] * total, lane=Task.HIGH)
+                enqueued = time.perf_counter() - start
+
+                start = time.perf_counter()
+                finished, _ = run_pool(options["workers"], options["mode"], [Task.HIGH], batch_size, burst=True)
+                elapsed = time.perf_counter() - start
+
+                self.stdout.write(f"{batch_size:>6}{total / enqueued:>12.0f}{finished / elapsed:>12.0f}")
+        finally:
+            Task.objects.filter(name="bench.noop").delete()
@@ -0,0 +1,120 @@
+"""
+bench_webhooks.py
+
+Throughput benchmark of webhook delivery. Queues `--deliveries` deliveries
+to one subscription and sends them with `deliver_webhooks`' code path, once
+per concurrency level, reporting deliveries per second. The receiver is a
+local keep-alive HTTP server in a child process that answers every POST
+after `--latency-ms`, so the effect of concurrent requests on a slow
+receiver shows; pass `--url` to target another receiver instead.
+
+The command creates its own temporary owner, project and subscription
+(emails prefixed with `bench-`) and deletes them afterwards.
+
+Usage:
+    python manage.py bench_webhooks --deliveries 5000
+    python manage.py bench_webhooks --latency-ms 50 --concurrency 1,10,100
+"""
+
+import multiprocessing
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from projects.models import OutboxEvent, ProjectLead, WebhookDelivery, WebhookSubscription
+from projects.webhooks import deliver_batch
+
+User = get_user_model()
+
+
+def _receiver(latency, ports):
+    """Run a keep-alive HTTP server answering 204 after `latency` seconds."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            time.sleep(latency)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        # Many senders connect at once
+        request_queue_size = 1024
+
+    server = Server(("127.0.0.1", 0), Handler)
+    ports.put(server.server_port)
+    server.serve_forever()
+
+
+class Command(BaseCommand):
+    help = "Measure webhook delivery throughput against a local receiver."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--deliveries", type=int, default=2000)
+        parser.add_argument("--concurrency", default="1,10,50")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--latency-ms", type=float, default=10)
+        parser.add_argument("--url", default=None)
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options["concurrency"].split(",")]
+        except ValueError:
+            raise CommandError("--concurrency must be comma-separated integers")
+
+        receiver = None
+        url = options["url"]
+        if url is None:
+            # The child must not share the parent's database connections
+            connections.close_all()
+            context = multiprocessing.get_context("fork")
+            ports = context.Queue()
+            receiver = context.Process(target=_receiver, args=(options["latency_ms"] / 1000, ports), daemon=True)
+            receiver.start()
+            url = f"http://127.0.0.1:{ports.get(timeout=10)}/hook"
+            # The local receiver is on the loopback interface
+            settings.WEBHOOK_ALLOW_PRIVATE_ADDRESSES = True
+
+        run = uuid.uuid4().hex[:8]
+        owner = User.objects.create(email=f"bench-{run}-owner@example.com", firstname="Bench", lastname="Owner")
+        project = ProjectLead.objects.create(owner=owner, projectname=f"bench-{run}", description="Load test")
+        subscription = WebhookSubscription.objects.create(project=project, url=url)
+        total = options["deliveries"]
+
+        try:
+            self.stdout.write(f"{total} deliveries to {url}")
+            self.stdout.write(f"{'concurrency':>12}{'seconds':>10}{'deliveries/s':>14}")
+            for level in levels:
+                WebhookDelivery.objects.bulk_create([
+                    WebhookDelivery(
+                        subscription=subscription, event_id=(level << 32) + i,
+                        kind=OutboxEvent.REQUEST_SUBMITTED, payload={"id": i, "kind": OutboxEvent.REQUEST_SUBMITTED},
+                    )
+                    for i in range(total)
+                ], batch_size=1000)
+
+                start = time.perf_counter()
+                delivered = failed = 0
+                while (batch := deliver_batch(options["batch_size"], level)) != (0, 0):
+                    delivered += batch[0]
+                    failed += batch[1]
+                elapsed = time.perf_counter() - start
+
+                self.stdout.write(f"{level:>12}{elapsed:>10.2f}{delivered / elapsed:>14.0f}")
+                if failed:
+                    self.stdout.write(f"{failed} deliveries failed")
+                    WebhookDelivery.objects.filter(subscription=subscription).delete()
+        finally:
+            User.objects.filter(email__startswith=f"bench-{run}-").delete()
+            if receiver is not None:
+                receiver.terminate()
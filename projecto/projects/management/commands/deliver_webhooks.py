@@ -0,0 +1,59 @@
+"""
+deliver_webhooks.py
+
+Management command that sends queued webhook deliveries (see
+`projects/webhooks.py`): due deliveries are claimed in batches and POSTed
+concurrently over kept-alive connections, failures are retried with
+backoff and dead-lettered once out of attempts. Several senders can run at
+once. Stop with Ctrl+C, or pass `--once` to exit when nothing is due;
+`--retry-dead` first queues the dead-lettered deliveries again.
+
+Usage:
+    python manage.py deliver_webhooks
+    python manage.py deliver_webhooks --once --concurrency 100
+    python manage.py deliver_webhooks --retry-dead --once
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from projects.webhooks import deliver_batch, retry_dead
+
+
+class Command(BaseCommand):
+    help = "Send queued webhook deliveries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--concurrency", type=int, default=None)
+        parser.add_argument("--once", action="store_true", help="Exit once no delivery is due.")
+        parser.add_argument("--retry-dead", action="store_true", help="Queue dead-lettered deliveries again first.")
+
+    def handle(self, *args, **options):
+        for option in ("batch_size", "concurrency"):
+            if options[option] is not None and options[option] < 1:
+                raise CommandError(f"--{option.replace('_', '-')} must be at least 1")
+
+        if options["retry_dead"]:
+            self.stdout.write(f"{retry_dead()} dead deliveries queued again")
+
+        totals = [0, 0]
+        try:
+            while True:
+                close_old_connections()
+                delivered, failed = deliver_batch(options["batch_size"], options["concurrency"])
+
+                if delivered or failed:
+                    totals[0] += delivered
+                    totals[1] += failed
+                    self.stdout.write(f"{delivered} delivered, {failed} failed ({totals[0]} / {totals[1]} total)")
+                    continue
+
+                if options["once"]:
+                    break
+                time.sleep(settings.WEBHOOK_POLL_SECONDS)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,61 @@
+"""
+expire_requests.py
+
+Management command that expires join requests pending for longer than the
+configured policy (`PROJECT_REQUEST_EXPIRY_DAYS`, or `--days`): they are
+moved to the expired requests archive. Requests are processed oldest first
+in short batches that skip rows locked by live traffic, so the command can
+run at any time (e.g. from cron). Progress and throughput are printed and
+logged (`projects.management.commands.expire_requests` logger) after every
+batch, and a failing batch is logged with the progress made so far before
+the error is raised.
+
+Usage:
+    python manage.py expire_requests
+    python manage.py expire_requests --days 14 --batch-size 5000
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.expiry import expire_requests
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Move join requests pending for too long to the expired archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        days = options["days"] if options["days"] is not None else settings.PROJECT_REQUEST_EXPIRY_DAYS
+        if days < 1:
+            raise CommandError("--days must be at least 1")
+
+        start = time.perf_counter()
+        batch = total = 0
+
+        try:
+            for batch, expired in enumerate(expire_requests(days, options["batch_size"]), start=1):
+                total += expired
+                elapsed = time.perf_counter() - start
+                self._report(
+                    "batch %d: %d expired, %d total, %.0f requests/s", batch, expired, total, total / elapsed
+                )
+        except Exception:
+            logger.exception("Expiring requests failed after %d batches, %d requests expired", batch, total)
+            raise
+
+        elapsed = time.perf_counter() - start
+        self._report("expired %d requests older than %d days in %.1f s", total, days, elapsed)
+
+    def _report(self, message, *args):
+        """Print a progress line and log it."""
+        logger.info(message, *args)
+        self.stdout.write(message % args)
@@ -0,0 +1,44 @@
+"""
+export_projects.py
+
+Management command that exports projects as CSV or NDJSON. On PostgreSQL
+CSV exports use COPY TO STDOUT; otherwise rows are streamed from a
+server-side cursor. Memory use does not depend on the number of projects.
+
+Usage:
+    python manage.py export_projects projects.csv
+    python manage.py export_projects - --format ndjson --owner lead@example.com
+"""
+
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.bulk_io import FORMATS, export_projects
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Export projects to a CSV or NDJSON file ('-' for stdout)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="-")
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument("--owner", help="Only export projects of this owner email.")
+
+    def handle(self, *args, **options):
+        owner = None
+        if options["owner"]:
+            try:
+                owner = User.objects.get(email=options["owner"])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['owner']}")
+
+        if options["path"] == "-":
+            export_projects(sys.stdout, options["format"], owner=owner)
+            return
+
+        with open(options["path"], "w", newline="", encoding="utf-8") as out:
+            export_projects(out, options["format"], owner=owner)
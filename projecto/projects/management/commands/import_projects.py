@@ -0,0 +1,60 @@
+"""
+import_projects.py
+
+Management command that bulk-imports projects from a CSV or NDJSON file.
+Rows are processed in chunks, so arbitrarily large files use constant
+memory. On PostgreSQL each chunk is loaded with COPY FROM STDIN.
+
+CSV files need a header row with the columns
+owner_email, projectname, description, frontend, backend.
+
+Usage:
+    python manage.py import_projects projects.csv
+    python manage.py import_projects - --format ndjson < projects.ndjson
+    python manage.py import_projects projects.csv --owner lead@example.com
+"""
+
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.bulk_io import FORMATS, BulkImportError, committed_rows, import_projects, read_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Bulk-import projects from a CSV or NDJSON file ('-' for stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument("--owner", help="Import every row for this owner email.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        owner = None
+        if options["owner"]:
+            try:
+                owner = User.objects.get(email=options["owner"])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['owner']}")
+
+        source = sys.stdin if options["path"] == "-" else open(options["path"], newline="", encoding="utf-8")
+
+        try:
+            totals = import_projects(
+                read_rows(source, options["format"]), owner=owner, chunk_size=options["chunk_size"]
+            )
+        except BulkImportError as e:
+            # Chunks before the error are committed
+            raise CommandError(f"{e} (the first {committed_rows(e.totals)} rows were imported)")
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        self.stdout.write(
+            f"created {totals['created']}, skipped {totals['skipped']} duplicates, "
+            f"{totals['unknown_owner']} rows with unknown owner"
+        )
@@ -0,0 +1,41 @@
+"""
+process_account_deletions.py
+
+Management command that deletes the data of accounts whose deletion was
+requested. Each account's rows are deleted stage by stage in short batches
+(one transaction each, recorded in `AccountDeletion`), so a run that is
+interrupted resumes where it stopped and several workers can run at once.
+Run it periodically (e.g. from cron).
+
+Usage:
+    python manage.py process_account_deletions
+    python manage.py process_account_deletions --batch-size 500
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.deletion import pending_deletions, process_deletion
+
+
+class Command(BaseCommand):
+    help = "Delete the data of deactivated accounts in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        start = time.perf_counter()
+        total = 0
+
+        for deletion in pending_deletions():
+            for stage, deleted in process_deletion(deletion.pk, options["batch_size"]):
+                total += deleted
+                self.stdout.write(f"{deletion.email}: {stage} {deleted} deleted")
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"deleted {total} rows in {elapsed:.1f} s")
@@ -0,0 +1,54 @@
+"""
+prune_rejections.py
+
+Management command that applies the retention policy of rejected join
+requests (`REJECTION_RETENTION_MONTHS`, or `--keep-months`) and prepares the
+monthly partitions of the coming months (`REJECTION_PARTITIONS_AHEAD`, or
+`--ahead`).
+
+On PostgreSQL the rejections table is partitioned by month: missing
+partitions are created and partitions past the retention period are
+detached and dropped, which costs the same whatever their size. On other
+databases old rejections are deleted in batches. Run it daily (e.g. from
+cron) so the partition of a new month exists before it starts.
+
+Usage:
+    python manage.py prune_rejections
+    python manage.py prune_rejections --keep-months 6 --ahead 2
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from projects.partitions import delete_old_rejections, drop_partitions, ensure_partitions, is_partitioned
+
+
+class Command(BaseCommand):
+    help = "Create upcoming rejection partitions and drop the expired ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep-months", type=int, default=None)
+        parser.add_argument("--ahead", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        keep = options["keep_months"] if options["keep_months"] is not None else settings.REJECTION_RETENTION_MONTHS
+        ahead = options["ahead"] if options["ahead"] is not None else settings.REJECTION_PARTITIONS_AHEAD
+        if keep < 1:
+            raise CommandError("--keep-months must be at least 1")
+        if ahead < 0:
+            raise CommandError("--ahead must not be negative")
+
+        with connection.cursor() as cursor:
+            partitioned = is_partitioned(cursor)
+
+        if not partitioned:
+            total = sum(delete_old_rejections(keep, options["batch_size"]))
+            self.stdout.write(f"deleted {total} rejections older than {keep} months")
+            return
+
+        for name in ensure_partitions(ahead):
+            self.stdout.write(f"created {name}")
+        for name in drop_partitions(keep):
+            self.stdout.write(f"dropped {name}")
@@ -0,0 +1,40 @@
+"""
+purge_archived_projects.py
+
+Management command that deletes archived projects for good. The join
+requests, members, rejections and other rows of each archived project are
+deleted in short batches (one transaction each), so live traffic is never
+blocked behind one long cascading delete; the emptied project is deleted
+last. Run it periodically (e.g. from cron).
+
+Usage:
+    python manage.py purge_archived_projects
+    python manage.py purge_archived_projects --batch-size 500
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.archival import purge_archived
+
+
+class Command(BaseCommand):
+    help = "Delete archived projects and their rows in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        start = time.perf_counter()
+        totals = {}
+
+        for table, deleted in purge_archived(options["batch_size"]):
+            totals[table] = totals.get(table, 0) + deleted
+            self.stdout.write(f"{table}: {deleted} deleted, {totals[table]} total")
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"purged {sum(totals.values())} rows in {elapsed:.1f} s")
@@ -0,0 +1,63 @@
+"""
+relay_outbox.py
+
+Management command that runs the outbox relay (see `projects/outbox.py`):
+new events are handed in batches to every consumer of `OUTBOX_CONSUMERS`
+(analytics rollups, notification emails, webhook). Once the consumers have
+caught up, relayed events past the retention period are pruned and the
+relay polls again every `OUTBOX_POLL_SECONDS`. Several relays can run at
+once; each consumer's batch is delivered by one of them. Stop with Ctrl+C,
+or pass `--once` to exit once caught up (e.g. from cron).
+
+Usage:
+    python manage.py relay_outbox
+    python manage.py relay_outbox --once --batch-size 1000
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from projects.outbox import consumers, prune, relay_once
+
+
+class Command(BaseCommand):
+    help = "Deliver outbox events to their consumers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--once", action="store_true", help="Exit once every consumer has caught up.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] is not None and options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        consumer_map = consumers()
+        totals = dict.fromkeys(consumer_map, 0)
+
+        try:
+            while True:
+                close_old_connections()
+                outcomes = relay_once(options["batch_size"], consumer_map)
+
+                for name, outcome in outcomes.items():
+                    if isinstance(outcome, Exception):
+                        self.stderr.write(f"{name}: {outcome!r}")
+                    elif outcome:
+                        totals[name] += outcome
+                        self.stdout.write(f"{name}: {outcome} relayed, {totals[name]} total")
+
+                # Relay again at once while there are events left to relay
+                if any(isinstance(outcome, int) and outcome for outcome in outcomes.values()):
+                    continue
+
+                pruned = prune()
+                if pruned:
+                    self.stdout.write(f"pruned {pruned} events")
+                if options["once"]:
+                    break
+                time.sleep(settings.OUTBOX_POLL_SECONDS)
+        except KeyboardInterrupt:
+            pass
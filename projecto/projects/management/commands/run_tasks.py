@@ -0,0 +1,120 @@
+"""
+run_tasks.py
+
+Management command that runs the database task queue's workers (see
+`projects/taskqueue.py`). Workers are threads of this process or forked
+processes (`--mode process`, Unix only), each claiming `--batch-size` tasks
+at a time with `SELECT ... FOR UPDATE SKIP LOCKED`. `--lanes` dedicates the
+workers to some priority lanes, so e.g. a separate pool can keep the high
+lane moving while long low-lane tasks run. Stop with Ctrl+C (SIGINT) or
+SIGTERM; `--burst` exits once no task is due.
+
+Usage:
+    python manage.py run_tasks
+    python manage.py run_tasks --workers 8 --mode process --batch-size 20
+    python manage.py run_tasks --lanes high,default --burst
+"""
+
+import multiprocessing
+import queue
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from projects.taskqueue import LANES, work
+
+
+class Command(BaseCommand):
+    help = "Run workers of the database task queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+        parser.add_argument("--lanes", default=None, help=f"Comma-separated lanes among {', '.join(LANES)}.")
+        parser.add_argument("--batch-size", type=int, default=10)
+        parser.add_argument("--burst", action="store_true", help="Exit once no task is due.")
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--workers and --batch-size must be at least 1")
+
+        lanes = None
+        if options["lanes"]:
+            names = [name.strip() for name in options["lanes"].split(",")]
+            unknown = [name for name in names if name not in LANES]
+            if unknown:
+                raise CommandError(f"Unknown lanes: {', '.join(unknown)}")
+            lanes = [LANES[name] for name in names]
+
+        finished, failed = run_pool(
+            options["workers"], options["mode"], lanes, options["batch_size"], options["burst"]
+        )
+        self.stdout.write(f"{finished} tasks finished, {failed} failed")
+
+
+def _thread_worker(lanes, batch_size, burst, stop, results):
+    try:
+        results.append(work(lanes, batch_size, burst, stop))
+    finally:
+        connections.close_all()
+
+
+def _process_worker(lanes, batch_size, burst, stop, results):
+    # The parent handles Ctrl+C and stops the children through the event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        results.put(work(lanes, batch_size, burst, stop))
+    finally:
+        connections.close_all()
+
+
+def run_pool(workers, mode, lanes, batch_size, burst):
+    """
+    Run `workers` task workers until they stop.
+
+    Returns:
+        tuple[int, int]: Numbers of tasks finished and failed by all workers.
+    """
+    if mode == "process":
+        # Children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        stop, results = context.Event(), context.Queue()
+        pool = [
+            context.Process(target=_process_worker, args=(lanes, batch_size, burst, stop, results))
+            for _ in range(workers)
+        ]
+    else:
+        stop, results = threading.Event(), []
+        pool = [
+            threading.Thread(target=_thread_worker, args=(lanes, batch_size, burst, stop, results))
+            for _ in range(workers)
+        ]
+
+    previous = signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        for worker in pool:
+            worker.start()
+        for worker in pool:
+            while worker.is_alive():
+                try:
+                    worker.join(0.5)
+                except KeyboardInterrupt:
+                    stop.set()
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+    if mode == "process":
+        outcomes = []
+        try:
+            while len(outcomes) < workers:
+                outcomes.append(results.get(timeout=0.1))
+        except queue.Empty:
+            # A worker process died without reporting
+            pass
+    else:
+        outcomes = results
+
+    return sum(done for done, _ in outcomes), sum(errors for _, errors in outcomes)
@@ -0,0 +1,47 @@
+"""
+send_digests.py
+
+Management command that emails the daily digests (see
+`projects/digests.py`): every owner with join requests received in the
+last `--hours` gets a summary of their pending requests. Run it once a day
+(e.g. from cron). Each batch prints the last owner id it mailed; if a run is
+interrupted, `--start-after` resumes after that owner.
+
+Usage:
+    python manage.py send_digests
+    python manage.py send_digests --workers 8 --batch-size 1000
+    python manage.py send_digests --start-after 41250
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.digests import digest_since, send_digests
+
+
+class Command(BaseCommand):
+    help = "Email every owner a digest of their pending join requests."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24)
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--start-after", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["hours"] < 1 or (options["batch_size"] is not None and options["batch_size"] < 1):
+            raise CommandError("--hours and --batch-size must be at least 1")
+
+        start = time.perf_counter()
+        total = 0
+
+        batches = send_digests(
+            digest_since(options["hours"]), options["workers"], options["batch_size"], options["start_after"]
+        )
+        for batch, (sent, last_owner) in enumerate(batches, start=1):
+            total += sent
+            self.stdout.write(f"batch {batch}: {sent} sent, {total} total, last owner {last_owner}")
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"sent {total} digests in {elapsed:.1f} s")
@@ -1,14 +1,21 @@
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import F, signals
 """
 manager.py
 
 This module defines custom model managers used to extend Django's default
 queryset behavior. It includes the ProjectManager, responsible for handling
-project creation logic with validation for required fields such as the owner.
+project creation logic with validation for required fields such as the owner,
+the ConflictFreeManager, which inserts rows guarded by unique constraints
+without raising on duplicates, the RollupManager, which adds to counter
+rows, and the ActiveProjectManager, which hides archived projects.
 
 Provides:
     - Safe creation of Project instances
     - Centralized validation for project-related database operations
+    - Conflict-free inserts for retried join requests, members and rejections
+    - Single-statement increments of rollup counters
+    - Archived (soft-deleted) projects kept out of regular queries
 
 Author: Pranav Singh
 """
@@ -45,4 +52,221 @@ class ProjectManager(models.Manager):
 
         project = self.model(owner=owner, **extra_fields)
         project.save()
-        return project
\ No newline at end of file
+        return project
+
+class ActiveProjectManager(models.Manager):
+    """
+    Default manager of projects: archived projects are left out of every
+    query, which the partial indexes over active projects then serve.
+    Related-object access and the purger use the plain base manager.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(archived_at__isnull=True)
+
+class ConflictFreeManager(models.Manager):
+    """
+    Manager for models guarded by a unique constraint that clients may hit
+    on retries (join requests, members, rejections).
+
+    Methods:
+        insert_or_get(conflict_fields, **fields):
+            Inserts a row with `ON CONFLICT DO NOTHING` semantics and returns
+            either the new row or the existing one.
+
+        insert_many_or_get(conflict_fields, rows):
+            Same for many rows, with a single multi-row insert.
+    """
+
+    def _supports_on_conflict(self):
+        """Return whether the database supports ON CONFLICT ... RETURNING."""
+        return connections[self.db].vendor in ("postgresql", "sqlite")
+
+    def _insert_ignoring_conflicts(self, objs, returning):
+        """
+        Run `INSERT ... ON CONFLICT DO NOTHING RETURNING` for unsaved objects.
+
+        Parameters:
+            objs (list[Model]): Unsaved instances to insert.
+            returning (list[Field]): Fields returned for every inserted row.
+
+        Returns:
+            list[tuple]: Returned values of the rows actually inserted.
+        """
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+        concrete = [field for field in meta.concrete_fields if not field.primary_key]
+
+        columns = ", ".join(quote(field.column) for field in concrete)
+        row_placeholder = "(" + ", ".join(["%s"] * len(concrete)) + ")"
+        values = [
+            field.get_db_prep_save(field.pre_save(obj, add=True), connection)
+            for obj in objs
+            for field in concrete
+        ]
+        sql = (
+            f"INSERT INTO {quote(meta.db_table)} ({columns}) "
+            f"VALUES {', '.join([row_placeholder] * len(objs))} ON CONFLICT DO NOTHING "
+            f"RETURNING {', '.join(quote(field.column) for field in returning)}"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, values)
+            return cursor.fetchall()
+
+    def insert_or_get(self, conflict_fields, **fields):
+        """
+        Insert a row unless it conflicts with an existing one.
+
+        Uses a single `INSERT ... ON CONFLICT DO NOTHING RETURNING` statement
+        on PostgreSQL and SQLite, so a duplicate never raises IntegrityError
+        or aborts the surrounding transaction. On a conflict the existing row
+        is fetched through the unique index. `post_save` is sent only when a
+        row was actually inserted.
+
+        Parameters:
+            conflict_fields (tuple[str]): Field names of the unique constraint.
+            **fields: Field values of the new row.
+
+        Returns:
+            tuple[Model, bool]: The row and whether it was created.
+        """
+        lookup = {name: fields[name] for name in conflict_fields}
+
+        if not self._supports_on_conflict():
+            return self.get_or_create(**lookup, defaults=fields)
+
+        obj = self.model(**fields)
+        rows = self._insert_ignoring_conflicts([obj], [self.model._meta.pk])
+
+        if not rows:
+            return self.get(**lookup), False
+
+        obj.pk = rows[0][0]
+        obj._state.adding = False
+        obj._state.db = self.db
+        signals.post_save.send(
+            sender=self.model, instance=obj, created=True, update_fields=None,
+            raw=False, using=self.db,
+        )
+        return obj, True
+
+    def insert_many_or_get(self, conflict_fields, rows):
+        """
+        Insert many rows with one statement, skipping conflicting ones.
+
+        Rows that conflict with existing rows (or with an earlier row of the
+        same call) are resolved to the existing row with one extra query.
+        No `post_save` signals are sent; callers handle any follow-up work
+        for the whole batch at once.
+
+        Parameters:
+            conflict_fields (tuple[str]): Field names of the unique constraint.
+            rows (list[dict]): Field values of every new row.
+
+        Returns:
+            list[tuple[Model, bool]]: The row and whether it was created, in
+            input order.
+        """
+        meta = self.model._meta
+        key_fields = [meta.get_field(name) for name in conflict_fields]
+
+        if not self._supports_on_conflict():
+            return [self.insert_or_get(conflict_fields, **row) for row in rows]
+
+        objs = [self.model(**row) for row in rows]
+        returned = self._insert_ignoring_conflicts(objs, [meta.pk, *key_fields])
+        inserted = {tuple(values[1:]): values[0] for values in returned}
+
+        def key_of(obj):
+            return tuple(getattr(obj, field.attname) for field in key_fields)
+
+        missing = {key_of(obj) for obj in objs if key_of(obj) not in inserted}
+        existing = {}
+        if missing:
+            condition = models.Q()
+            for key in missing:
+                condition |= models.Q(**{field.attname: value for field, value in zip(key_fields, key)})
+            existing = {key_of(obj): obj for obj in self.filter(condition)}
+
+        results = []
+        for obj, row in zip(objs, rows):
+            key = key_of(obj)
+            if key in inserted:
+                obj.pk = inserted.pop(key)
+                obj._state.adding = False
+                obj._state.db = self.db
+                existing[key] = obj
+                results.append((obj, True))
+            elif key in existing:
+                results.append((existing[key], False))
+            else:
+                # The conflicting row was deleted in the meantime
+                results.append(self.insert_or_get(conflict_fields, **row))
+
+        return results
+
+
+class RollupManager(models.Manager):
+    """
+    Manager for counter tables keyed by a unique constraint (trending and
+    analytics rollups).
+
+    Methods:
+        add(key_fields, rows):
+            Adds counts to the rows with the given keys, creating missing
+            rows, with one `INSERT ... ON CONFLICT DO UPDATE` statement.
+    """
+
+    def add(self, key_fields, rows):
+        """
+        Add counts to rollup rows.
+
+        Parameters:
+            key_fields (tuple[str]): Field names of the unique constraint.
+            rows (list[dict]): Key values and the amounts to add to every
+                               other field given; all rows use the same
+                               fields, and fields left out keep their value
+                               (or their default in new rows).
+        """
+        if not rows:
+            return
+
+        meta = self.model._meta
+        names = list(rows[0])
+        counters = [name for name in names if name not in key_fields]
+        connection = connections[self.db]
+
+        if connection.vendor not in ("postgresql", "sqlite"):
+            for row in rows:
+                lookup = {name: row[name] for name in key_fields}
+                with transaction.atomic(using=self.db):
+                    obj, created = self.select_for_update().get_or_create(**lookup, defaults=row)
+                    if not created:
+                        self.filter(pk=obj.pk).update(**{name: F(name) + row[name] for name in counters})
+            return
+
+        quote = connection.ops.quote_name
+        # Counters not given start from their default in new rows
+        fields = [field for field in meta.concrete_fields if not field.primary_key]
+        table = quote(meta.db_table)
+        row_placeholder = "(" + ", ".join(["%s"] * len(fields)) + ")"
+        values = [
+            field.get_db_prep_save(row[field.name] if field.name in row else field.get_default(), connection)
+            for row in rows
+            for field in fields
+        ]
+        updates = ", ".join(
+            f"{quote(field.column)} = {table}.{quote(field.column)} + excluded.{quote(field.column)}"
+            for field in fields if field.name in counters
+        )
+        sql = (
+            f"INSERT INTO {table} ({', '.join(quote(field.column) for field in fields)}) "
+            f"VALUES {', '.join([row_placeholder] * len(rows))} "
+            f"ON CONFLICT ({', '.join(quote(meta.get_field(name).column) for name in key_fields)}) "
+            f"DO UPDATE SET {updates}"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, values)
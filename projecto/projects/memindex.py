@@ -0,0 +1,140 @@
+"""
+memindex.py
+
+This module provides the base class of the process-local, in-memory indexes
+(the skill index, the collaboration graph and the similar-projects index). Each index is loaded
+from the database on first use, kept current by model signals for the
+writes made in this process, and reloaded in the background once it is
+older than its `max_age`, which picks up writes made by other processes.
+
+Changes that arrive while a background reload is running are replayed on
+the freshly loaded state before it is swapped in, so none are lost. The
+reload may already contain some of them, so applying a change must be
+idempotent (e.g. "user X now has skills M", not "add skill M to X").
+
+Indexes that fold incremental changes into packed arrays do the folding on
+the same background thread: `apply()` only takes a snapshot of the state
+when a compaction is due, so the commit path never rebuilds arrays while
+holding the lock.
+"""
+
+import threading
+import time
+
+from django.db import close_old_connections
+
+
+class ProcessIndex:
+    """
+    Base class of the in-memory indexes.
+
+    Subclasses implement `_load()` (read the state from the database) and
+    `_apply()` (apply one incremental change to a state), and may implement
+    `_snapshot()` and `_compact()` to fold changes in the background. Readers
+    hold `_lock` while they use `_state`.
+
+    Attributes:
+        max_age (float): Seconds after which the index is reloaded.
+    """
+
+    name = "index"
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._state = None
+        self._built_at = 0.0
+        self._rebuilding = False
+        self._pending = []
+        self._worker = None
+
+    def reset(self):
+        """Drop the index; it is loaded again on next use."""
+        with self._lock:
+            self._state = None
+            self._pending = []
+            self._installed()
+
+    def _load(self):
+        """Read the whole state from the database."""
+        raise NotImplementedError
+
+    def _apply(self, state, change):
+        """Apply one change to `state` in place."""
+        raise NotImplementedError
+
+    def _snapshot(self, state):
+        """
+        Return a copy of `state` to compact in the background, or None when
+        no compaction is due. Called under the lock after each change.
+        """
+        return None
+
+    def _compact(self, snapshot):
+        """Build a compacted state from a snapshot (runs outside the lock)."""
+        raise NotImplementedError
+
+    def _installed(self):
+        """Called under the lock whenever the state is replaced or dropped."""
+
+    def apply(self, change):
+        """
+        Apply a change made in this process.
+
+        Does nothing until the index has been loaded, since loading reads
+        the latest data anyway.
+        """
+        with self._lock:
+            if self._state is None:
+                return
+            self._apply(self._state, change)
+            if self._rebuilding:
+                self._pending.append(change)
+                return
+            snapshot = self._snapshot(self._state)
+            if snapshot is not None:
+                self._start(snapshot)
+
+    def _ensure_built(self):
+        """Load the index on first use and reload it in the background when old."""
+        with self._lock:
+            if self._state is None:
+                self._state = self._load()
+                self._built_at = time.monotonic()
+                self._installed()
+                return
+
+            if self._rebuilding or time.monotonic() - self._built_at < self.max_age:
+                return
+            self._start()
+
+    def _start(self, snapshot=None):
+        """Start the background rebuild (a reload, or a compaction of `snapshot`); under the lock."""
+        self._rebuilding = True
+        self._pending = []
+        self._worker = threading.Thread(
+            target=self._rebuild, args=(snapshot,), name=f"{self.name}-rebuild", daemon=True
+        )
+        self._worker.start()
+
+    def _rebuild(self, snapshot):
+        """Load (or compact) a fresh state, replay changes made meanwhile and swap it in."""
+        try:
+            if snapshot is None:
+                close_old_connections()
+                state = self._load()
+            else:
+                state = self._compact(snapshot)
+            with self._lock:
+                for change in self._pending:
+                    self._apply(state, change)
+                self._state = state
+                if snapshot is None:
+                    self._built_at = time.monotonic()
+                self._installed()
+        finally:
+            with self._lock:
+                self._rebuilding = False
+                self._pending = []
+            if snapshot is None:
+                close_old_connections()
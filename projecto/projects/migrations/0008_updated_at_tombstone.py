@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_dataversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectlead',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='projectrequest',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='projectmembers',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='projectrequest',
+            index=models.Index(fields=['member', 'updated_at'], name='projects_pr_member__492135_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectmembers',
+            index=models.Index(fields=['member', 'updated_at'], name='projects_pr_member__bebf8a_idx'),
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('project', 'Project'), ('request', 'Join request'), ('member', 'Project member')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('user_id', models.BigIntegerField(null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_id', 'deleted_at'], name='projects_to_user_id_5fba05_idx')],
+            },
+        ),
+    ]
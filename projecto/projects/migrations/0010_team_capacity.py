@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:13
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_seats(apps, schema_editor):
+    """Initialise seats_taken from the existing members, in one UPDATE."""
+    ProjectLead = apps.get_model("projects", "ProjectLead")
+    ProjectMembers = apps.get_model("projects", "ProjectMembers")
+
+    members = (
+        ProjectMembers.objects.filter(project=OuterRef("pk"))
+        .order_by()
+        .values("project")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    ProjectLead.objects.update(seats_taken=Coalesce(Subquery(members), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_idempotencykey'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectlead',
+            name='max_members',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectlead',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_seats, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='projectlead',
+            index=models.Index(condition=models.Q(('max_members__isnull', True), ('seats_taken__lt', models.F('max_members')), _connector='OR'), fields=['id'], name='projects_pl_open_seats_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:15
+
+from django.db import migrations, models
+from django.db.models import F
+
+# Bits of the legacy booleans in the skill registry (accounts/skills.py)
+FRONTEND = 1 << 0
+BACKEND = 1 << 1
+
+
+def map_flags(apps, schema_editor):
+    """Fold the frontend/backend booleans into the skills mask."""
+    ProjectLead = apps.get_model("projects", "ProjectLead")
+    ProjectLead.objects.filter(frontend=True).update(skills=F("skills").bitor(FRONTEND))
+    ProjectLead.objects.filter(backend=True).update(skills=F("skills").bitor(BACKEND))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0010_team_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectlead',
+            name='skills',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(map_flags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_updated_at(apps, schema_editor):
+    """Existing requests were last written when sent; use that as created_at."""
+    ProjectRequest = apps.get_model("projects", "ProjectRequest")
+    ProjectRequest.objects.update(created_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0012_projectinvitation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectrequest',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_updated_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='TrendingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('joins', models.PositiveIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trending_rollups', to='projects.projectlead')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket_start'], name='projects_tr_bucket__edbe10_idx')],
+                'unique_together': {('project', 'bucket_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0014_analytics_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpiredProjectRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.CharField(max_length=400)),
+                ('created_at', models.DateTimeField()),
+                ('expired_on', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='projectrequest',
+            index=models.Index(fields=['created_at', 'id'], name='projects_pr_created_f87e3f_idx'),
+        ),
+        migrations.AddField(
+            model_name='expiredprojectrequest',
+            name='member',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expired_requests', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='expiredprojectrequest',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expired_requests', to='projects.projectlead'),
+        ),
+        migrations.AddIndex(
+            model_name='expiredprojectrequest',
+            index=models.Index(fields=['project', 'expired_on'], name='projects_ex_project_edd38a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expiredprojectrequest',
+            index=models.Index(fields=['member', 'expired_on'], name='projects_ex_member__ed483a_idx'),
+        ),
+    ]
@@ -0,0 +1,132 @@
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import migrations
+from django.utils import timezone
+
+TABLE = "projects_projectrequestrejected"
+
+PARTITIONED_TABLE_SQL = f"""
+CREATE TABLE {TABLE} (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    message varchar(400) NOT NULL,
+    rejected_on timestamp with time zone NOT NULL,
+    project_id bigint NOT NULL
+        CONSTRAINT {TABLE}_project_fk REFERENCES projects_projectlead (id) DEFERRABLE INITIALLY DEFERRED,
+    user_id bigint NOT NULL
+        CONSTRAINT {TABLE}_user_fk REFERENCES accounts_users (id) DEFERRABLE INITIALLY DEFERRED,
+    CONSTRAINT {TABLE}_id_rejected_on_pk PRIMARY KEY (id, rejected_on)
+) PARTITION BY RANGE (rejected_on);
+CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT;
+CREATE INDEX {TABLE}_project_user_idx ON {TABLE} (project_id, user_id);
+CREATE INDEX {TABLE}_user_idx ON {TABLE} (user_id);
+"""
+
+PLAIN_TABLE_SQL = f"""
+CREATE TABLE {TABLE} (
+    id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    message varchar(400) NOT NULL,
+    rejected_on timestamp with time zone NOT NULL,
+    project_id bigint NOT NULL
+        REFERENCES projects_projectlead (id) DEFERRABLE INITIALLY DEFERRED,
+    user_id bigint NOT NULL
+        REFERENCES accounts_users (id) DEFERRABLE INITIALLY DEFERRED,
+    UNIQUE (project_id, user_id)
+);
+CREATE INDEX ON {TABLE} (user_id);
+"""
+
+# Inserts of the same (project_id, user_id) pair are serialized by this
+# trigger; a second insert of an existing pair is skipped
+DEDUPE_SQL = f"""
+CREATE OR REPLACE FUNCTION {TABLE}_dedupe() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtextextended('{TABLE}:' || NEW.project_id || ':' || NEW.user_id, 0));
+    IF EXISTS (SELECT 1 FROM {TABLE} WHERE project_id = NEW.project_id AND user_id = NEW.user_id) THEN
+        RETURN NULL;
+    END IF;
+    RETURN NEW;
+END $$;
+CREATE TRIGGER {TABLE}_dedupe BEFORE INSERT ON {TABLE} FOR EACH ROW EXECUTE FUNCTION {TABLE}_dedupe();
+"""
+
+COPY_ROWS_SQL = (
+    "INSERT INTO {target} (id, message, rejected_on, project_id, user_id) "
+    "SELECT id, message, rejected_on, project_id, user_id FROM {source}"
+)
+
+RESET_SEQUENCE_SQL = (
+    f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), coalesce(max(id), 0) + 1, false) FROM {TABLE}"
+)
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def bound(month):
+    return f"'{datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()}'"
+
+
+def partition(apps, schema_editor):
+    """
+    Partition the rejections table by month (PostgreSQL only): one partition
+    per month from the oldest rejection to `REJECTION_PARTITIONS_AHEAD`
+    months ahead, plus a DEFAULT partition.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_plain")
+        cursor.execute(PARTITIONED_TABLE_SQL)
+
+        cursor.execute(f"SELECT min(rejected_on) FROM {TABLE}_plain")
+        oldest = cursor.fetchone()[0]
+        today = timezone.localdate()
+        first = timezone.localdate(oldest) if oldest else today
+        month, last = date(first.year, first.month, 1), date(today.year, today.month, 1)
+        for _ in range(getattr(settings, "REJECTION_PARTITIONS_AHEAD", 3)):
+            last = next_month(last)
+        while month <= last:
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{month:%Y%m} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ({bound(month)}) TO ({bound(next_month(month))})"
+            )
+            month = next_month(month)
+
+        cursor.execute(COPY_ROWS_SQL.format(target=TABLE, source=f"{TABLE}_plain"))
+        cursor.execute(RESET_SEQUENCE_SQL)
+        cursor.execute(f"DROP TABLE {TABLE}_plain")
+        cursor.execute(DEDUPE_SQL)
+
+
+def unpartition(apps, schema_editor):
+    """Turn the partitioned rejections table back into a plain table."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_partitioned")
+        cursor.execute(PLAIN_TABLE_SQL)
+        cursor.execute(COPY_ROWS_SQL.format(target=TABLE, source=f"{TABLE}_partitioned") + " ON CONFLICT DO NOTHING")
+        cursor.execute(RESET_SEQUENCE_SQL)
+        cursor.execute(f"DROP TABLE {TABLE}_partitioned CASCADE")
+        cursor.execute(f"DROP FUNCTION IF EXISTS {TABLE}_dedupe()")
+
+
+class Migration(migrations.Migration):
+    """
+    The model state is unchanged: the table keeps the same columns and the
+    ORM keeps reading and writing it as before. The SQL is kept here rather
+    than imported from `projects.partitions`, so the migration keeps doing
+    the same thing whatever that module becomes.
+    """
+
+    dependencies = [
+        ('projects', '0015_request_expiry'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
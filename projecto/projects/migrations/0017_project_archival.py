@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0016_partition_rejections'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='projectlead',
+            name='projects_pl_open_seats_idx',
+        ),
+        migrations.AddField(
+            model_name='projectlead',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='projectlead',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='projectlead',
+            index=models.Index(condition=models.Q(models.Q(('max_members__isnull', True), ('seats_taken__lt', models.F('max_members')), _connector='OR'), ('archived_at__isnull', True)), fields=['id'], name='projects_pl_open_seats_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectlead',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['owner'], name='projects_pl_active_owner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectlead',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['updated_at'], name='projects_pl_active_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectlead',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True), _negated=True), fields=['archived_at'], name='projects_pl_archived_idx'),
+        ),
+    ]
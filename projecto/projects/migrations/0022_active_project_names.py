@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0021_webhooks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='projectlead',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='projectlead',
+            constraint=models.UniqueConstraint(condition=models.Q(('archived_at__isnull', True)), fields=('owner', 'projectname'), name='projects_pl_active_name_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0022_active_project_names'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='idempotencykey',
+            name='status_code',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0023_idempotency_reservation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='projectrequest',
+            name='message',
+            field=models.CharField(default='I am interested in joining this project', max_length=400),
+        ),
+    ]
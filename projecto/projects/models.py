@@ -8,8 +8,21 @@ the collaboration system.
 Author: Pranav Singh
 """
 
+import secrets
+
 from django.db import models
+from django.db.models import F, Q
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from accounts.skills import sync_skill_flags
+from .manager import ActiveProjectManager, ConflictFreeManager, RollupManager
+
+# Projects that can still accept members
+HAS_OPEN_SEATS = Q(max_members__isnull=True) | Q(seats_taken__lt=F("max_members"))
+
+# Projects that have not been archived (soft-deleted)
+ACTIVE = Q(archived_at__isnull=True)
 
 
 class ProjectLead(models.Model):
@@ -28,13 +41,37 @@ class ProjectLead(models.Model):
             Indicates if the project requires frontend developers.
         backend (BooleanField):
             Indicates if the project requires backend developers.
+        skills (BigIntegerField):
+            Bitmask of the skills the project needs; `frontend`/`backend`
+            mirror its first two bits.
         created_at (DateTimeField):
             Timestamp of when the project was created.
+        updated_at (DateTimeField):
+            Timestamp of the last change, used by delta sync.
+        max_members (PositiveIntegerField):
+            Team size limit; null means unlimited.
+        seats_taken (PositiveIntegerField):
+            Number of accepted members, maintained atomically on accept
+            and removal (see `capacity.py`).
+        archived_at (DateTimeField):
+            When the project was archived (soft-deleted); its rows are
+            purged later in batches (see `archival.py`).
 
     Meta:
-        unique_together:
-            Ensures that each user cannot create multiple projects with
-            the same name.
+        constraints:
+            Ensures that each user cannot have multiple active projects
+            with the same name; archived projects awaiting their purge
+            keep theirs, so the name can be reused at once.
+        indexes:
+            Partial indexes over active projects only (open seats, owner,
+            last change), so archived rows never enter those scans, and
+            over archived projects for the purger.
+
+    Managers:
+        objects (ActiveProjectManager):
+            Active projects only; the default manager.
+        all_objects (Manager):
+            Every project, archived ones included.
     """
 
     owner = models.ForeignKey(
@@ -46,10 +83,32 @@ class ProjectLead(models.Model):
     description = models.CharField(max_length=500)
     frontend = models.BooleanField(default=False)
     backend = models.BooleanField(default=False)
+    skills = models.BigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    max_members = models.PositiveIntegerField(null=True, blank=True)
+    seats_taken = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveProjectManager()
+    all_objects = models.Manager()
 
     class Meta:
-        unique_together = (("owner", "projectname"),)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "projectname"], condition=ACTIVE, name="projects_pl_active_name_uniq"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["id"], condition=HAS_OPEN_SEATS & ACTIVE, name="projects_pl_open_seats_idx"),
+            models.Index(fields=["owner"], condition=ACTIVE, name="projects_pl_active_owner_idx"),
+            models.Index(fields=["updated_at"], condition=ACTIVE, name="projects_pl_active_updated_idx"),
+            models.Index(fields=["archived_at"], condition=~ACTIVE, name="projects_pl_archived_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        sync_skill_flags(self)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.projectname} ({self.owner.email})"
@@ -66,11 +125,22 @@ class ProjectRequest(models.Model):
             The user who is sending the request.
         message (CharField):
             Optional message sent by the requester.
+        created_at (DateTimeField):
+            Timestamp of when the request was sent.
+        updated_at (DateTimeField):
+            Timestamp of the last change, used by delta sync.
 
     Meta:
         unique_together:
             Ensures the same user cannot request to join the
             same project multiple times.
+        indexes:
+            (member, updated_at) for delta sync of a user's requests.
+            (created_at, id) for expiring the oldest requests in order.
+
+    Manager:
+        objects (ConflictFreeManager):
+            Inserts retried requests without raising on duplicates.
     """
 
     project = models.ForeignKey(
@@ -84,14 +154,69 @@ class ProjectRequest(models.Model):
         related_name="project_member"
     )
     message = models.CharField(max_length=400, default="I am interested in joining this project")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ConflictFreeManager()
 
     class Meta:
         unique_together = (("project", "member"),)
+        indexes = [
+            models.Index(fields=["member", "updated_at"]),
+            models.Index(fields=["created_at", "id"]),
+        ]
 
     def __str__(self):
         return f"Request by {self.member.email} for {self.project.projectname}"
 
 
+class ExpiredProjectRequest(models.Model):
+    """
+    Archive of join requests that stayed pending for longer than
+    `PROJECT_REQUEST_EXPIRY_DAYS` (see the `expire_requests` command).
+
+    Attributes:
+        project (ForeignKey):
+            The project the user asked to join.
+        member (ForeignKey):
+            The user who sent the request.
+        message (CharField):
+            Message sent with the request.
+        created_at (DateTimeField):
+            When the request was sent.
+        expired_on (DateTimeField):
+            When the request was expired.
+
+    Meta:
+        indexes:
+            (project, expired_on) and (member, expired_on) for looking up a
+            project's or a user's expired requests.
+    """
+
+    project = models.ForeignKey(
+        ProjectLead,
+        on_delete=models.CASCADE,
+        related_name="expired_requests"
+    )
+    member = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="expired_requests"
+    )
+    message = models.CharField(max_length=400)
+    created_at = models.DateTimeField()
+    expired_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["project", "expired_on"]),
+            models.Index(fields=["member", "expired_on"]),
+        ]
+
+    def __str__(self):
+        return f"Expired request by {self.member_id} for {self.project_id}"
+
+
 class ProjectMembers(models.Model):
     """
     Represents a user who has been accepted into a project team.
@@ -105,10 +230,18 @@ class ProjectMembers(models.Model):
             Message attached when joining (default provided).
         joined_on (DateTimeField):
             Timestamp of joining.
+        updated_at (DateTimeField):
+            Timestamp of the last change, used by delta sync.
 
     Meta:
         unique_together:
             Prevents the same user from being added to the same project twice.
+        indexes:
+            (member, updated_at) for delta sync of a user's memberships.
+
+    Manager:
+        objects (ConflictFreeManager):
+            Inserts retried accepts without raising on duplicates.
     """
 
     project = models.ForeignKey(
@@ -123,9 +256,13 @@ class ProjectMembers(models.Model):
     )
     message = models.CharField(max_length=400, default="I am interested in joining this project")
     joined_on = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ConflictFreeManager()
 
     class Meta:
         unique_together = (("project", "member"),)
+        indexes = [models.Index(fields=["member", "updated_at"])]
 
     def __str__(self):
         return f"{self.member.email} joined {self.project.projectname}"
@@ -149,6 +286,10 @@ class ProjectRequestRejected(models.Model):
         unique_together:
             Ensures that a user cannot be marked rejected for the same
             project multiple times.
+
+    Manager:
+        objects (ConflictFreeManager):
+            Inserts retried rejections without raising on duplicates.
     """
 
     project = models.ForeignKey(
@@ -164,8 +305,618 @@ class ProjectRequestRejected(models.Model):
     message = models.CharField(max_length=400, default="I am interested in joining this project")
     rejected_on = models.DateTimeField(auto_now_add=True)
 
+    objects = ConflictFreeManager()
+
+    class Meta:
+        unique_together = (("project", "user"),)
+
+    def __str__(self):
+        return f"{self.user.email} rejected from {self.project.projectname}"
+
+
+class ProjectInvitation(models.Model):
+    """
+    Represents an invitation sent by a project owner to a suggested candidate.
+
+    Attributes:
+        project (ForeignKey):
+            The project the user is invited to.
+        user (ForeignKey):
+            The invited user.
+        message (CharField):
+            Optional message from the owner (default provided).
+        created_at (DateTimeField):
+            Timestamp of the invitation.
+
+    Meta:
+        unique_together:
+            A user is invited to the same project at most once.
+
+    Manager:
+        objects (ConflictFreeManager):
+            Inserts bulk invitations in one statement, skipping users that
+            were already invited.
+    """
+
+    project = models.ForeignKey(
+        ProjectLead,
+        on_delete=models.CASCADE,
+        related_name="invitations"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="invitations"
+    )
+    message = models.CharField(max_length=400, default="We think you would be a great fit for this project")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ConflictFreeManager()
+
     class Meta:
         unique_together = (("project", "user"),)
 
     def __str__(self):
-        return f"{self.user.email} rejected from {self.project.projectname}"
\ No newline at end of file
+        return f"{self.user.email} invited to {self.project.projectname}"
+
+class TrendingRollup(models.Model):
+    """
+    Checkpointed activity counters of a project over one time bucket, used
+    to rank trending projects.
+
+    Attributes:
+        project (ForeignKey):
+            The project the activity is about.
+        bucket_start (DateTimeField):
+            Start of the bucket (`TRENDING_BUCKET_SECONDS` long).
+        requests (PositiveIntegerField):
+            Join requests sent during the bucket.
+        joins (PositiveIntegerField):
+            Members accepted during the bucket.
+
+    Meta:
+        unique_together:
+            One row per project and bucket; checkpoints add to it.
+        indexes:
+            bucket_start, for loading and pruning recent buckets.
+
+    Manager:
+        objects (RollupManager):
+            Adds checkpointed counts to existing rows.
+    """
+
+    project = models.ForeignKey(
+        ProjectLead,
+        on_delete=models.CASCADE,
+        related_name="trending_rollups"
+    )
+    bucket_start = models.DateTimeField()
+    requests = models.PositiveIntegerField(default=0)
+    joins = models.PositiveIntegerField(default=0)
+
+    objects = RollupManager()
+
+    class Meta:
+        unique_together = (("project", "bucket_start"),)
+        indexes = [models.Index(fields=["bucket_start"])]
+
+    def __str__(self):
+        return f"{self.project_id} @ {self.bucket_start}: {self.requests} requests, {self.joins} joins"
+
+
+class DailyOwnerStats(models.Model):
+    """
+    Daily activity counters of one owner's projects, used by the analytics
+    endpoints instead of scanning requests, members and rejections.
+
+    Attributes:
+        owner (ForeignKey):
+            The project owner.
+        day (DateField):
+            The day (UTC) the activity happened on.
+        projects_created (PositiveIntegerField):
+            Projects the owner created.
+        requests (PositiveIntegerField):
+            Join requests received.
+        accepted (PositiveIntegerField):
+            Requests accepted.
+        rejected (PositiveIntegerField):
+            Requests rejected.
+        timed_decisions (PositiveIntegerField):
+            Accepts and rejects whose request time is known.
+        decision_seconds (PositiveBigIntegerField):
+            Total seconds from request to decision over `timed_decisions`.
+
+    Meta:
+        unique_together:
+            One row per owner and day; (owner, day) also serves the
+            owner-scoped range reads.
+        indexes:
+            day, for the platform-wide range reads.
+
+    Manager:
+        objects (RollupManager):
+            Adds to the counters of existing rows.
+    """
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="daily_stats"
+    )
+    day = models.DateField()
+    projects_created = models.PositiveIntegerField(default=0)
+    requests = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    timed_decisions = models.PositiveIntegerField(default=0)
+    decision_seconds = models.PositiveBigIntegerField(default=0)
+
+    objects = RollupManager()
+
+    class Meta:
+        unique_together = (("owner", "day"),)
+        indexes = [models.Index(fields=["day"])]
+
+    def __str__(self):
+        return f"{self.owner_id} on {self.day}"
+
+
+class DailySkillRequests(models.Model):
+    """
+    Daily number of join requests received per needed skill, per owner.
+
+    Attributes:
+        owner (ForeignKey):
+            The owner of the requested projects.
+        day (DateField):
+            The day (UTC) the requests were sent on.
+        skill (PositiveSmallIntegerField):
+            Bit position of the skill (see `accounts.skills.SKILLS`).
+        requests (PositiveIntegerField):
+            Requests for projects needing the skill.
+
+    Meta:
+        unique_together:
+            One row per owner, day and skill.
+        indexes:
+            day, for the platform-wide range reads.
+
+    Manager:
+        objects (RollupManager):
+            Adds to the counters of existing rows.
+    """
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="daily_skill_requests"
+    )
+    day = models.DateField()
+    skill = models.PositiveSmallIntegerField()
+    requests = models.PositiveIntegerField(default=0)
+
+    objects = RollupManager()
+
+    class Meta:
+        unique_together = (("owner", "day", "skill"),)
+        indexes = [models.Index(fields=["day"])]
+
+    def __str__(self):
+        return f"{self.owner_id} on {self.day}: skill {self.skill}"
+
+
+class DataVersion(models.Model):
+    """
+    A monotonically increasing version counter for a slice of API data.
+
+    Counters are bumped whenever a write touches the data a list endpoint
+    depends on (a user's projects/requests/memberships, a single project's
+    requests and members, or the set of all projects). List views hash the
+    relevant counters into an ETag so unchanged lists can be answered with
+    304 Not Modified without running their query or serializer.
+
+    Attributes:
+        key (CharField):
+            Scope identifier, e.g. "user:<email>", "project:<email>/<name>"
+            or "projects".
+        version (PositiveBigIntegerField):
+            Current version of the scope.
+    """
+
+    key = models.CharField(max_length=400, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} @ {self.version}"
+
+
+
+class Tombstone(models.Model):
+    """
+    Records the deletion of a project, join request or membership so that
+    delta sync clients can drop it from their local lists.
+
+    Deletions that concern specific users (requests and memberships) get one
+    row per affected user; project deletions are visible to everyone and are
+    stored once with no user.
+
+    Attributes:
+        kind (CharField):
+            Which table the deleted row belonged to.
+        object_id (BigIntegerField):
+            Primary key of the deleted row.
+        user_id (BigIntegerField):
+            User the deletion is relevant to, or null for everyone. Stored as
+            a plain integer so tombstones survive the user's own deletion.
+        deleted_at (DateTimeField):
+            Timestamp of the deletion.
+
+    Meta:
+        indexes:
+            (user_id, deleted_at) for the per-user sync scan.
+    """
+
+    PROJECT = "project"
+    REQUEST = "request"
+    MEMBER = "member"
+    KIND_CHOICES = [
+        (PROJECT, "Project"),
+        (REQUEST, "Join request"),
+        (MEMBER, "Project member"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    user_id = models.BigIntegerField(null=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["user_id", "deleted_at"])]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted at {self.deleted_at}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stores the response of a create request sent with an `Idempotency-Key`
+    header so that retries of the same request replay it instead of running
+    the create again.
+
+    Attributes:
+        user (ForeignKey):
+            The user who sent the request. Keys are scoped per user.
+        key (CharField):
+            Client-supplied idempotency key.
+        fingerprint (CharField):
+            Hash of the request method, path and body, used to reject a key
+            reused for a different request.
+        status_code (PositiveSmallIntegerField):
+            Status of the stored response; null while the request holding
+            the key is still running.
+        response_body (JSONField):
+            Body of the stored response.
+        created_at (DateTimeField):
+            Timestamp of the original request.
+
+    Meta:
+        unique_together:
+            One stored response per user and key, which also reserves the
+            key while its request runs.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys"
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = ConflictFreeManager()
+
+    class Meta:
+        unique_together = (("user", "key"),)
+
+    def __str__(self):
+        return f"{self.key} ({self.user_id})"
+
+
+class AccountDeletion(models.Model):
+    """
+    Progress of a user account deletion. The account is deactivated when
+    the deletion is requested; its data is then deleted in batches by the
+    `process_account_deletions` command (see `deletion.py`).
+
+    Attributes:
+        user (OneToOneField):
+            The account being deleted; null once the user row is gone.
+        email (EmailField):
+            Email of the account, kept after the user row is deleted.
+        stage (CharField):
+            Kind of rows being deleted now, one of `deletion.STAGES`.
+        deleted_rows (PositiveBigIntegerField):
+            Number of rows deleted so far.
+        requested_at (DateTimeField):
+            Timestamp of the deletion request.
+        updated_at (DateTimeField):
+            Timestamp of the last batch.
+        completed_at (DateTimeField):
+            When every row was deleted; null while in progress.
+
+    Meta:
+        indexes:
+            Partial index over deletions still in progress, read by the
+            worker.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="deletion"
+    )
+    email = models.EmailField()
+    stage = models.CharField(max_length=20, default="projects")
+    deleted_rows = models.PositiveBigIntegerField(default=0)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["requested_at"], condition=Q(completed_at__isnull=True), name="projects_ad_pending_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"deletion of {self.email} ({self.stage})"
+
+
+class Task(models.Model):
+    """
+    A unit of deferred work in the database task queue (see `taskqueue.py`).
+    Finished tasks are deleted; failed ones are kept for inspection.
+
+    Attributes:
+        name (CharField):
+            Name of the registered task function.
+        kwargs (JSONField):
+            Keyword arguments passed to the function.
+        lane (PositiveSmallIntegerField):
+            Priority lane; lower lanes are dequeued first.
+        status (CharField):
+            QUEUED, RUNNING (claimed by a worker until `locked_until`) or
+            FAILED (out of attempts).
+        attempts (PositiveSmallIntegerField):
+            Number of times the task was claimed.
+        max_attempts (PositiveSmallIntegerField):
+            Attempts before the task is marked failed.
+        run_at (DateTimeField):
+            Earliest time the task may run; pushed back on retries.
+        locked_until (DateTimeField):
+            End of the running worker's lease; the task is queued again
+            if it expires.
+        last_error (TextField):
+            Traceback of the last failed attempt.
+        created_at (DateTimeField):
+            Timestamp of the enqueue.
+
+    Meta:
+        indexes:
+            Partial indexes over queued tasks in dequeue order and over
+            running tasks by lease end.
+    """
+
+    HIGH = 0
+    DEFAULT = 1
+    LOW = 2
+    LANE_CHOICES = [(HIGH, "high"), (DEFAULT, "default"), (LOW, "low")]
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (RUNNING, "Running"), (FAILED, "Failed")]
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict)
+    lane = models.PositiveSmallIntegerField(choices=LANE_CHOICES, default=DEFAULT)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["lane", "run_at", "id"], condition=Q(status="queued"), name="projects_task_queued_idx"
+            ),
+            models.Index(fields=["locked_until"], condition=Q(status="running"), name="projects_task_running_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+class OutboxEvent(models.Model):
+    """
+    A change to projects, join requests or memberships, recorded in the
+    transaction that made it so it is relayed exactly when the change
+    commits (see `outbox.py`). Rows are only ever inserted; they are deleted
+    once every consumer has relayed them and the retention period is over.
+
+    Attributes:
+        kind (CharField):
+            What happened, e.g. "request.submitted".
+        project_id (BigIntegerField):
+            Project the change concerns.
+        user_id (BigIntegerField):
+            The applicant or member (the owner for a created project).
+            Plain integers, so events outlive the rows they describe.
+        payload (JSONField):
+            Details consumers need without reading the source tables.
+        created_at (DateTimeField):
+            Timestamp of the change.
+    """
+
+    PROJECT_CREATED = "project.created"
+    REQUEST_SUBMITTED = "request.submitted"
+    REQUEST_ACCEPTED = "request.accepted"
+    REQUEST_REJECTED = "request.rejected"
+    MEMBER_LEFT = "member.left"
+    KIND_CHOICES = [
+        (PROJECT_CREATED, "Project created"),
+        (REQUEST_SUBMITTED, "Join request submitted"),
+        (REQUEST_ACCEPTED, "Join request accepted"),
+        (REQUEST_REJECTED, "Join request rejected"),
+        (MEMBER_LEFT, "Member left"),
+    ]
+
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    project_id = models.BigIntegerField()
+    user_id = models.BigIntegerField()
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk}"
+
+
+class OutboxCursor(models.Model):
+    """
+    How far an outbox consumer has got: the last event it was given. The
+    relay locks the row while delivering a batch, so concurrent relays
+    never hand the same events to one consumer twice.
+
+    Attributes:
+        consumer (CharField):
+            Consumer name, a key of `OUTBOX_CONSUMERS`.
+        last_id (BigIntegerField):
+            Primary key of the last event delivered.
+        updated_at (DateTimeField):
+            Timestamp of the last delivery.
+    """
+
+    consumer = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.consumer} at {self.last_id}"
+
+
+def webhook_secret():
+    """Random key webhook payloads are signed with."""
+    return secrets.token_hex(32)
+
+
+class WebhookSubscription(models.Model):
+    """
+    An HTTP endpoint of a project owner's that is called back when events of
+    the project happen (see `webhooks.py`).
+
+    Attributes:
+        project (ForeignKey):
+            The project whose events are sent.
+        url (URLField):
+            Endpoint the events are POSTed to.
+        secret (CharField):
+            Key of the HMAC-SHA256 signature sent with every delivery.
+        events (JSONField):
+            Event kinds to send; empty for all of them.
+        is_active (BooleanField):
+            Whether new events are sent.
+        created_at (DateTimeField):
+            Timestamp of the subscription.
+    """
+
+    project = models.ForeignKey(
+        ProjectLead,
+        on_delete=models.CASCADE,
+        related_name="webhooks"
+    )
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=64, default=webhook_secret)
+    events = models.JSONField(default=list, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.url} for {self.project_id}"
+
+
+class WebhookDelivery(models.Model):
+    """
+    One event to POST to one subscription. Delivered rows are deleted;
+    rows that ran out of attempts stay behind as DEAD (the dead letters)
+    until they are retried or their subscription is deleted.
+
+    Attributes:
+        subscription (ForeignKey):
+            The endpoint to call.
+        event_id (BigIntegerField):
+            Id of the outbox event delivered.
+        kind (CharField):
+            Kind of the event.
+        payload (JSONField):
+            Body of the request.
+        status (CharField):
+            PENDING or DEAD.
+        attempts (PositiveSmallIntegerField):
+            Number of requests made so far.
+        next_attempt_at (DateTimeField):
+            When the next request may be made; pushed back while a worker
+            is sending it and on failures.
+        response_status (PositiveSmallIntegerField):
+            HTTP status of the last response, if any.
+        last_error (TextField):
+            Why the last attempt failed.
+        created_at (DateTimeField):
+            Timestamp of the event's fan-out.
+
+    Meta:
+        constraints:
+            An event is delivered to a subscription at most once.
+        indexes:
+            Partial index over pending deliveries in sending order.
+    """
+
+    PENDING = "pending"
+    DEAD = "dead"
+    STATUS_CHOICES = [(PENDING, "Pending"), (DEAD, "Dead")]
+
+    subscription = models.ForeignKey(
+        WebhookSubscription,
+        on_delete=models.CASCADE,
+        related_name="deliveries"
+    )
+    event_id = models.BigIntegerField()
+    kind = models.CharField(max_length=32)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["subscription", "event_id"], name="projects_webhook_delivery_once"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at", "id"], condition=Q(status="pending"), name="projects_wd_pending_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.subscription_id} ({self.status})"
@@ -0,0 +1,262 @@
+"""
+outbox.py
+
+This module implements the transactional outbox: every change other systems
+react to (a project created, a join request submitted, accepted or
+rejected, a member leaving) is recorded as an `OutboxEvent` row in the same
+transaction as the change itself. The request path thus adds a single
+insert, and an event exists if and only if its change committed.
+
+Everything that reacts to the changes runs asynchronously in the relay (the
+`relay_outbox` command), which hands new events in batches to the consumers
+configured in `OUTBOX_CONSUMERS`:
+
+    analytics       Adds the events to the daily analytics rollups.
+    notifications   Emails the users an event concerns.
+    webhooks        Queues deliveries to the projects' webhook
+                    subscriptions (see `webhooks.py`).
+
+Each consumer keeps its own cursor (`OutboxCursor`), locked while a batch is
+delivered and advanced in the same transaction, so a failing consumer only
+holds up itself and is given the same batch again on the next pass. Writes
+a consumer makes to the database commit with its cursor, so they happen
+exactly once; external deliveries (mail, webhooks) are at least once.
+
+Event ids are allocated when the row is inserted, not when it commits, so
+the relay hands events out in id order and stops at the first one younger
+than `OUTBOX_RELAY_LAG_SECONDS`: a transaction still open past that lag
+could otherwise commit an event behind a consumer's cursor. The timestamps
+of the changes do not follow the ids exactly, so stopping there (rather
+than skipping over young events) keeps an older id from ever being passed
+over. Relayed events are deleted after `OUTBOX_RETENTION_DAYS`.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+
+from .analytics import count_decisions, count_projects, count_requests
+from .models import OutboxCursor, OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+def event(kind, project_id, user_id, created_at=None, **payload):
+    """
+    Build an unsaved event.
+
+    Parameters:
+        kind (str): One of the `OutboxEvent` kinds.
+        project_id (int): Project the change concerns.
+        user_id (int): Applicant, member or owner the change concerns.
+        created_at (datetime, optional): Time of the change (now).
+        **payload: JSON-serializable details for the consumers.
+    """
+    return OutboxEvent(
+        kind=kind,
+        project_id=project_id,
+        user_id=user_id,
+        payload=payload,
+        created_at=created_at or timezone.now(),
+    )
+
+
+def record(kind, project_id, user_id, created_at=None, **payload):
+    """Record one event in the current transaction (one insert)."""
+    new_event = event(kind, project_id, user_id, created_at, **payload)
+    new_event.save(force_insert=True)
+    return new_event
+
+
+def record_many(events):
+    """Record events built with `event()` with one multi-row insert."""
+    OutboxEvent.objects.bulk_create(events)
+
+
+def event_data(outbox_event):
+    """JSON-ready representation of an event, as sent to webhooks."""
+    return {
+        "id": outbox_event.pk,
+        "kind": outbox_event.kind,
+        "project": outbox_event.project_id,
+        "user": outbox_event.user_id,
+        "payload": outbox_event.payload,
+        "created_at": outbox_event.created_at.isoformat(),
+    }
+
+
+def _time(value):
+    """Read back a datetime stored in an event payload."""
+    return parse_datetime(value) if isinstance(value, str) else value
+
+
+class Consumer:
+    """
+    Base class of outbox consumers. `deliver()` runs inside the
+    transaction that advances the consumer's cursor and must raise to have
+    the batch delivered again.
+    """
+
+    def deliver(self, events):
+        """Handle a batch of events, in id order."""
+        raise NotImplementedError
+
+
+class AnalyticsConsumer(Consumer):
+    """Counts projects, requests and decisions in the analytics rollups."""
+
+    def deliver(self, events):
+        projects, requests = [], []
+        decisions = {"accepted": [], "rejected": []}
+
+        for outbox_event in events:
+            payload = outbox_event.payload
+            if outbox_event.kind == OutboxEvent.PROJECT_CREATED:
+                projects.append((payload["owner"], outbox_event.created_at))
+            elif outbox_event.kind == OutboxEvent.REQUEST_SUBMITTED:
+                requests.append((payload["owner"], payload["skills"], outbox_event.created_at))
+            elif outbox_event.kind in (OutboxEvent.REQUEST_ACCEPTED, OutboxEvent.REQUEST_REJECTED):
+                outcome = "accepted" if outbox_event.kind == OutboxEvent.REQUEST_ACCEPTED else "rejected"
+                requested_at = _time(payload.get("requested_at"))
+                decisions[outcome].append((payload["owner"], requested_at, outbox_event.created_at))
+
+        count_projects(projects)
+        count_requests(requests)
+        for outcome, rows in decisions.items():
+            count_decisions(outcome, rows)
+
+
+class NotificationConsumer(Consumer):
+    """
+    Emails owners about new requests and departed members, and applicants
+    about decisions, through the configured email backend.
+    """
+
+    MESSAGES = {
+        OutboxEvent.REQUEST_SUBMITTED: ("owner", "New request to join {project}", "{user} asked to join {project}."),
+        OutboxEvent.REQUEST_ACCEPTED: ("user", "Welcome to {project}", "Your request to join {project} was accepted."),
+        OutboxEvent.REQUEST_REJECTED: ("user", "Your request to join {project}", "Your request to join {project} was declined."),
+        OutboxEvent.MEMBER_LEFT: ("owner", "{user} left {project}", "{user} is no longer a member of {project}."),
+    }
+
+    def deliver(self, events):
+        events = [outbox_event for outbox_event in events if outbox_event.kind in self.MESSAGES]
+        if not events:
+            return
+
+        user_ids = set()
+        for outbox_event in events:
+            user_ids.update([outbox_event.user_id, outbox_event.payload["owner"]])
+        emails = dict(User.objects.filter(pk__in=user_ids, is_active=True).values_list("id", "email"))
+
+        messages = []
+        for outbox_event in events:
+            recipient, subject, body = self.MESSAGES[outbox_event.kind]
+            to = emails.get(outbox_event.payload["owner"] if recipient == "owner" else outbox_event.user_id)
+            if to is None:
+                continue
+            names = {
+                "project": outbox_event.payload["projectname"],
+                "user": emails.get(outbox_event.user_id, "A member"),
+            }
+            messages.append(EmailMessage(subject.format(**names), body.format(**names), to=[to]))
+
+        get_connection(fail_silently=False).send_messages(messages)
+
+
+def consumers():
+    """Instantiate the consumers of `OUTBOX_CONSUMERS`, by name."""
+    return {name: import_string(path)() for name, path in settings.OUTBOX_CONSUMERS.items()}
+
+
+def _relay(name, consumer, batch_size):
+    """
+    Deliver the next batch of events to one consumer.
+
+    Returns:
+        int | None: Number of events delivered, or None if another relay
+        holds the consumer's cursor.
+    """
+    OutboxCursor.objects.get_or_create(consumer=name)
+    visible = timezone.now() - timedelta(seconds=settings.OUTBOX_RELAY_LAG_SECONDS)
+
+    with transaction.atomic():
+        cursor = OutboxCursor.objects.select_for_update(skip_locked=True).filter(consumer=name).first()
+        if cursor is None:
+            return None
+
+        events = []
+        for outbox_event in OutboxEvent.objects.filter(id__gt=cursor.last_id).order_by("id")[:batch_size]:
+            if outbox_event.created_at > visible:
+                break
+            events.append(outbox_event)
+
+        if events:
+            consumer.deliver(events)
+            cursor.last_id = events[-1].pk
+            cursor.save(update_fields=["last_id", "updated_at"])
+
+    return len(events)
+
+
+def relay_once(batch_size=None, consumer_map=None):
+    """
+    Deliver one batch of new events to every consumer.
+
+    Parameters:
+        batch_size (int, optional): Events per batch (`OUTBOX_BATCH_SIZE`).
+        consumer_map (dict, optional): Consumers by name (`consumers()`).
+
+    Returns:
+        dict[str, int | Exception]: Events delivered to each consumer, or
+        the error its delivery raised.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    outcomes = {}
+
+    for name, consumer in (consumer_map or consumers()).items():
+        try:
+            outcomes[name] = _relay(name, consumer, batch_size) or 0
+        except Exception as e:
+            logger.exception("Outbox consumer %s failed", name)
+            outcomes[name] = e
+
+    return outcomes
+
+
+def prune(batch_size=10000):
+    """
+    Delete events every configured consumer has relayed, once they are
+    older than `OUTBOX_RETENTION_DAYS`.
+
+    Returns:
+        int: Number of events deleted.
+    """
+    cursors = OutboxCursor.objects.filter(consumer__in=list(settings.OUTBOX_CONSUMERS))
+    if cursors.count() < len(settings.OUTBOX_CONSUMERS):
+        # A consumer that never ran has relayed nothing yet
+        return 0
+
+    relayed = cursors.aggregate(last=Min("last_id"))["last"] or 0
+    cutoff = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    deleted = 0
+
+    while True:
+        ids = list(
+            OutboxEvent.objects.filter(id__lte=relayed, created_at__lt=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += OutboxEvent.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,214 @@
+"""
+partitions.py
+
+This module manages the monthly partitions of the rejections table
+(`ProjectRequestRejected`) on PostgreSQL.
+
+Migration 0016 turns the table into a partitioned table (`PARTITION BY RANGE
+(rejected_on)`) with one partition per month and a DEFAULT partition that
+catches rows outside every month created so far. Writes and reads of recent
+rejections therefore only touch the small partitions of the last months,
+and old rejections are removed by dropping whole partitions instead of
+running `DELETE`.
+
+A partitioned table can only enforce unique keys that include the partition
+column, so the `(project, user)` uniqueness declared by the model is kept by
+a `BEFORE INSERT` trigger instead: it serializes inserts of the same pair
+with an advisory lock and skips the row when the pair already exists, which
+`INSERT ... ON CONFLICT DO NOTHING` callers see as a conflict. Row triggers
+on partitioned tables need PostgreSQL 13 or later.
+
+On other databases the table stays a plain table and retention falls back
+to batched deletes.
+
+Neither path sends the ORM delete signals, so retention bumps the data
+versions of the users and projects whose rejections it removed itself.
+Rejections are not part of delta sync, so no tombstones are left.
+"""
+
+import re
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ProjectLead, ProjectRequestRejected
+from .versioning import bump_versions, project_key, user_key
+
+User = get_user_model()
+
+TABLE = "projects_projectrequestrejected"
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(day):
+    """First day of the month of a date."""
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    """First day of the month `count` months after `month`."""
+    years, index = divmod(month.month - 1 + count, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def _bound(month):
+    """SQL literal of the first instant of a month (UTC)."""
+    return f"'{datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()}'"
+
+
+def bump_rejected(pairs):
+    """
+    Bump the versions affected by removed rejections: the rejected users,
+    the projects and their owners.
+
+    Parameters:
+        pairs (Iterable[tuple[int, int]]): `(project_id, user_id)` of the
+            removed rejections.
+    """
+    project_ids, user_ids = set(), set()
+    for project_id, user_id in pairs:
+        project_ids.add(project_id)
+        user_ids.add(user_id)
+    if not project_ids:
+        return
+
+    keys = {user_key(email) for email in User.objects.filter(id__in=user_ids).values_list("email", flat=True)}
+    projects = ProjectLead.all_objects.filter(id__in=project_ids).values_list("owner__email", "projectname")
+    for owner_email, projectname in projects:
+        keys.update([user_key(owner_email), project_key(owner_email, projectname)])
+    bump_versions(keys)
+
+
+def is_partitioned(cursor):
+    """Return whether the rejections table is partitioned."""
+    if cursor.db.vendor != "postgresql":
+        return False
+    cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [TABLE])
+    return cursor.fetchone() is not None
+
+
+def monthly_partitions(cursor):
+    """
+    Return the monthly partitions of the rejections table.
+
+    Returns:
+        dict[date, str]: Partition name per month (first day).
+    """
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = %s::regclass",
+        [TABLE],
+    )
+    months = {}
+    for (name,) in cursor.fetchall():
+        match = PARTITION.match(name)
+        if match:
+            months[date(int(match[1]), int(match[2]), 1)] = name
+    return months
+
+
+def create_partition(cursor, month):
+    """
+    Create the partition of a month.
+
+    Rows of that month already stored in the DEFAULT partition are moved
+    into it first, since the partition could not be attached otherwise.
+    """
+    name, start, end = partition_name(month), _bound(month), _bound(add_months(month, 1))
+    cursor.execute(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)")
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE rejected_on >= {start} AND rejected_on < {end} "
+        f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+    )
+    cursor.execute(f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ({start}) TO ({end})")
+
+
+def ensure_partitions(ahead, today=None):
+    """
+    Create the partitions of the current month and the `ahead` next months
+    that do not exist yet.
+
+    Returns:
+        list[str]: Names of the partitions created.
+    """
+    current = month_start(today or timezone.localdate())
+    created = []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return created
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))", [f"{TABLE}:partitions"])
+
+        existing = monthly_partitions(cursor)
+        for offset in range(ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                create_partition(cursor, month)
+                created.append(partition_name(month))
+
+    return created
+
+
+def drop_partitions(keep_months, today=None):
+    """
+    Drop the partitions of months older than the `keep_months` months before
+    the current one, and delete rows that old from the DEFAULT partition.
+
+    Returns:
+        list[str]: Names of the partitions dropped.
+    """
+    cutoff = add_months(month_start(today or timezone.localdate()), -keep_months)
+    dropped = []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return dropped
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))", [f"{TABLE}:partitions"])
+
+        removed = set()
+        for month, name in sorted(monthly_partitions(cursor).items()):
+            if month < cutoff:
+                cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+                cursor.execute(f"SELECT DISTINCT project_id, user_id FROM {name}")
+                removed.update(cursor.fetchall())
+                cursor.execute(f"DROP TABLE {name}")
+                dropped.append(name)
+
+        cursor.execute(
+            f"DELETE FROM {DEFAULT_PARTITION} WHERE rejected_on < {_bound(cutoff)} RETURNING project_id, user_id"
+        )
+        removed.update(cursor.fetchall())
+        bump_rejected(removed)
+
+    return dropped
+
+
+def delete_old_rejections(keep_months, batch_size=5000, today=None):
+    """
+    Retention for databases without partitions: delete rejections older than
+    the `keep_months` months before the current one, in batches.
+
+    Yields:
+        int: Rows deleted by each batch.
+    """
+    cutoff = add_months(month_start(today or timezone.localdate()), -keep_months)
+    old = ProjectRequestRejected.objects.filter(
+        rejected_on__lt=datetime(cutoff.year, cutoff.month, 1, tzinfo=dt_timezone.utc)
+    )
+
+    while True:
+        rows = list(old.order_by("id").values_list("id", "project_id", "user_id")[:batch_size])
+        if not rows:
+            return
+        ids = [row[0] for row in rows]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+            bump_rejected(row[1:] for row in rows)
+        yield len(ids)
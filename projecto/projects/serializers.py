@@ -6,32 +6,56 @@ perform custom object creation, and expose structured API representations.
 Author: Pranav Singh
 """
 
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
 from rest_framework import serializers
-from .models import ProjectLead, ProjectRequest, ProjectMembers, ProjectRequestRejected
+from accounts.skills import SkillFlagsMixin, SkillsField
+from .capacity import ProjectFull, take_seat
+from .models import (
+    OutboxEvent, ProjectInvitation, ProjectLead, ProjectRequest, ProjectMembers, ProjectRequestRejected,
+    WebhookSubscription,
+)
+from .lookups import get_user, get_project
+from .outbox import event, record_many
+from .trending import REQUEST, record_on_commit
+from .versioning import bump_versions, project_key, user_key
+from .webhooks import resolve
+from .writebuffer import buffering_enabled, submit_project_request
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 
-class ProjectLeadCreateSerializer(serializers.ModelSerializer):
+# The owner is not a serializer field, so the (owner, projectname) constraint
+# is enforced by the insert and reported with this error
+DUPLICATE_PROJECT_NAME = {"projectname": "You already have a project with this name."}
+
+
+class ProjectLeadCreateSerializer(SkillFlagsMixin, serializers.ModelSerializer):
     """
     Serializer used for creating new projects.
 
     Extra Fields:
         email (str, write_only): Email of the user creating the project.
+        skills (list[str], optional): Names of the skills the project needs.
 
     Validates:
         - Whether the user with the given email exists.
+        - Whether the user has no other active project with this name.
 
     Creates:
         A new ProjectLead instance associated with the authenticated user.
     """
 
     email = serializers.EmailField(write_only=True)
+    skills = SkillsField(required=False)
 
     class Meta:
         model = ProjectLead
-        fields = ["email", "projectname", "description", "frontend", "backend"]
+        fields = ["email", "projectname", "description", "frontend", "backend", "skills", "max_members"]
 
     def create(self, validated_data):
         """
@@ -48,22 +72,41 @@ class ProjectLeadCreateSerializer(serializers.ModelSerializer):
         """
         email = validated_data.pop("email")
         try:
-            user = User.objects.get(email=email)
+            user = get_user(email)
         except User.DoesNotExist:
             raise serializers.ValidationError({"email": "User with this email does not exist"})
 
         validated_data["owner"] = user
 
-        project = ProjectLead.objects.create(
-            owner=validated_data["owner"],
-            projectname=validated_data["projectname"],
-            description=validated_data["description"],
-            frontend=validated_data["frontend"],
-            backend=validated_data["backend"],
-        )
+        # The outbox event is recorded in the same transaction as the project
+        try:
+            with transaction.atomic():
+                project = ProjectLead.objects.create(
+                    owner=validated_data["owner"],
+                    projectname=validated_data["projectname"],
+                    description=validated_data["description"],
+                    frontend=validated_data["frontend"],
+                    backend=validated_data["backend"],
+                    skills=validated_data.get("skills", 0),
+                    max_members=validated_data.get("max_members"),
+                )
+        except IntegrityError:
+            raise serializers.ValidationError(DUPLICATE_PROJECT_NAME)
 
         return project
 
+    def update(self, instance, validated_data):
+        """
+        Update a project; renaming it to the name of another active project
+        of the owner's is rejected like a duplicate create.
+        """
+        validated_data.pop("email", None)
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(DUPLICATE_PROJECT_NAME)
+
 
 class ProjectLeadSerializer(serializers.ModelSerializer):
     """
@@ -75,10 +118,13 @@ class ProjectLeadSerializer(serializers.ModelSerializer):
     """
 
     email = serializers.EmailField(read_only=True)
+    skills = SkillsField(read_only=True)
 
     class Meta:
         model = ProjectLead
-        fields = ["email", "projectname", "description", "frontend", "backend"]
+        fields = [
+            "email", "projectname", "description", "frontend", "backend", "skills", "max_members", "seats_taken",
+        ]
 
 
 class ProjectDisplaySerializer(serializers.ModelSerializer):
@@ -86,18 +132,22 @@ class ProjectDisplaySerializer(serializers.ModelSerializer):
     Serializer used for listing public project information.
 
     Adds:
+        id (int): Project id, used for bulk join requests.
         owner_email (str): Owner's email.
         fname (str): First name of owner.
         lname (str): Last name of owner.
+        skills (list[str]): Names of the skills the project needs.
     """
 
     owner_email = serializers.EmailField(source="owner.email", read_only=True)
     fname = serializers.CharField(source="owner.firstname", read_only=True)
     lname = serializers.CharField(source="owner.lastname", read_only=True)
+    skills = SkillsField(read_only=True)
 
     class Meta:
         model = ProjectLead
         fields = [
+            "id",
             "owner_email",
             "fname",
             "lname",
@@ -105,9 +155,45 @@ class ProjectDisplaySerializer(serializers.ModelSerializer):
             "description",
             "frontend",
             "backend",
+            "skills",
+            "max_members",
+            "seats_taken",
         ]
 
 
+class SimilarProjectSerializer(ProjectDisplaySerializer):
+    """
+    Serializer for projects suggested as similar to another project.
+
+    Adds:
+        similarity (float): Cosine similarity of the project's name and
+                            description with the viewed project (0 to 1).
+    """
+
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta(ProjectDisplaySerializer.Meta):
+        fields = ProjectDisplaySerializer.Meta.fields + ["similarity"]
+
+
+class TrendingProjectSerializer(ProjectDisplaySerializer):
+    """
+    Serializer for trending projects.
+
+    Adds:
+        requests (int): Join requests received in the window.
+        joins (int): Members accepted in the window.
+        score (int): Trending score (requests plus weighted joins).
+    """
+
+    requests = serializers.IntegerField(read_only=True)
+    joins = serializers.IntegerField(read_only=True)
+    score = serializers.IntegerField(read_only=True)
+
+    class Meta(ProjectDisplaySerializer.Meta):
+        fields = ProjectDisplaySerializer.Meta.fields + ["requests", "joins", "score"]
+
+
 class ProjectRequestCreateSerializer(serializers.ModelSerializer):
     """
     Serializer used for submitting a project join request.
@@ -118,7 +204,8 @@ class ProjectRequestCreateSerializer(serializers.ModelSerializer):
         member_email (str): Requesting user's email.
 
     Creates:
-        A ProjectRequest record.
+        A ProjectRequest record, or returns the existing one if the member
+        already requested this project (`created` is then False).
 
     Validates:
         - owner exists
@@ -156,32 +243,163 @@ class ProjectRequestCreateSerializer(serializers.ModelSerializer):
 
         # Validate owner
         try:
-            owner = User.objects.get(email=owner_email)
+            owner = get_user(owner_email)
         except User.DoesNotExist:
             raise serializers.ValidationError({"owner_email": "Owner with this email does not exist."})
 
         # Validate member
         try:
-            member = User.objects.get(email=member_email)
+            member = get_user(member_email)
         except User.DoesNotExist:
             raise serializers.ValidationError({"member_email": "Member with this email does not exist."})
 
         # Validate project
         try:
-            project = ProjectLead.objects.filter(owner=owner).get(projectname=projectname)
+            project = get_project(owner, projectname)
         except ProjectLead.DoesNotExist:
             raise serializers.ValidationError({"projectname": "This project does not exist."})
 
-        # Create request
-        new_request = ProjectRequest.objects.create(
-            project=project,
-            member=member,
-            message=message,
-        )
+        # Create request, or return the existing one on a retried submission
+        if buffering_enabled():
+            new_request, self.created = submit_project_request(project, member, message)
+        else:
+            with transaction.atomic():
+                new_request, self.created = ProjectRequest.objects.insert_or_get(
+                    ("project", "member"),
+                    project=project,
+                    member=member,
+                    message=message,
+                )
 
         return new_request
 
 
+class ProjectRequestBulkItemSerializer(serializers.Serializer):
+    """
+    A single entry of a bulk join request submission.
+
+    Fields:
+        project (int): Id of the project to join.
+        message (str): Message sent to the project owner.
+    """
+
+    project = serializers.IntegerField()
+    message = serializers.CharField(max_length=400, default="I am interested in joining this project")
+
+
+class ProjectRequestBulkSerializer(serializers.Serializer):
+    """
+    Serializer for submitting join requests to several projects at once.
+
+    Inputs:
+        requests (list): Entries of `ProjectRequestBulkItemSerializer`.
+
+    Creates:
+        One ProjectRequest per eligible project, in a single multi-row
+        insert. Projects are resolved, together with the member's existing
+        requests and memberships, in a single query.
+
+    Outcomes (per entry, in input order):
+        created: the request was submitted.
+        requested: the member already requested this project.
+        member: the member already belongs to this project.
+        own_project: the member owns this project.
+        duplicate: the project appears earlier in the same submission.
+        not_found: no project has this id.
+    """
+
+    requests = ProjectRequestBulkItemSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        limit = getattr(settings, "BULK_REQUEST_MAX_ITEMS", 50)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} projects can be requested at once.")
+        return value
+
+    def create(self, validated_data):
+        """
+        Submit join requests for the member to every eligible project.
+
+        Parameters:
+            validated_data (dict): Contains `requests` and the requesting
+                                   `member` (Users).
+
+        Returns:
+            list[dict]: One `{"project": id, "status": outcome}` per entry.
+        """
+        member = validated_data["member"]
+        entries = validated_data["requests"]
+
+        projects = {
+            project["id"]: project
+            for project in ProjectLead.objects.filter(id__in=[entry["project"] for entry in entries])
+            .annotate(
+                requested=Exists(ProjectRequest.objects.filter(project=OuterRef("pk"), member=member)),
+                joined=Exists(ProjectMembers.objects.filter(project=OuterRef("pk"), member=member)),
+            )
+            .values("id", "owner_id", "owner__email", "projectname", "skills", "requested", "joined")
+        }
+
+        outcomes = []
+        candidates = []
+        seen = set()
+
+        for entry in entries:
+            project = projects.get(entry["project"])
+
+            if project is None:
+                outcome = "not_found"
+            elif project["id"] in seen:
+                outcome = "duplicate"
+            elif project["owner_id"] == member.pk:
+                outcome = "own_project"
+            elif project["joined"]:
+                outcome = "member"
+            elif project["requested"]:
+                outcome = "requested"
+            else:
+                outcome = "created"
+                candidates.append((len(outcomes), project, entry["message"]))
+
+            seen.add(entry["project"])
+            outcomes.append({"project": entry["project"], "status": outcome})
+
+        if candidates:
+            with transaction.atomic():
+                results = ProjectRequest.objects.insert_many_or_get(("project", "member"), [
+                    {"project_id": project["id"], "member": member, "message": message}
+                    for _, project, message in candidates
+                ])
+
+                # A concurrent submission may have inserted some of the
+                # requests first: only the rows inserted here are new
+                inserted = []
+                for (index, project, _), (new_request, created) in zip(candidates, results):
+                    if created:
+                        inserted.append((project, new_request))
+                    else:
+                        outcomes[index]["status"] = "requested"
+
+                # insert_many_or_get sends no post_save, so bump the affected
+                # versions, record the outbox events and count for trending
+                # here
+                touched = {user_key(member.email)}
+                for project, _ in inserted:
+                    touched.add(user_key(project["owner__email"]))
+                    touched.add(project_key(project["owner__email"], project["projectname"]))
+                bump_versions(touched)
+                record_many([
+                    event(
+                        OutboxEvent.REQUEST_SUBMITTED, project["id"], member.pk, new_request.created_at,
+                        owner=project["owner_id"], projectname=project["projectname"], skills=project["skills"],
+                    )
+                    for project, new_request in inserted
+                ])
+                record_on_commit(REQUEST, [new_request.project_id for _, new_request in inserted])
+
+        return outcomes
+
+
 class ProjectRequestSerializer(serializers.ModelSerializer):
     """
     Serializer used for listing join requests received by the project owner.
@@ -215,7 +433,8 @@ class ProjectMemberCreateSerializer(serializers.ModelSerializer):
         projectname (str): Name of project.
 
     Creates:
-        ProjectMembers entry.
+        ProjectMembers entry, or returns the existing one if the member was
+        already accepted (`created` is then False).
     """
 
     email = serializers.EmailField(write_only=True)
@@ -234,9 +453,13 @@ class ProjectMemberCreateSerializer(serializers.ModelSerializer):
             - owner exists
             - member exists
             - project exists (owned by owner)
+            - project has an open seat (see `capacity.py`)
 
         Returns:
             ProjectMembers: newly added member record
+
+        Raises:
+            ProjectFull: If the project has reached `max_members`.
         """
         owner_email = validated_data.pop("owner")
         member_email = validated_data.pop("email")
@@ -244,27 +467,34 @@ class ProjectMemberCreateSerializer(serializers.ModelSerializer):
 
         # Validate owner
         try:
-            owner = User.objects.get(email=owner_email)
+            owner = get_user(owner_email)
         except User.DoesNotExist:
             raise serializers.ValidationError({"owner": "Owner with this email does not exist"})
 
         # Validate member
         try:
-            member = User.objects.get(email=member_email)
+            member = get_user(member_email)
         except User.DoesNotExist:
             raise serializers.ValidationError({"member": "Member with this email does not exist"})
 
         # Validate project
         try:
-            project = ProjectLead.objects.filter(owner=owner).get(projectname=projectname)
+            project = get_project(owner, projectname)
         except ProjectLead.DoesNotExist:
             raise serializers.ValidationError({"project": "This project does not exist"})
 
-        new_joinee = ProjectMembers.objects.create(
-            project=project,
-            member=member,
-            message=validated_data["message"]
-        )
+        # The seat is taken in the same transaction as the insert, and given
+        # back by rolling it back if the member turns out to exist already
+        with transaction.atomic():
+            new_joinee, self.created = ProjectMembers.objects.insert_or_get(
+                ("project", "member"),
+                project=project,
+                member=member,
+                message=validated_data["message"]
+            )
+
+            if self.created and not take_seat(project):
+                raise ProjectFull()
 
         return new_joinee
 
@@ -279,7 +509,8 @@ class ProjectRejectedCreateSerializer(serializers.ModelSerializer):
         projectname (str): Name of the project.
 
     Creates:
-        ProjectRequestRejected entry.
+        ProjectRequestRejected entry, or returns the existing one if the
+        user was already rejected (`created` is then False).
     """
 
     email = serializers.EmailField(write_only=True)
@@ -308,27 +539,29 @@ class ProjectRejectedCreateSerializer(serializers.ModelSerializer):
 
         # Validate owner
         try:
-            owner = User.objects.get(email=owner_email)
+            owner = get_user(owner_email)
         except User.DoesNotExist:
             raise serializers.ValidationError({"owner": "Owner with this email does not exist"})
 
         # Validate member
         try:
-            member = User.objects.get(email=member_email)
+            member = get_user(member_email)
         except User.DoesNotExist:
             raise serializers.ValidationError({"member": "Member with this email does not exist"})
 
         # Validate project
         try:
-            project = ProjectLead.objects.filter(owner=owner).get(projectname=projectname)
+            project = get_project(owner, projectname)
         except ProjectLead.DoesNotExist:
             raise serializers.ValidationError({"project": "This project does not exist"})
 
-        new_reject = ProjectRequestRejected.objects.create(
-            project=project,
-            user=member,
-            message=validated_data["message"]
-        )
+        with transaction.atomic():
+            new_reject, self.created = ProjectRequestRejected.objects.insert_or_get(
+                ("project", "user"),
+                project=project,
+                user=member,
+                message=validated_data["message"]
+            )
 
         return new_reject
 
@@ -404,4 +637,222 @@ class PendingProjectRequests(serializers.ModelSerializer):
 
     class Meta:
         model = ProjectRequest
-        fields = ["projectname", "description", "message", "owner_email", "owner_fname", "owner_lname"]
\ No newline at end of file
+        fields = ["projectname", "description", "message", "owner_email", "owner_fname", "owner_lname"]
+
+class CandidateSerializer(serializers.ModelSerializer):
+    """
+    Serializer for users suggested to a project owner.
+
+    Read-only Fields:
+        email, firstname, lastname (str): User details.
+        skills (list[str]): Names of the user's skills.
+        score (int): Number of the project's skills the user has.
+    """
+
+    skills = SkillsField(read_only=True)
+    score = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = User
+        fields = ["email", "firstname", "lastname", "skills", "score"]
+
+
+class ProjectInviteSerializer(serializers.Serializer):
+    """
+    Serializer for inviting several users to a project at once.
+
+    Inputs:
+        emails (list[str]): Emails of the users to invite.
+        message (str, optional): Message sent with every invitation.
+
+    Creates:
+        One ProjectInvitation per new invitee, in a single multi-row insert.
+        Invitees are resolved with one query.
+
+    Outcomes (per email, in input order):
+        invited: the invitation was created.
+        already_invited: the user was invited before (or earlier in the
+                         same submission).
+        own_project: the email is the owner's.
+        not_found: no active user has this email.
+    """
+
+    emails = serializers.ListField(child=serializers.EmailField(), allow_empty=False)
+    message = serializers.CharField(max_length=400, required=False)
+
+    def validate_emails(self, value):
+        limit = getattr(settings, "BULK_INVITE_MAX_ITEMS", 100)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} users can be invited at once.")
+        return value
+
+    def create(self, validated_data):
+        """
+        Invite every eligible user to the project.
+
+        Parameters:
+            validated_data (dict): Contains `emails`, optional `message` and
+                                   the `project` (ProjectLead).
+
+        Returns:
+            list[dict]: One `{"email": email, "status": outcome}` per entry.
+        """
+        project = validated_data["project"]
+        emails = validated_data["emails"]
+        extra = {"message": validated_data["message"]} if "message" in validated_data else {}
+
+        users = dict(User.objects.filter(email__in=emails, is_active=True).values_list("email", "id"))
+
+        invitees = []
+        for email in emails:
+            user_id = users.get(email)
+            if user_id is not None and user_id != project.owner_id:
+                invitees.append(email)
+
+        rows = [{"project": project, "user_id": users[email], **extra} for email in dict.fromkeys(invitees)]
+        results = ProjectInvitation.objects.insert_many_or_get(("project", "user"), rows) if rows else []
+        created = {invitation.user_id for invitation, was_created in results if was_created}
+
+        outcomes = []
+        for email in emails:
+            user_id = users.get(email)
+            if user_id is None:
+                outcome = "not_found"
+            elif user_id == project.owner_id:
+                outcome = "own_project"
+            elif user_id in created:
+                outcome = "invited"
+                created.discard(user_id)
+            else:
+                outcome = "already_invited"
+            outcomes.append({"email": email, "status": outcome})
+
+        return outcomes
+
+
+class WebhookSubscriptionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a project's webhook subscriptions.
+
+    Fields:
+        url (str): Endpoint the project's events are POSTed to.
+        events (list[str], optional): Event kinds to send; all if empty.
+        is_active (bool, optional): Whether events are sent.
+
+    Read-only Fields:
+        id (int), created_at (datetime).
+        secret (str): Key the `X-Webhook-Signature` header is computed with.
+    """
+
+    events = serializers.ListField(
+        child=serializers.ChoiceField(choices=OutboxEvent.KIND_CHOICES), required=False, allow_empty=True
+    )
+
+    class Meta:
+        model = WebhookSubscription
+        fields = ["id", "url", "events", "is_active", "secret", "created_at"]
+        read_only_fields = ["secret", "created_at"]
+
+    def validate_url(self, value):
+        parts = urlsplit(value)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise serializers.ValidationError("Only http and https URLs are supported.")
+
+        # Checked again on every connection (see `webhooks.py`)
+        try:
+            resolve(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        except OSError:
+            raise serializers.ValidationError("The host cannot be resolved.")
+        except ValueError as e:
+            raise serializers.ValidationError(f"The host must be public: {e}.")
+        return value
+
+
+class SyncProjectSerializer(serializers.ModelSerializer):
+    """
+    Serializer for projects returned by the delta sync endpoint.
+
+    Read-only Fields:
+        id (int): Project id, used by clients to merge changes.
+        owner_email, fname, lname (str): Owner details.
+        skills (list[str]): Names of the skills the project needs.
+        updated_at (datetime): Timestamp of the last change.
+    """
+
+    owner_email = serializers.EmailField(source="owner.email", read_only=True)
+    fname = serializers.CharField(source="owner.firstname", read_only=True)
+    lname = serializers.CharField(source="owner.lastname", read_only=True)
+    skills = SkillsField(read_only=True)
+
+    class Meta:
+        model = ProjectLead
+        fields = [
+            "id",
+            "owner_email",
+            "fname",
+            "lname",
+            "projectname",
+            "description",
+            "frontend",
+            "backend",
+            "skills",
+            "updated_at",
+        ]
+
+
+class SyncRequestSerializer(serializers.ModelSerializer):
+    """
+    Serializer for join requests returned by the delta sync endpoint.
+
+    Covers both the requests a user sent and the requests received on the
+    user's own projects.
+    """
+
+    projectname = serializers.CharField(source="project.projectname", read_only=True)
+    owner_email = serializers.EmailField(source="project.owner.email", read_only=True)
+    member_email = serializers.EmailField(source="member.email", read_only=True)
+    fname = serializers.CharField(source="member.firstname", read_only=True)
+    lname = serializers.CharField(source="member.lastname", read_only=True)
+
+    class Meta:
+        model = ProjectRequest
+        fields = [
+            "id",
+            "project",
+            "projectname",
+            "owner_email",
+            "member_email",
+            "fname",
+            "lname",
+            "message",
+            "updated_at",
+        ]
+
+
+class SyncMemberSerializer(serializers.ModelSerializer):
+    """
+    Serializer for memberships returned by the delta sync endpoint.
+
+    Covers both the projects a user joined and the members of the user's
+    own projects.
+    """
+
+    projectname = serializers.CharField(source="project.projectname", read_only=True)
+    owner_email = serializers.EmailField(source="project.owner.email", read_only=True)
+    member_email = serializers.EmailField(source="member.email", read_only=True)
+    member_fname = serializers.CharField(source="member.firstname", read_only=True)
+    member_lname = serializers.CharField(source="member.lastname", read_only=True)
+
+    class Meta:
+        model = ProjectMembers
+        fields = [
+            "id",
+            "project",
+            "projectname",
+            "owner_email",
+            "member_email",
+            "member_fname",
+            "member_lname",
+            "joined_on",
+            "updated_at",
+        ]
@@ -0,0 +1,296 @@
+"""
+signals.py
+
+Model signal handlers for the projects app. Every write to a project, join
+request, membership or rejection bumps the data version counters of the
+scopes it affects. Those counters drive the ETags served by the list
+endpoints and act as the invalidation tags of the response cache.
+
+Deletions of projects, join requests and memberships additionally leave a
+`Tombstone` behind so delta sync clients learn about them (an archived
+project leaves its tombstone when archived), and a removed membership frees
+its seat on the project.
+
+Saved and deleted users update the in-memory skill index used by candidate
+search, committed project and membership changes update the in-memory
+collaboration graph, and committed project writes update the similar-projects
+index.
+
+Created projects, join requests, accepts and rejects and departed members
+are recorded in the outbox (see `outbox.py`) in the transaction that wrote
+them; the analytics rollups are updated from there by the relay.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .candidates import skill_index
+from .collabgraph import collaboration_graph
+from .capacity import release_seat
+from .similarity import project_text, similar_projects_index
+from .trending import JOIN, REQUEST, record_on_commit
+from .models import OutboxEvent, ProjectLead, ProjectRequest, ProjectMembers, ProjectRequestRejected, Tombstone
+from .outbox import record
+from .versioning import PROJECTS_KEY, bump_versions, project_key, user_key
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=ProjectLead)
+@receiver(post_delete, sender=ProjectLead)
+def project_changed(sender, instance, **kwargs):
+    """
+    Bump the owner's, the project's and the global project-list versions.
+    """
+    owner_email = instance.owner.email
+    bump_versions([
+        user_key(owner_email),
+        project_key(owner_email, instance.projectname),
+        PROJECTS_KEY,
+    ])
+
+
+@receiver(post_delete, sender=ProjectLead)
+def project_deleted(sender, instance, **kwargs):
+    """
+    Leave a tombstone visible to every user for a deleted project.
+    """
+    if instance.archived_at is None:
+        Tombstone.objects.create(kind=Tombstone.PROJECT, object_id=instance.pk)
+
+
+def _project_info(project_id):
+    """
+    Fetch the owner id, owner email and name of a project in one query.
+
+    Returns:
+        tuple[int, str, str] | None: Owner id, owner email and project name,
+        or None if the project no longer exists.
+    """
+    return (
+        ProjectLead.all_objects.filter(pk=project_id)
+        .values_list("owner_id", "owner__email", "projectname")
+        .first()
+    )
+
+
+def _bump_for(project, user_id):
+    """
+    Bump the versions of a user, a project and the project's owner.
+
+    Parameters:
+        project (tuple | None): Result of `_project_info()`.
+        user_id (int): Primary key of the affected member/applicant.
+    """
+    member_email = User.objects.filter(pk=user_id).values_list("email", flat=True).first()
+
+    keys = []
+    if member_email:
+        keys.append(user_key(member_email))
+    if project:
+        _, owner_email, projectname = project
+        keys += [user_key(owner_email), project_key(owner_email, projectname)]
+
+    bump_versions(keys)
+
+
+@receiver(post_save, sender=ProjectRequest)
+@receiver(post_save, sender=ProjectMembers)
+def membership_saved(sender, instance, **kwargs):
+    """
+    Bump the versions of the member, the project owner and the project
+    affected by a join request or membership write.
+    """
+    _bump_for(_project_info(instance.project_id), instance.member_id)
+
+
+@receiver(post_delete, sender=ProjectRequest)
+@receiver(post_delete, sender=ProjectMembers)
+def membership_deleted(sender, instance, **kwargs):
+    """
+    Bump versions for a deleted join request or membership and leave a
+    tombstone for both the member and the project owner; a member leaving
+    is also recorded in the outbox.
+    """
+    project = _project_info(instance.project_id)
+    _bump_for(project, instance.member_id)
+
+    kind = Tombstone.REQUEST if sender is ProjectRequest else Tombstone.MEMBER
+    user_ids = {instance.member_id}
+    if project:
+        user_ids.add(project[0])
+
+    Tombstone.objects.bulk_create([
+        Tombstone(kind=kind, object_id=instance.pk, user_id=user_id) for user_id in user_ids
+    ])
+
+    if sender is ProjectMembers and project:
+        record(
+            OutboxEvent.MEMBER_LEFT, instance.project_id, instance.member_id,
+            owner=project[0], projectname=project[2],
+        )
+
+
+@receiver(post_delete, sender=ProjectMembers)
+def member_removed(sender, instance, **kwargs):
+    """
+    Free the removed member's seat on the project.
+    """
+    release_seat(instance.project_id)
+
+
+@receiver(post_save, sender=ProjectRequestRejected)
+@receiver(post_delete, sender=ProjectRequestRejected)
+def rejection_changed(sender, instance, **kwargs):
+    """
+    Bump the versions of the rejected user, the project owner and the project.
+    """
+    _bump_for(_project_info(instance.project_id), instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    """
+    Index the user's current skills; inactive users are not suggested.
+    """
+    skill_index.update(instance.pk, instance.skills if instance.is_active else 0)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """
+    Remove the user from the skill index.
+    """
+    skill_index.update(instance.pk, 0)
+
+
+@receiver(post_save, sender=ProjectLead)
+def project_graph_saved(sender, instance, created, **kwargs):
+    """
+    Add a new project's owner to the collaboration graph, or remove an
+    archived project from it, once committed.
+    """
+    if instance.archived_at is not None:
+        change = ("drop", instance.pk)
+    elif created:
+        change = ("project", instance.pk, instance.owner_id)
+    else:
+        return
+    transaction.on_commit(lambda: collaboration_graph.apply(change))
+
+
+@receiver(post_delete, sender=ProjectLead)
+def project_graph_deleted(sender, instance, **kwargs):
+    """
+    Remove a deleted project from the collaboration graph once committed.
+    """
+    change = ("drop", instance.pk)
+    transaction.on_commit(lambda: collaboration_graph.apply(change))
+
+
+@receiver(post_save, sender=ProjectMembers)
+def member_graph_saved(sender, instance, created, **kwargs):
+    """
+    Connect a new member with the project's team once committed.
+    """
+    if created:
+        change = ("join", instance.project_id, instance.project.owner_id, instance.member_id)
+        transaction.on_commit(lambda: collaboration_graph.apply(change))
+
+
+@receiver(post_delete, sender=ProjectMembers)
+def member_graph_deleted(sender, instance, **kwargs):
+    """
+    Disconnect a removed member from the project's team once committed.
+    """
+    change = ("leave", instance.project_id, instance.member_id)
+    transaction.on_commit(lambda: collaboration_graph.apply(change))
+
+
+@receiver(post_save, sender=ProjectLead)
+def project_text_saved(sender, instance, **kwargs):
+    """
+    Re-index a created or edited project's text, or remove an archived
+    project, once committed.
+    """
+    if instance.archived_at is not None:
+        change = ("remove", instance.pk)
+    else:
+        change = ("upsert", instance.pk, project_text(instance.projectname, instance.description))
+    transaction.on_commit(lambda: similar_projects_index.apply(change))
+
+
+@receiver(post_delete, sender=ProjectLead)
+def project_text_deleted(sender, instance, **kwargs):
+    """
+    Remove a deleted project from the similar-projects index once committed.
+    """
+    change = ("remove", instance.pk)
+    transaction.on_commit(lambda: similar_projects_index.apply(change))
+
+
+@receiver(post_save, sender=ProjectRequest)
+@receiver(post_save, sender=ProjectMembers)
+def activity_recorded(sender, instance, created, **kwargs):
+    """
+    Count a new join request or accepted member for trending projects once
+    committed.
+    """
+    if created:
+        record_on_commit(REQUEST if sender is ProjectRequest else JOIN, [instance.project_id])
+
+
+@receiver(post_save, sender=ProjectLead)
+def project_recorded(sender, instance, created, **kwargs):
+    """
+    Record a new project in the outbox.
+    """
+    if created:
+        record(
+            OutboxEvent.PROJECT_CREATED, instance.pk, instance.owner_id, instance.created_at,
+            owner=instance.owner_id, projectname=instance.projectname,
+        )
+
+
+@receiver(post_save, sender=ProjectRequest)
+def request_recorded(sender, instance, created, **kwargs):
+    """
+    Record a new join request in the outbox.
+    """
+    if created:
+        project = instance.project
+        record(
+            OutboxEvent.REQUEST_SUBMITTED, instance.project_id, instance.member_id, instance.created_at,
+            owner=project.owner_id, projectname=project.projectname, skills=project.skills,
+        )
+
+
+@receiver(post_save, sender=ProjectMembers)
+@receiver(post_save, sender=ProjectRequestRejected)
+def decision_recorded(sender, instance, created, **kwargs):
+    """
+    Record an accept or reject in the outbox, with when the request was
+    sent: the request row is usually deleted right after the decision, and
+    the event of the request itself is pruned long before a request expires.
+    """
+    if not created:
+        return
+
+    if sender is ProjectMembers:
+        kind, user_id, decided_at = OutboxEvent.REQUEST_ACCEPTED, instance.member_id, instance.joined_on
+    else:
+        kind, user_id, decided_at = OutboxEvent.REQUEST_REJECTED, instance.user_id, instance.rejected_on
+
+    requested_at = (
+        ProjectRequest.objects.filter(project_id=instance.project_id, member_id=user_id)
+        .values_list("created_at", flat=True)
+        .first()
+    )
+    project = instance.project
+    record(
+        kind, instance.project_id, user_id, decided_at,
+        owner=project.owner_id, projectname=project.projectname,
+        requested_at=requested_at.isoformat() if requested_at else None,
+    )
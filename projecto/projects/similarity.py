@@ -0,0 +1,325 @@
+"""
+similarity.py
+
+This module implements "similar projects": a TF-IDF index over each
+project's name and description, queried with cosine similarity.
+
+The index lives in memory as sparse NumPy arrays in term-major (CSC) form:
+for every term, the projects containing it and their normalized TF-IDF
+weights. Scoring a project against all others only gathers the postings of
+its own terms and sums them per project with `np.bincount`, so the cost
+depends on how common its terms are, not on the number of projects.
+
+IDF weights are fixed when the arrays are built. Projects created or edited
+afterwards are kept in a small overlay, weighted with the same IDF (terms
+the arrays do not know yet get the highest IDF), and the arrays are rebuilt
+with fresh IDF (from a copy of the indexed terms, on the index's background
+thread) once `SIMILAR_PROJECTS_COMPACT_THRESHOLD` projects have changed.
+"""
+
+import math
+import re
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+
+from .memindex import ProcessIndex
+from .models import ProjectLead
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or our
+that the their this to we will with you your project app application build
+""".split())
+
+EMPTY_TERMS = np.empty(0, dtype=np.int64)
+EMPTY_WEIGHTS = np.empty(0, dtype=np.float64)
+
+
+def tokenize(text):
+    """Split text into lowercase terms, dropping stop words and single characters."""
+    return [term for term in TOKEN.findall(text.lower()) if len(term) > 1 and term not in STOP_WORDS]
+
+
+def project_text(projectname, description):
+    """Text of a project that is indexed."""
+    return f"{projectname} {description}"
+
+
+class _Corpus:
+    """
+    Index state.
+
+    Attributes:
+        vocab (dict[str, int]): Term id of every term seen.
+        df (list[int]): Number of indexed projects containing each term.
+        docs (dict[int, tuple[ndarray, ndarray]]): Term ids and sublinear
+            term frequencies (1 + log tf) of every project.
+        idf (ndarray): IDF per term id, fixed when the arrays were built.
+        ids (ndarray): Project id of every column of the arrays.
+        indptr, rows, weights (ndarray): Term-major arrays; the postings of
+            term `t` are `rows[indptr[t]:indptr[t + 1]]` (column numbers)
+            with `weights[...]` (normalized TF-IDF).
+        overlay (dict[int, tuple[ndarray, ndarray]]): Normalized vectors of
+            projects changed since the arrays were built.
+        stale (set[int]): Project ids whose column in the arrays is outdated.
+    """
+
+    def __init__(self, docs):
+        self.vocab = {}
+        self.df = []
+        self.docs = {}
+        for project_id, text in docs:
+            self.upsert(project_id, text, compacting=True)
+        self.compact()
+
+    def term_ids(self, terms):
+        """Return the ids of terms, adding new terms to the vocabulary."""
+        ids = []
+        for term in terms:
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                term_id = self.vocab[term] = len(self.df)
+                self.df.append(0)
+            ids.append(term_id)
+        return ids
+
+    def upsert(self, project_id, text, compacting=False):
+        """Index a project's current text, replacing any earlier version."""
+        self.remove(project_id, compacting=True)
+
+        counts = Counter(tokenize(text))
+        terms = np.fromiter(self.term_ids(counts), dtype=np.int64, count=len(counts))
+        tf = 1 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+        self.docs[project_id] = (terms, tf)
+        for term_id in terms.tolist():
+            self.df[term_id] += 1
+
+        if not compacting:
+            self.stale.add(project_id)
+            self.overlay[project_id] = self.vector(terms, tf)
+
+    def remove(self, project_id, compacting=False):
+        """Drop a project from the index."""
+        old = self.docs.pop(project_id, None)
+        if old is not None:
+            for term_id in old[0].tolist():
+                self.df[term_id] -= 1
+
+        if not compacting:
+            self.stale.add(project_id)
+            self.overlay.pop(project_id, None)
+
+    def vector(self, terms, tf):
+        """
+        Return the normalized TF-IDF weights of a term frequency vector,
+        using the IDF of the arrays.
+        """
+        idf = np.full(len(terms), self.max_idf)
+        known = terms < len(self.idf)
+        idf[known] = self.idf[terms[known]]
+
+        weights = tf * idf
+        norm = np.linalg.norm(weights)
+        return terms, (weights / norm if norm else weights)
+
+    def compact(self):
+        """Rebuild the arrays with fresh IDF and clear the overlay."""
+        total = len(self.docs)
+        df = np.asarray(self.df, dtype=np.float64)
+        self.idf = np.log((1 + total) / (1 + df)) + 1
+        self.max_idf = math.log(1 + total) + 1
+
+        self.ids = np.fromiter(self.docs.keys(), dtype=np.int64, count=total)
+        self.overlay = {}
+        self.stale = set()
+
+        if total:
+            docs = [self.docs[project_id] for project_id in self.ids.tolist()]
+            terms = np.concatenate([terms for terms, _ in docs])
+            columns = np.repeat(np.arange(total), [len(terms) for terms, _ in docs])
+            weights = np.concatenate([tf for _, tf in docs]) * self.idf[terms]
+            norms = np.sqrt(np.bincount(columns, weights=weights * weights, minlength=total))
+            norms[norms == 0] = 1
+            weights /= norms[columns]
+        else:
+            terms, weights, columns = EMPTY_TERMS, EMPTY_WEIGHTS, EMPTY_TERMS
+
+        order = np.argsort(terms, kind="stable")
+        self.rows = columns[order]
+        self.weights = weights[order]
+        self.indptr = np.zeros(len(self.idf) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=len(self.idf)), out=self.indptr[1:])
+
+    def snapshot(self):
+        """Copy the indexed terms, to rebuild the arrays outside the lock."""
+        return dict(self.vocab), list(self.df), dict(self.docs)
+
+    @classmethod
+    def compacted(cls, snapshot):
+        """Build a corpus with fresh arrays from a `snapshot()`."""
+        corpus = cls([])
+        corpus.vocab, corpus.df, corpus.docs = snapshot
+        corpus.compact()
+        return corpus
+
+    def query_vector(self, project_id):
+        """Return the normalized vector of an indexed project, or None."""
+        if project_id in self.overlay:
+            return self.overlay[project_id]
+        if project_id in self.docs:
+            return self.vector(*self.docs[project_id])
+        return None
+
+    def scores(self, terms, weights):
+        """
+        Cosine similarity of a normalized vector with every indexed project.
+
+        Returns:
+            tuple[ndarray, ndarray]: Project ids and scores, unordered, for
+            projects with a non-zero score.
+        """
+        known = terms < len(self.idf)
+        starts = self.indptr[terms[known]]
+        ends = self.indptr[terms[known] + 1]
+
+        if len(starts):
+            lengths = ends - starts
+            positions = np.repeat(ends - lengths.cumsum(), lengths) + np.arange(lengths.sum())
+            base = np.bincount(
+                self.rows[positions],
+                weights=self.weights[positions] * np.repeat(weights[known], lengths),
+                minlength=len(self.ids),
+            )
+        else:
+            base = np.zeros(len(self.ids))
+
+        ids, scores = self.ids, base
+        if self.stale:
+            keep = ~np.isin(ids, np.fromiter(self.stale, dtype=np.int64, count=len(self.stale)))
+            ids, scores = ids[keep], scores[keep]
+
+        if self.overlay:
+            extra_ids = np.fromiter(self.overlay.keys(), dtype=np.int64, count=len(self.overlay))
+            extra_terms = np.concatenate([t for t, _ in self.overlay.values()])
+            extra_weights = np.concatenate([w for _, w in self.overlay.values()])
+            columns = np.repeat(np.arange(len(extra_ids)), [len(t) for t, _ in self.overlay.values()])
+
+            order = np.argsort(terms)
+            query_terms, query_weights = terms[order], weights[order]
+            found = np.minimum(np.searchsorted(query_terms, extra_terms), len(query_terms) - 1)
+            match = query_terms[found] == extra_terms
+
+            extra_scores = np.bincount(
+                columns[match],
+                weights=extra_weights[match] * query_weights[found[match]],
+                minlength=len(extra_ids),
+            )
+            ids = np.concatenate([ids, extra_ids])
+            scores = np.concatenate([scores, extra_scores])
+
+        keep = scores > 0
+        return ids[keep], scores[keep]
+
+
+class SimilarProjectsIndex(ProcessIndex):
+    """
+    In-memory TF-IDF index of projects.
+
+    Changes:
+        ("upsert", project_id, text): A project was created or edited.
+        ("remove", project_id): A project was deleted.
+
+    Attributes:
+        max_age (float): Seconds after which the index is reloaded.
+        compact_threshold (int): Number of changed projects that triggers
+                                 rebuilding the arrays.
+    """
+
+    name = "similar-projects"
+
+    def __init__(self, max_age, compact_threshold):
+        super().__init__(max_age)
+        self.compact_threshold = compact_threshold
+
+    def _load(self):
+        """Read the text of every project from the database."""
+        projects = ProjectLead.objects.values_list("id", "projectname", "description").iterator(chunk_size=10_000)
+        return _Corpus((project_id, project_text(name, description)) for project_id, name, description in projects)
+
+    def _apply(self, state, change):
+        kind, project_id, *rest = change
+
+        if kind == "upsert":
+            state.upsert(project_id, *rest)
+        elif kind == "remove":
+            state.remove(project_id)
+
+    def _snapshot(self, state):
+        if len(state.stale) <= self.compact_threshold:
+            return None
+        return state.snapshot()
+
+    def _compact(self, snapshot):
+        return _Corpus.compacted(snapshot)
+
+    def ranked(self, project_id):
+        """
+        Rank every other project by similarity to a project.
+
+        Returns:
+            tuple[list[int], list[float]]: Project ids and cosine
+            similarities, most similar first. Empty if the project is not
+            indexed or has no indexable terms.
+        """
+        self._ensure_built()
+
+        with self._lock:
+            vector = self._state.query_vector(project_id)
+            if vector is None or not len(vector[0]):
+                return [], []
+            ids, scores = self._state.scores(*vector)
+
+        keep = ids != project_id
+        ids, scores = ids[keep], scores[keep]
+        order = np.lexsort((ids, -scores))
+        return ids[order].tolist(), scores[order].tolist()
+
+
+similar_projects_index = SimilarProjectsIndex(
+    max_age=getattr(settings, "SIMILAR_PROJECTS_MAX_AGE", 300),
+    compact_threshold=getattr(settings, "SIMILAR_PROJECTS_COMPACT_THRESHOLD", 1000),
+)
+
+
+def similar_projects(project, candidates, limit=10, batch_size=500):
+    """
+    Return the projects most similar to `project` among `candidates`.
+
+    Parameters:
+        project (ProjectLead): The project being viewed.
+        candidates (QuerySet): Projects that may be suggested, e.g. the
+                               projects the user can discover.
+        limit (int): Maximum number of results.
+        batch_size (int): Ranked ids checked against `candidates` per query.
+
+    Returns:
+        list[ProjectLead]: Best first, each annotated with `similarity`.
+    """
+    ids, scores = similar_projects_index.ranked(project.pk)
+    score_of = dict(zip(ids, scores))
+
+    results = []
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        allowed = {p.pk: p for p in candidates.filter(id__in=batch).select_related("owner")}
+        for project_id in batch:
+            if project_id in allowed:
+                allowed[project_id].similarity = round(score_of[project_id], 4)
+                results.append(allowed[project_id])
+                if len(results) == limit:
+                    return results
+
+    return results
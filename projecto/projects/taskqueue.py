@@ -0,0 +1,255 @@
+"""
+taskqueue.py
+
+This module implements a task queue stored in the database (`Task`), for
+work that does not have to finish inside a request. No broker is needed:
+tasks are rows, enqueued in the caller's transaction (a task enqueued by a
+request that rolls back never runs), and workers (the `run_tasks` command)
+poll the table.
+
+Workers claim a batch of due tasks with `SELECT ... FOR UPDATE SKIP LOCKED`,
+so concurrent workers never wait for or claim the same rows, mark them
+RUNNING with a lease (`TASK_LEASE_SECONDS`) and commit. Each task then runs
+outside that transaction, so it can open its own short transactions.
+Finished tasks are deleted in one statement per batch; a task that raises is
+retried later with exponential backoff (`TASK_RETRY_BASE_SECONDS` doubled
+per attempt, capped at `TASK_RETRY_MAX_SECONDS`) until it runs out of
+attempts and is marked FAILED. Tasks of a worker that died are queued again
+once their lease has expired, so delivery is at least once and tasks should
+be idempotent.
+
+Tasks are dequeued by priority lane (`Task.HIGH`, `DEFAULT`, `LOW`) first,
+then by due time; a worker can also be dedicated to some lanes only.
+
+Task functions are registered by name with the `task` decorator and take
+JSON-serializable keyword arguments.
+"""
+
+import random
+import threading
+import time
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import Task
+
+LANES = {name: lane for lane, name in Task.LANE_CHOICES}
+
+_registry = {}
+
+
+def task(name, max_attempts=None):
+    """
+    Register a function as a task.
+
+    Parameters:
+        name (str): Name tasks are enqueued with.
+        max_attempts (int, optional): Attempts before giving up
+                                      (`TASK_MAX_ATTEMPTS`).
+    """
+
+    def register(function):
+        function.task_name = name
+        function.max_attempts = max_attempts
+        _registry[name] = function
+        return function
+
+    return register
+
+
+def _build(name, kwargs, lane, delay, max_attempts):
+    if name not in _registry:
+        raise KeyError(f"Unknown task {name!r}")
+    function = _registry[name]
+    return Task(
+        name=name,
+        kwargs=kwargs,
+        lane=lane,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or function.max_attempts or settings.TASK_MAX_ATTEMPTS,
+    )
+
+
+def enqueue(name, lane=Task.DEFAULT, delay=0, max_attempts=None, **kwargs):
+    """
+    Queue a task in the current transaction.
+
+    Parameters:
+        name (str): Registered task name.
+        lane (int): Priority lane.
+        delay (float): Seconds before the task may run.
+        max_attempts (int, optional): Overrides the task's attempts.
+        **kwargs: Arguments of the task function.
+
+    Returns:
+        Task: The queued task.
+    """
+    task_row = _build(name, kwargs, lane, delay, max_attempts)
+    task_row.save()
+    return task_row
+
+
+def enqueue_many(name, kwargs_list, lane=Task.DEFAULT, batch_size=1000):
+    """
+    Queue many tasks of one kind with multi-row inserts.
+
+    Returns:
+        int: Number of tasks queued.
+    """
+    tasks = [_build(name, kwargs, lane, 0, None) for kwargs in kwargs_list]
+    Task.objects.bulk_create(tasks, batch_size=batch_size)
+    return len(tasks)
+
+
+def claim(lanes=None, batch_size=10):
+    """
+    Claim due tasks for this worker.
+
+    Parameters:
+        lanes (Iterable[int], optional): Only claim tasks of these lanes.
+        batch_size (int): Maximum number of tasks.
+
+    Returns:
+        list[Task]: Claimed tasks, now RUNNING under a lease.
+    """
+    now = timezone.now()
+    queued = Task.objects.filter(status=Task.QUEUED, run_at__lte=now)
+    if lanes is not None:
+        queued = queued.filter(lane__in=list(lanes))
+
+    with transaction.atomic():
+        tasks = list(queued.order_by("lane", "run_at", "id").select_for_update(skip_locked=True)[:batch_size])
+        if tasks:
+            locked_until = now + timedelta(seconds=settings.TASK_LEASE_SECONDS)
+            Task.objects.filter(id__in=[t.pk for t in tasks]).update(
+                status=Task.RUNNING, locked_until=locked_until, attempts=F("attempts") + 1
+            )
+            for t in tasks:
+                t.status, t.locked_until, t.attempts = Task.RUNNING, locked_until, t.attempts + 1
+
+    return tasks
+
+
+def backoff(attempts, base=None, maximum=None):
+    """
+    Seconds before retrying work that failed `attempts` times: `base`
+    (`TASK_RETRY_BASE_SECONDS`) doubled per attempt, capped at `maximum`
+    (`TASK_RETRY_MAX_SECONDS`), with jitter.
+    """
+    base = base or settings.TASK_RETRY_BASE_SECONDS
+    maximum = maximum or settings.TASK_RETRY_MAX_SECONDS
+    delay = min(base * 2 ** (attempts - 1), maximum)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def run(tasks):
+    """
+    Run claimed tasks and record the outcome: finished tasks are deleted,
+    failed ones queued again with backoff or marked FAILED.
+
+    Returns:
+        tuple[int, int]: Numbers of tasks finished and failed.
+    """
+    finished, failures = [], []
+
+    for t in tasks:
+        try:
+            # A savepoint keeps a failed task from breaking an enclosing
+            # transaction; workers run tasks in autocommit mode
+            with transaction.atomic() if connection.in_atomic_block else nullcontext():
+                _registry[t.name](**t.kwargs)
+            finished.append(t.pk)
+        except Exception:
+            failures.append((t, traceback.format_exc()))
+
+    Task.objects.filter(id__in=finished).delete()
+
+    now = timezone.now()
+    for t, error in failures:
+        if t.attempts >= t.max_attempts:
+            Task.objects.filter(pk=t.pk).update(status=Task.FAILED, locked_until=None, last_error=error)
+        else:
+            Task.objects.filter(pk=t.pk).update(
+                status=Task.QUEUED,
+                locked_until=None,
+                run_at=now + timedelta(seconds=backoff(t.attempts)),
+                last_error=error,
+            )
+
+    return len(finished), len(failures)
+
+
+def reclaim():
+    """
+    Queue again the tasks of workers whose lease expired (or mark them
+    FAILED when out of attempts).
+
+    Returns:
+        int: Number of tasks reclaimed.
+    """
+    return Task.objects.filter(status=Task.RUNNING, locked_until__lt=timezone.now()).update(
+        status=Case(When(attempts__gte=F("max_attempts"), then=Value(Task.FAILED)), default=Value(Task.QUEUED)),
+        locked_until=None,
+        last_error="Lease expired",
+    )
+
+
+def _refresh_connection():
+    """Drop a broken or expired connection between batches."""
+    if not connection.in_atomic_block:
+        close_old_connections()
+
+
+def work(lanes=None, batch_size=10, burst=False, stop=None):
+    """
+    Run tasks until stopped.
+
+    Parameters:
+        lanes (Iterable[int], optional): Only run tasks of these lanes.
+        batch_size (int): Tasks claimed at once.
+        burst (bool): Return as soon as no task is due.
+        stop (threading.Event, optional): Set to stop the loop.
+
+    Returns:
+        tuple[int, int]: Numbers of tasks finished and failed.
+    """
+    finished = failed = 0
+    reclaimed_at = 0.0
+
+    try:
+        while stop is None or not stop.is_set():
+            _refresh_connection()
+            try:
+                if time.monotonic() - reclaimed_at > settings.TASK_LEASE_SECONDS / 2:
+                    reclaim()
+                    reclaimed_at = time.monotonic()
+                tasks = claim(lanes, batch_size)
+            except DatabaseError:
+                # A lost connection or, on SQLite, a locked database: try
+                # again after a pause
+                tasks = None
+
+            if not tasks:
+                if burst and tasks is not None:
+                    break
+                (stop or threading.Event()).wait(settings.TASK_POLL_SECONDS)
+                continue
+
+            try:
+                done, errors = run(tasks)
+            except DatabaseError:
+                # The outcome was not recorded; the tasks run again once
+                # their lease expires
+                continue
+            finished += done
+            failed += errors
+    finally:
+        _refresh_connection()
+
+    return finished, failed
@@ -0,0 +1,52 @@
+"""
+tasks.py
+
+Task functions run by the database task queue (see `taskqueue.py`).
+
+Long jobs run in bounded slices: a task stops once half its lease
+(`TASK_LEASE_SECONDS`) has passed and queues itself again to resume, so a
+worker is never still running it when the lease expires and another worker
+reclaims it.
+"""
+
+import time
+
+from django.conf import settings
+
+from .archival import purge_step
+from .deletion import process_deletion
+from .models import ProjectLead, Task
+from .taskqueue import enqueue, task
+
+
+def _within_lease(steps):
+    """
+    Run steps until they are exhausted or half the task lease has passed.
+
+    Returns:
+        bool: Whether every step ran.
+    """
+    deadline = time.monotonic() + settings.TASK_LEASE_SECONDS / 2
+    for _ in steps:
+        if time.monotonic() >= deadline:
+            return False
+    return True
+
+
+@task("projects.purge_project")
+def purge_project(project_id, batch_size=1000):
+    """Delete an archived project and its rows in batches."""
+    project = ProjectLead.all_objects.filter(pk=project_id, archived_at__isnull=False).first()
+    if project is None:
+        return
+    if not _within_lease(iter(lambda: purge_step(project, batch_size), None)):
+        enqueue("projects.purge_project", lane=Task.LOW, project_id=project_id, batch_size=batch_size)
+
+
+@task("projects.process_account_deletion")
+def process_account_deletion(deletion_id, batch_size=1000):
+    """Delete a deactivated account's data, resuming where a run stopped."""
+    if not _within_lease(process_deletion(deletion_id, batch_size)):
+        enqueue(
+            "projects.process_account_deletion", lane=Task.LOW, deletion_id=deletion_id, batch_size=batch_size
+        )
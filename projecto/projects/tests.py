@@ -1,2 +1,1846 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import timedelta
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+import msgpack
+
+from accounts.skills import mask_for
+
+from .analytics import backfill, summarize
+from .bulk_io import import_projects
+from .candidates import skill_index
+from .deletion import process_deletion
+from .digests import digest_since, pending_summaries, send_digests
+from .outbox import AnalyticsConsumer, Consumer, prune, relay_once
+from .webhooks import HTTPClient, claim, deliver_batch, retry_dead, sign
+from .taskqueue import enqueue, task, work
+from .tasks import purge_project
+from .partitions import add_months, month_start, partition_name
+from .collabgraph import collaboration_graph
+from .similarity import similar_projects_index
+from .trending import JOIN, REQUEST, trending
+from .versioning import bump_versions, get_versions, project_key, user_key
+from .caching import SingleFlight, response_cache
+from .serializers import ProjectRequestCreateSerializer
+from .writebuffer import GroupCommitBuffer, flush_project_requests
+from .models import (
+    AccountDeletion, DataVersion, ExpiredProjectRequest, OutboxCursor, OutboxEvent, ProjectInvitation, ProjectLead, ProjectMembers,
+    ProjectRequest, ProjectRequestRejected, Task, Tombstone, TrendingRollup, WebhookDelivery, WebhookSubscription,
+)
+
+User = get_user_model()
+
+
+class MessagePackNegotiationTests(TestCase):
+    """
+    Verifies that MessagePack responses and request bodies carry the same
+    data as their JSON counterparts.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email="owner@example.com", password="pass", firstname="Own", lastname="Er",
+            frontend=True, backend=False,
+        )
+        self.member = User.objects.create_user(
+            email="member@example.com", password="pass", firstname="Mem", lastname="Ber",
+            frontend=False, backend=True,
+        )
+        ProjectLead.objects.create(
+            owner=self.owner, projectname="Alpha", description="First", frontend=True, backend=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+        cache.clear()
+        response_cache.local.clear()
+
+    def test_list_round_trips_same_data_as_json(self):
+        url = "/api/projects/?email=member@example.com"
+        as_json = self.client.get(url, HTTP_ACCEPT="application/json")
+        as_msgpack = self.client.get(url, HTTP_ACCEPT="application/msgpack")
+
+        self.assertEqual(as_msgpack["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(as_msgpack.content, raw=False), as_json.json())
+
+    def test_msgpack_request_body_is_parsed(self):
+        self.client.force_authenticate(self.owner)
+        body = msgpack.packb({
+            "email": "owner@example.com",
+            "projectname": "Beta",
+            "description": "Second",
+            "frontend": False,
+            "backend": True,
+        })
+        response = self.client.post(
+            "/api/projectleads/", body, content_type="application/msgpack",
+            HTTP_ACCEPT="application/msgpack",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(msgpack.unpackb(response.content, raw=False)["projectname"], "Beta")
+        self.assertTrue(ProjectLead.objects.filter(projectname="Beta").exists())
+
+    def test_invalid_msgpack_body_returns_400(self):
+        response = self.client.post(
+            "/api/projectrequests/", b"\xc1", content_type="application/msgpack"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ConditionalGetTests(TestCase):
+    """
+    Verifies ETag generation and 304 responses on the dashboard list endpoints.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email="owner@example.com", password="pass", firstname="Own", lastname="Er"
+        )
+        self.member = User.objects.create_user(
+            email="member@example.com", password="pass", firstname="Mem", lastname="Ber"
+        )
+        self.project = ProjectLead.objects.create(
+            owner=self.owner, projectname="Alpha", description="First"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+        self.url = "/api/pendingprojects/?email=member@example.com"
+        cache.clear()
+        response_cache.local.clear()
+
+    def test_matching_etag_returns_304_with_one_query(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_write_invalidates_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        ProjectRequest.objects.create(project=self.project, member=self.member, message="Hi")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.json()), 1)
+
+    @override_settings(DATA_VERSION_CACHE_ALIAS="default")
+    def test_bump_during_cache_fill_is_not_masked(self):
+        key = user_key("member@example.com")
+        before = get_versions([key])[key]
+        cache.clear()
+        fill = cache.set_many
+
+        def bump_then_fill(*args, **kwargs):
+            # A writer commits (and clears the cache) after the reader's
+            # database read but before its fill
+            with self.captureOnCommitCallbacks(execute=True):
+                bump_versions([key])
+            fill(*args, **kwargs)
+
+        with mock.patch.object(cache, "set_many", bump_then_fill):
+            self.assertEqual(get_versions([key])[key], before + 1)
+        self.assertEqual(get_versions([key])[key], before + 1)
+
+    def test_etag_differs_per_media_type(self):
+        as_json = self.client.get(self.url, HTTP_ACCEPT="application/json")
+        as_msgpack = self.client.get(self.url, HTTP_ACCEPT="application/msgpack")
+        self.assertNotEqual(as_json["ETag"], as_msgpack["ETag"])
+
+
+class ResponseCacheTests(TestCase):
+    """
+    Verifies the tag-versioned response cache and single-flight coalescing.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email="owner@example.com", password="pass", firstname="Own", lastname="Er"
+        )
+        self.member = User.objects.create_user(
+            email="member@example.com", password="pass", firstname="Mem", lastname="Ber"
+        )
+        self.project = ProjectLead.objects.create(
+            owner=self.owner, projectname="Alpha", description="First"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = "/api/projectrequestsdisplay/?email=owner@example.com&projectname=Alpha"
+        cache.clear()
+        response_cache.local.clear()
+
+    def test_cache_hit_skips_list_query(self):
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+
+        self.assertEqual(first.json(), second.json())
+
+    def test_write_to_tagged_project_invalidates_entry(self):
+        self.assertEqual(self.client.get(self.url).json(), [])
+        ProjectRequest.objects.create(project=self.project, member=self.member, message="Hi")
+
+        self.assertEqual(len(self.client.get(self.url).json()), 1)
+
+    def test_single_flight_coalesces_concurrent_calls(self):
+        flights = SingleFlight()
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        threads = [
+            threading.Thread(target=lambda: results.append(flights.do("key", compute)))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 10)
+
+
+class SyncTests(TestCase):
+    """
+    Verifies the delta sync endpoint reports upserts and deletions.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email="owner@example.com", password="pass", firstname="Own", lastname="Er"
+        )
+        self.member = User.objects.create_user(
+            email="member@example.com", password="pass", firstname="Mem", lastname="Ber"
+        )
+        self.project = ProjectLead.objects.create(
+            owner=self.owner, projectname="Alpha", description="First"
+        )
+        self.request = ProjectRequest.objects.create(
+            project=self.project, member=self.member, message="Hi"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_snapshot_without_cursor(self):
+        data = self.client.get("/api/sync/").json()
+
+        self.assertEqual([p["projectname"] for p in data["projects"]["upserted"]], ["Alpha"])
+        self.assertEqual([r["id"] for r in data["requests"]["upserted"]], [self.request.id])
+        self.assertEqual(data["requests"]["deleted"], [])
+
+    def test_deleted_request_is_reported_to_owner_and_member(self):
+        cursor = self.client.get("/api/sync/").json()["cursor"]
+        request_id = self.request.id
+        self.request.delete()
+
+        for user in (self.owner, self.member):
+            self.client.force_authenticate(user)
+            data = self.client.get(f"/api/sync/?since={cursor}").json()
+            self.assertEqual(data["requests"]["deleted"], [request_id])
+            self.assertEqual(data["requests"]["upserted"], [])
+
+    def test_invalid_cursor_returns_400(self):
+        self.assertEqual(self.client.get("/api/sync/?since=abc").status_code, 400)
+
+
+class IdempotentCreateTests(TestCase):
+    """
+    Verifies conflict-free inserts and Idempotency-Key replay on join requests.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email="owner@example.com", password="pass", firstname="Own", lastname="Er"
+        )
+        self.member = User.objects.create_user(
+            email="member@example.com", password="pass", firstname="Mem", lastname="Ber"
+        )
+        ProjectLead.objects.create(owner=self.owner, projectname="Alpha", description="First")
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+        self.body = {
+            "owner_email": "owner@example.com",
+            "projectname": "Alpha",
+            "member_email": "member@example.com",
+            "message": "Hi",
+        }
+
+    def test_duplicate_request_returns_existing_row(self):
+        first = self.client.post("/api/projectrequests/", self.body, format="json")
+        second = self.client.post("/api/projectrequests/", self.body, format="json")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(ProjectRequest.objects.count(), 1)
+
+    def test_idempotency_key_replays_stored_response(self):
+        headers = {"HTTP_IDEMPOTENCY_KEY": "abc"}
+        first = self.client.post("/api/projectrequests/", self.body, format="json", **headers)
+
+        with self.assertNumQueries(1):
+            second = self.client.post("/api/projectrequests/", self.body, format="json", **headers)
+
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+
+    def test_idempotency_key_in_progress_is_not_run_twice(self):
+        headers = {"HTTP_IDEMPOTENCY_KEY": "abc"}
+        create = ProjectRequestCreateSerializer.create
+        concurrent = []
+
+        def create_with_retry_in_flight(serializer, validated_data):
+            # The client retries while the first request is still running
+            concurrent.append(self.client.post("/api/projectrequests/", self.body, format="json", **headers))
+            return create(serializer, validated_data)
+
+        with mock.patch.object(ProjectRequestCreateSerializer, "create", create_with_retry_in_flight):
+            first = self.client.post("/api/projectrequests/", self.body, format="json", **headers)
+
+        self.assertEqual((first.status_code, concurrent[0].status_code), (201, 409))
+        replay = self.client.post("/api/projectrequests/", self.body, format="json", **headers)
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+
+    def test_buffer_timeout_answers_503_and_frees_the_key(self):
+        headers = {"HTTP_IDEMPOTENCY_KEY": "abc"}
+        with mock.patch("projects.serializers.buffering_enabled", return_value=True):
+            with mock.patch.object(GroupCommitBuffer, "submit", side_effect=FutureTimeoutError):
+                response = self.client.post("/api/projectrequests/", self.body, format="json", **headers)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+        # Nothing was committed, so the retry runs again
+        retry = self.client.post("/api/projectrequests/", self.body, format="json", **headers)
+        self.assertEqual(retry.status_code, 201)
+
+    def test_idempotency_key_reused_for_other_body_is_rejected(self):
+        headers = {"HTTP_IDEMPOTENCY_KEY": "abc"}
+        self.client.post("/api/projectrequests/", self.body, format="json", **headers)
+
+        response = self.client.post(
+            "/api/projectrequests/", {**self.body, "message": "Other"}, format="json", **headers
+        )
+        self.assertEqual(response.status_code, 422)
+
+
+class BulkJoinRequestTests(TestCase):
+    """
+    Verifies bulk join request submission and its per-entry outcomes.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email="owner@example.com", password="pass", firstname="Own", lastname="Er"
+        )
+        self.member = User.objects.create_user(
+            email="member@example.com", password="pass", firstname="Mem", lastname="Ber"
+        )
+        self.projects = [
+            ProjectLead.objects.create(owner=self.owner, projectname=f"P{i}", description="D")
+            for i in range(5)
+        ]
+        self.own = ProjectLead.objects.create(owner=self.member, projectname="Mine", description="D")
+        ProjectRequest.objects.create(project=self.projects[0], member=self.member, message="Hi")
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def test_outcomes_are_reported_per_entry(self):
+        ids = [p.id for p in self.projects]
+        entries = [{"project": i} for i in ids] + [
+            {"project": ids[1]}, {"project": self.own.id}, {"project": 999999}
+        ]
+
+        response = self.client.post("/api/projectrequests/bulk/", {"requests": entries}, format="json")
+
+        statuses = [r["status"] for r in response.json()["results"]]
+        self.assertEqual(
+            statuses,
+            ["requested"] + ["created"] * 4 + ["duplicate", "own_project", "not_found"],
+        )
+        self.assertEqual(ProjectRequest.objects.filter(member=self.member).count(), 5)
+
+    def test_requests_inserted_concurrently_are_not_recorded_twice(self):
+        manager = ProjectRequest.objects
+        insert = manager.insert_many_or_get
+
+        def race(conflict_fields, rows):
+            # Another submission inserts the request to P1 first
+            ProjectRequest.objects.create(project=self.projects[1], member=self.member, message="Hi")
+            return insert(conflict_fields, rows)
+
+        entries = [{"project": p.id} for p in self.projects[1:3]]
+        with mock.patch.object(manager, "insert_many_or_get", side_effect=race):
+            response = self.client.post("/api/projectrequests/bulk/", {"requests": entries}, format="json")
+
+        self.assertEqual([r["status"] for r in response.json()["results"]], ["requested", "created"])
+        submitted = OutboxEvent.objects.filter(kind=OutboxEvent.REQUEST_SUBMITTED, user_id=self.member.pk)
+        self.assertEqual(
+            sorted(submitted.values_list("project_id", flat=True)), [p.pk for p in self.projects[:3]]
+        )
+
+    def test_requests_inserted_concurrently_are_not_counted_twice_for_trending(self):
+        manager = ProjectRequest.objects
+        insert = manager.insert_many_or_get
+
+        def race(conflict_fields, rows):
+            ProjectRequest.objects.create(project=self.projects[1], member=self.member, message="Hi")
+            return insert(conflict_fields, rows)
+
+        entries = [{"project": p.id} for p in self.projects[1:3]]
+        with mock.patch("projects.serializers.record_on_commit") as record_on_commit:
+            with mock.patch.object(manager, "insert_many_or_get", side_effect=race):
+                self.client.post("/api/projectrequests/bulk/", {"requests": entries}, format="json")
+
+        record_on_commit.assert_called_once_with(REQUEST, [self.projects[2].pk])
+
+    def test_query_count_is_constant(self):
+        entries = [{"project": p.id} for p in self.projects[1:]]
+
+        # project resolution, multi-row insert, version lookup and bump and
+        # outbox insert, inside a savepoint (the test's transaction is open)
+        with self.assertNumQueries(7):
+            self.client.post("/api/projectrequests/bulk/", {"requests": entries}, format="json")
+
+
+class GroupCommitBufferTests(TestCase):
+    """
+    Verifies micro-batching in the group-commit buffer and the batched
+    join request flush.
+    """
+
+    def test_concurrent_submissions_are_flushed_together(self):
+        batches = []
+
+        def flush(items):
+            batches.append(items)
+            return [item * 2 for item in items]
+
+        buffer = GroupCommitBuffer(flush, max_rows=100, max_delay=0.2)
+        results = {}
+        threads = [
+            threading.Thread(target=lambda i=i: results.update({i: buffer.submit(i, timeout=5)}))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {i: i * 2 for i in range(20)})
+        self.assertLess(len(batches), 20)
+
+    def test_timed_out_submission_is_never_flushed(self):
+        flushed, started, gate = [], threading.Event(), threading.Event()
+
+        def flush(items):
+            started.set()
+            gate.wait(5)
+            flushed.extend(items)
+            return items
+
+        buffer = GroupCommitBuffer(flush, max_rows=100, max_delay=0)
+        first = threading.Thread(target=buffer.submit, args=("a", 5))
+        first.start()
+        started.wait(5)
+
+        with self.assertRaises(FutureTimeoutError):
+            buffer.submit("b", timeout=0.1)
+        gate.set()
+        first.join()
+
+        self.assertEqual(buffer.submit("c", timeout=5), "c")
+        self.assertEqual(flushed, ["a", "c"])
+
+    def test_flush_reports_created_and_existing_rows(self):
+        owner = User.objects.create_user(
+            email="owner@example.com", password="pass", firstname="Own", lastname="Er"
+        )
+        members = [
+            User.objects.create_user(
+                email=f"m{i}@example.com", password="pass", firstname="M", lastname=str(i)
+            )
+            for i in range(3)
+        ]
+        project = ProjectLead.objects.create(owner=owner, projectname="Alpha", description="D")
+        existing = ProjectRequest.objects.create(project=project, member=members[0], message="Hi")
+
+        items = [{"project": project, "member": member, "message": "Hi"} for member in members]
+        items.append(items[1])
+        results = flush_project_requests(items)
+
+        self.assertEqual([created for _, created in results], [False, True, True, False])
+        self.assertEqual(results[0][0].pk, existing.pk)
+        self.assertEqual(results[3][0].pk, results[1][0].pk)
+        self.assertEqual(ProjectRequest.objects.count(), 3)
+
+
+class BulkProjectTransferTests(TestCase):
+    """
+    Verifies owner-scoped project import and export.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email="owner@example.com", password="pass", firstname="Own", lastname="Er"
+        )
+        ProjectLead.objects.create(owner=self.owner, projectname="Existing", description="D")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_csv_import_skips_duplicates(self):
+        body = (
+            "owner_email,projectname,description,frontend,backend\n"
+            "someone@example.com,Existing,D,true,false\n"
+            ",New one,Fresh,true,false\n"
+            ",New two,Fresh,false,true\n"
+        )
+        response = self.client.post("/api/projectleads/import/", body, content_type="text/csv")
+
+        self.assertEqual(response.json(), {"created": 2, "skipped": 1})
+        self.assertTrue(ProjectLead.objects.get(projectname="New one").frontend)
+        self.assertEqual(ProjectLead.objects.filter(owner=self.owner).count(), 3)
+
+    def test_imported_projects_reach_the_in_memory_indexes(self):
+        for index in (collaboration_graph, similar_projects_index):
+            index.reset()
+            index._ensure_built()
+
+        body = "projectname,description\nChess engine,Rust chess engine\n"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/projectleads/import/", body, content_type="text/csv")
+
+        project = ProjectLead.objects.get(projectname="Chess engine")
+        self.assertEqual(collaboration_graph._state.owners[project.pk], self.owner.pk)
+        self.assertIn(project.pk, similar_projects_index._state.docs)
+
+    def test_error_after_committed_chunks_reports_them(self):
+        body = "projectname,description\nA,D\nB,D\nExisting,D\n,D\nE,D\n"
+
+        with mock.patch("projects.views.import_projects", partial(import_projects, chunk_size=2)):
+            response = self.client.post("/api/projectleads/import/", body, content_type="text/csv")
+            self.assertEqual(response.status_code, 207)
+            self.assertEqual(response.json(), {
+                "error": "Row 4: projectname is required", "created": 2, "skipped": 0, "committed_rows": 2,
+            })
+
+            response = self.client.post(
+                "/api/projectleads/import/", "projectname,description\n,D\n", content_type="text/csv"
+            )
+            self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(ProjectLead.objects.filter(owner=self.owner).count(), 3)
+
+    def test_ndjson_export_streams_own_projects(self):
+        response = self.client.get("/api/projectleads/export/?filetype=ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual([json.loads(line)["projectname"] for line in lines], ["Existing"])
+
+    def test_roster_streams_one_query_per_table(self):
+        project = ProjectLead.objects.get(projectname="Existing")
+        people = [
+            User.objects.create_user(
+                email=f"p{i}@example.com", password="pass", firstname=f"P{i}", lastname="X"
+            )
+            for i in range(3)
+        ]
+        ProjectRequest.objects.create(project=project, member=people[0])
+        ProjectMembers.objects.create(project=project, member=people[1])
+        ProjectRequestRejected.objects.create(project=project, user=people[2])
+
+        response = self.client.get(f"/api/projectleads/{project.pk}/roster/")
+        with self.assertNumQueries(3):
+            rows = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+
+        self.assertEqual(rows[0][:2], ["status", "email"])
+        self.assertEqual(
+            [row[:2] for row in rows[1:]],
+            [["requested", "p0@example.com"], ["member", "p1@example.com"], ["rejected", "p2@example.com"]],
+        )
+
+    def test_roster_of_other_owners_project_is_not_found(self):
+        other = User.objects.create_user(
+            email="other@example.com", password="pass", firstname="O", lastname="T"
+        )
+        project = ProjectLead.objects.create(owner=other, projectname="Theirs", description="D")
+
+        response = self.client.get(f"/api/projectleads/{project.pk}/roster/")
+
+        self.assertEqual(response.status_code, 404)
+
+
+class TeamCapacityTests(TestCase):
+    """
+    Verifies max_members enforcement on accept and discovery.
+    """
+
+    def setUp(self):
+        cache.clear()
+        response_cache.local.clear()
+        self.owner = User.objects.create_user(
+            email="owner@example.com", password="pass", firstname="Own", lastname="Er"
+        )
+        self.project = ProjectLead.objects.create(
+            owner=self.owner, projectname="Small", description="D", max_members=1
+        )
+        self.people = [
+            User.objects.create_user(
+                email=f"p{i}@example.com", password="pass", firstname=f"P{i}", lastname="X"
+            )
+            for i in range(2)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def accept(self, email):
+        return self.client.post("/api/projectmembers/", {
+            "email": email, "owner": "owner@example.com", "projectname": "Small", "message": "Hi",
+        }, format="json")
+
+    def test_accept_beyond_capacity_is_rejected(self):
+        self.assertEqual(self.accept("p0@example.com").status_code, 201)
+        self.assertEqual(self.accept("p0@example.com").status_code, 200)
+        self.assertEqual(self.accept("p1@example.com").status_code, 409)
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.seats_taken, 1)
+        self.assertEqual(ProjectMembers.objects.filter(project=self.project).count(), 1)
+
+    def test_seat_changes_are_reported_by_delta_sync(self):
+        ProjectLead.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        cursor = self.client.get("/api/sync/").json()["cursor"]
+        self.accept("p0@example.com")
+
+        upserted = self.client.get(f"/api/sync/?since={cursor}").json()["projects"]["upserted"]
+        self.assertEqual([project["id"] for project in upserted], [self.project.pk])
+
+    def test_full_project_leaves_discovery_until_a_seat_frees_up(self):
+        viewer = APIClient()
+        viewer.force_authenticate(self.people[1])
+
+        def listed():
+            response = viewer.get("/api/projects/?email=p1@example.com")
+            return [project["projectname"] for project in response.json()]
+
+        self.assertEqual(listed(), ["Small"])
+
+        self.accept("p0@example.com")
+        self.assertEqual(listed(), [])
+
+        ProjectMembers.objects.filter(project=self.project).delete()
+        self.assertEqual(listed(), ["Small"])
+
+    def test_seat_on_uncapped_project_changes_discovery_etag(self):
+        ProjectLead.objects.filter(pk=self.project.pk).update(max_members=None)
+        viewer = APIClient()
+        viewer.force_authenticate(self.people[1])
+        url = "/api/projects/?email=p1@example.com"
+        etag = viewer.get(url)["ETag"]
+
+        self.accept("p0@example.com")
+
+        response = viewer.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["seats_taken"], 1)
+
+
+@skipUnless(connection.vendor == "postgresql", "needs row-level locking; SQLite test databases lock whole tables")
+class TeamCapacityStressTests(TransactionTestCase):
+    """
+    Hammers accepts into one small project from many threads and checks
+    that the seat count is never exceeded.
+    """
+
+    def test_concurrent_accepts_never_overbook(self):
+        owner = User.objects.create(email="owner@example.com", firstname="Own", lastname="Er")
+        project = ProjectLead.objects.create(
+            owner=owner, projectname="Hot", description="D", max_members=5
+        )
+        User.objects.bulk_create([
+            User(email=f"a{i}@example.com", firstname="A", lastname=str(i)) for i in range(40)
+        ])
+        statuses = []
+        start = threading.Barrier(40)
+
+        def accept(i):
+            client = APIClient()
+            client.force_authenticate(owner)
+            start.wait()
+            try:
+                response = client.post("/api/projectmembers/", {
+                    "email": f"a{i}@example.com", "owner": "owner@example.com",
+                    "projectname": "Hot", "message": "Hi",
+                }, format="json")
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=accept, args=(i,)) for i in range(40)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        project.refresh_from_db()
+        members = ProjectMembers.objects.filter(project=project).count()
+
+        self.assertEqual(project.seats_taken, 5)
+        self.assertEqual(members, 5)
+        self.assertEqual(sorted(statuses), [201] * 5 + [409] * 35)
+
+
+class SkillMatchTests(TestCase):
+    """
+    Verifies the skills bitmask and bitwise discovery filters.
+    """
+
+    def setUp(self):
+        cache.clear()
+        response_cache.local.clear()
+        owner = User.objects.create_user(
+            email="owner@example.com", password="pass", firstname="Own", lastname="Er"
+        )
+        self.user = User.objects.create_user(
+            email="dev@example.com", password="pass", firstname="Dev", lastname="Eloper",
+            skills=mask_for(["python", "django"]),
+        )
+        ProjectLead.objects.create(owner=owner, projectname="Legacy", description="D", frontend=True)
+        ProjectLead.objects.create(owner=owner, projectname="Api", description="D", skills=mask_for(["django"]))
+        ProjectLead.objects.create(owner=owner, projectname="Mobile", description="D", skills=mask_for(["swift"]))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def listed(self, query=""):
+        response = self.client.get(f"/api/projects/?email=dev@example.com{query}")
+        return sorted(project["projectname"] for project in response.json())
+
+    def test_legacy_flags_are_folded_into_mask(self):
+        project = ProjectLead.objects.get(projectname="Legacy")
+
+        self.assertEqual(project.skills, mask_for(["frontend"]))
+        self.assertTrue(ProjectLead.objects.get(projectname="Api").skills & mask_for(["django"]))
+
+    def test_skill_filters(self):
+        self.assertEqual(self.listed(), ["Api", "Legacy", "Mobile"])
+        self.assertEqual(self.listed("&frontend=true"), ["Legacy"])
+        self.assertEqual(self.listed("&skills=swift,django"), ["Api", "Mobile"])
+        self.assertEqual(self.listed("&match=true"), ["Api"])
+
+    def test_unknown_skill_is_rejected(self):
+        response = self.client.get("/api/projects/?email=dev@example.com&skills=cobol")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_updating_legacy_flags_updates_the_mask(self):
+        project = ProjectLead.objects.get(projectname="Api")
+        self.client.force_authenticate(project.owner)
+        url = f"/api/projectleads/{project.pk}/"
+
+        self.assertEqual(self.client.patch(url, {"frontend": True}, format="json").status_code, 200)
+        project.refresh_from_db()
+        self.assertEqual((project.frontend, project.skills), (True, mask_for(["frontend", "django"])))
+
+        self.client.patch(url, {"frontend": False, "backend": True}, format="json")
+        project.refresh_from_db()
+        self.assertEqual((project.frontend, project.backend), (False, True))
+        self.assertEqual(project.skills, mask_for(["backend", "django"]))
+
+        response = self.client.patch(url, {"frontend": True, "skills": ["python"]}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_match_for_unknown_user_lists_nothing(self):
+        response = self.client.get("/api/projects/?email=nobody@example.com&match=true")
+
+        self.assertEqual((response.status_code, response.json()), (200, []))
+
+
+class CandidateSearchTests(TestCase):
+    """
+    Verifies skill-ranked candidate suggestions and bulk invitations.
+    """
+
+    def setUp(self):
+        skill_index.reset()
+        self.owner = User.objects.create_user(
+            email="owner@example.com", password="pass", firstname="Own", lastname="Er",
+            skills=mask_for(["python"]),
+        )
+        self.project = ProjectLead.objects.create(
+            owner=self.owner, projectname="Api", description="D", skills=mask_for(["python", "django", "sql"])
+        )
+
+        def user(name, skills):
+            return User.objects.create_user(
+                email=f"{name}@example.com", password="pass", firstname=name, lastname="X",
+                skills=mask_for(skills),
+            )
+
+        self.full = user("full", ["python", "django", "sql"])
+        self.partial = user("partial", ["django", "react"])
+        self.member = user("member", ["python", "django"])
+        self.requester = user("requester", ["sql"])
+        user("mobile", ["swift"])
+        ProjectMembers.objects.create(project=self.project, member=self.member)
+        ProjectRequest.objects.create(project=self.project, member=self.requester)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = f"/api/projectleads/{self.project.pk}/"
+
+    def emails(self, query=""):
+        response = self.client.get(self.url + "candidates/" + query)
+        return response.json()["count"], [(user["email"], user["score"]) for user in response.json()["results"]]
+
+    def test_candidates_are_ranked_and_exclude_involved_users(self):
+        self.assertEqual(
+            self.emails(), (2, [("full@example.com", 3), ("partial@example.com", 1)])
+        )
+        self.assertEqual(self.emails("?offset=1&limit=1"), (2, [("partial@example.com", 1)]))
+
+    def test_index_follows_user_saves(self):
+        self.emails()
+        newcomer = User.objects.create_user(
+            email="new@example.com", password="pass", firstname="N", lastname="X",
+            skills=mask_for(["sql", "django"]),
+        )
+        self.assertEqual([email for email, _ in self.emails()[1]], ["full@example.com", "new@example.com", "partial@example.com"])
+
+        newcomer.is_active = False
+        newcomer.save()
+        self.assertEqual(self.emails()[0], 2)
+
+    def test_page_is_consistent_with_concurrent_skill_changes(self):
+        ranked = skill_index.ranked
+        writers = []
+
+        def ranked_then_concurrent_update(mask):
+            groups = ranked(mask)
+            # Another request changes the excluded member's skills meanwhile
+            writer = threading.Thread(target=skill_index.update, args=(self.member.pk, mask_for(["sql"])))
+            writer.start()
+            writer.join(0.5)
+            writers.append(writer)
+            return groups
+
+        with mock.patch.object(skill_index, "ranked", ranked_then_concurrent_update):
+            _, page = skill_index.page(self.project.skills, 0, 10, excluded=[self.member.pk])
+        writers[0].join()
+
+        self.assertNotIn(self.member.pk, page)
+
+    def test_bulk_invite_creates_rows_once_and_hides_invitees(self):
+        body = {"emails": ["full@example.com", "nobody@example.com", "full@example.com", "owner@example.com"]}
+
+        # Project, invitees, one INSERT
+        with self.assertNumQueries(3):
+            response = self.client.post(self.url + "invite/", body, format="json")
+
+        self.assertEqual(
+            [result["status"] for result in response.json()["results"]],
+            ["invited", "not_found", "already_invited", "own_project"],
+        )
+        self.assertEqual(ProjectInvitation.objects.filter(project=self.project).count(), 1)
+        self.assertEqual(self.emails(), (1, [("partial@example.com", 1)]))
+
+    def test_candidates_of_other_owners_project_are_not_found(self):
+        self.client.force_authenticate(self.full)
+
+        self.assertEqual(self.client.get(self.url + "candidates/").status_code, 404)
+
+
+class CollaborationGraphTests(TestCase):
+    """
+    Verifies collaborator and friends-of-collaborators queries and the
+    incremental graph updates.
+    """
+
+    def setUp(self):
+        collaboration_graph.reset()
+        self.users = {
+            name: User.objects.create_user(
+                email=f"{name}@example.com", password="pass", firstname=name, lastname="X"
+            )
+            for name in ("ann", "bob", "cat", "dan", "eve")
+        }
+        self.alpha = ProjectLead.objects.create(owner=self.users["ann"], projectname="Alpha", description="D")
+        self.beta = ProjectLead.objects.create(owner=self.users["dan"], projectname="Beta", description="D")
+        for project, name in [(self.alpha, "bob"), (self.alpha, "cat"), (self.beta, "cat"), (self.beta, "eve")]:
+            ProjectMembers.objects.create(project=project, member=self.users[name])
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.users["ann"])
+
+    def network(self):
+        data = self.client.get("/api/collaborators/").json()
+        return (
+            [(user["email"][:3], user["shared_projects"]) for user in data["collaborators"]],
+            [(user["email"][:3], user["mutual"]) for user in data["suggestions"]],
+        )
+
+    def test_collaborators_and_two_hop_suggestions(self):
+        self.assertEqual(
+            self.network(), ([("bob", 1), ("cat", 1)], [("dan", 1), ("eve", 1)])
+        )
+
+    def test_membership_changes_update_graph(self):
+        self.network()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectMembers.objects.create(project=self.beta, member=self.users["bob"])
+        self.assertEqual(self.network()[1], [("dan", 2), ("eve", 2)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectMembers.objects.filter(project=self.alpha, member=self.users["cat"]).delete()
+        self.assertEqual(self.network(), ([("bob", 1)], [("cat", 1), ("dan", 1), ("eve", 1)]))
+
+    def test_compaction_keeps_the_same_graph(self):
+        self.network()
+        collaboration_graph.compact_threshold = 0
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                ProjectMembers.objects.create(project=self.beta, member=self.users["bob"])
+        finally:
+            collaboration_graph.compact_threshold = 10_000
+
+        # The commit path only hands a snapshot to the background thread
+        collaboration_graph._worker.join()
+        self.assertEqual(collaboration_graph._state.delta, {})
+        self.assertEqual(self.network()[1], [("dan", 2), ("eve", 2)])
+
+
+class SimilarProjectsTests(TestCase):
+    """
+    Verifies TF-IDF similar-project ranking, the discovery exclusions and
+    incremental index updates.
+    """
+
+    def setUp(self):
+        similar_projects_index.reset()
+        self.owner = User.objects.create_user(email="owner@example.com", password="pass", firstname="O", lastname="W")
+        self.viewer = User.objects.create_user(email="viewer@example.com", password="pass", firstname="V", lastname="W")
+        self.chess = ProjectLead.objects.create(owner=self.owner, projectname="Chess engine", description="Chess engine in Rust with opening books")
+        self.projects = {
+            name: ProjectLead.objects.create(owner=self.owner, projectname=name, description=description)
+            for name, description in [
+                ("Chess tutor", "Teach chess openings with an engine"),
+                ("Go engine", "Rust engine for the game of Go"),
+                ("Recipe site", "Share cooking recipes"),
+            ]
+        }
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def similar(self, project):
+        response = self.client.get(f"/api/projects/{project.pk}/similar/")
+        self.assertEqual(response.status_code, 200)
+        return [item["projectname"] for item in response.json()]
+
+    def test_ranks_by_shared_words(self):
+        response = self.client.get(f"/api/projects/{self.chess.pk}/similar/")
+        data = response.json()
+
+        self.assertEqual([item["projectname"] for item in data], ["Chess tutor", "Go engine"])
+        self.assertGreater(data[0]["similarity"], data[1]["similarity"])
+
+    @override_settings(SIMILAR_PROJECTS_PAGE_MAX_SIZE=1)
+    def test_limit_is_capped_by_its_own_setting(self):
+        response = self.client.get(f"/api/projects/{self.chess.pk}/similar/?limit=50")
+        self.assertEqual([item["projectname"] for item in response.json()], ["Chess tutor"])
+
+    def test_excludes_projects_the_user_cannot_join(self):
+        ProjectRequest.objects.create(project=self.projects["Chess tutor"], member=self.viewer, message="Hi")
+        self.assertEqual(self.similar(self.chess), ["Go engine"])
+
+        ProjectLead.objects.filter(pk=self.projects["Go engine"].pk).update(max_members=0)
+        self.assertEqual(self.similar(self.chess), [])
+
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.similar(self.chess), [])
+
+    def test_index_follows_project_writes(self):
+        self.similar(self.chess)
+
+        recipe = self.projects["Recipe site"]
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.description = "Chess engine recipes"
+            recipe.save()
+            self.projects["Go engine"].delete()
+        self.assertEqual(self.similar(self.chess)[-1], "Recipe site")
+        self.assertNotIn("Go engine", self.similar(self.chess))
+
+        similar_projects_index.compact_threshold = 0
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                ProjectLead.objects.create(owner=self.owner, projectname="Rust chess", description="Chess engine")
+        finally:
+            similar_projects_index.compact_threshold = 1000
+
+        similar_projects_index._worker.join()
+        self.assertEqual(similar_projects_index._state.overlay, {})
+        self.assertEqual(self.similar(self.chess)[0], "Rust chess")
+
+    def test_unknown_project(self):
+        self.assertEqual(self.client.get("/api/projects/999999/similar/").status_code, 404)
+
+
+class TrendingProjectsTests(TestCase):
+    """
+    Verifies the trending ranking, window sliding and rollup checkpoints.
+    """
+
+    def setUp(self):
+        trending.reset()
+        self.owner = User.objects.create_user(email="owner@example.com", password="pass", firstname="O", lastname="W")
+        self.viewer = User.objects.create_user(email="viewer@example.com", password="pass", firstname="V", lastname="W")
+        self.users = [
+            User.objects.create_user(email=f"u{i}@example.com", password="pass", firstname="U", lastname="W")
+            for i in range(3)
+        ]
+        self.quiet, self.busy, self.hot = [
+            ProjectLead.objects.create(owner=self.owner, projectname=name, description="D")
+            for name in ("Quiet", "Busy", "Hot")
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def ranking(self, window="1h"):
+        response = self.client.get(f"/api/projects/trending/?window={window}")
+        self.assertEqual(response.status_code, 200)
+        return [(item["projectname"], item["score"]) for item in response.json()]
+
+    def test_ranks_requests_and_accepts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for user in self.users[:2]:
+                ProjectRequest.objects.create(project=self.busy, member=user)
+            ProjectMembers.objects.create(project=self.hot, member=self.users[2])
+        self.assertEqual(self.ranking(), [("Hot", 3), ("Busy", 2)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectRequest.objects.create(project=self.hot, member=self.viewer)
+        self.assertEqual(self.ranking(), [("Busy", 2)])
+
+    def test_windows_slide(self):
+        now = timezone.now()
+        trending.record(REQUEST, [self.busy.pk], when=now - timedelta(hours=2))
+        trending.record(JOIN, [self.hot.pk], when=now - timedelta(days=2))
+        trending.record(REQUEST, [self.quiet.pk])
+
+        self.assertEqual(self.ranking("1h"), [("Quiet", 1)])
+        self.assertEqual(self.ranking("24h"), [("Quiet", 1), ("Busy", 1)])
+        self.assertEqual(self.ranking("7d"), [("Hot", 3), ("Quiet", 1), ("Busy", 1)])
+
+        later = now.timestamp() + 23 * 3600
+        with mock.patch("projects.trending.time.time", return_value=later):
+            self.assertEqual(self.ranking("1h"), [])
+            self.assertEqual(self.ranking("24h"), [("Quiet", 1)])
+
+    def test_checkpoint_adds_to_rollups(self):
+        trending.record(REQUEST, [self.busy.pk, self.busy.pk])
+        trending.record(JOIN, [self.hot.pk])
+        self.assertEqual(trending.checkpoint(), 2)
+
+        trending.record(REQUEST, [self.busy.pk])
+        self.assertEqual(trending.checkpoint(), 1)
+        self.assertEqual(
+            set(TrendingRollup.objects.values_list("project__projectname", "requests", "joins")),
+            {("Busy", 3, 0), ("Hot", 0, 1)},
+        )
+
+        # A fresh process starts from the rollups
+        trending.reset()
+        self.assertEqual(self.ranking(), [("Busy", 3), ("Hot", 3)])
+
+    @override_settings(TRENDING_PAGE_MAX_SIZE=1)
+    def test_limit_is_capped_by_its_own_setting(self):
+        trending.record(REQUEST, [self.busy.pk, self.busy.pk, self.quiet.pk])
+        response = self.client.get("/api/projects/trending/?window=1h&limit=50")
+        self.assertEqual([item["projectname"] for item in response.json()], ["Busy"])
+
+    def test_unknown_window(self):
+        self.assertEqual(self.client.get("/api/projects/trending/?window=1y").status_code, 400)
+
+
+@override_settings(OUTBOX_RELAY_LAG_SECONDS=0)
+class AnalyticsTests(TestCase):
+    """
+    Verifies the analytics rollups maintained from the outbox, the endpoints
+    reading them and the backfill.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(email="owner@example.com", password="pass", firstname="O", lastname="W")
+        self.other = User.objects.create_user(email="other@example.com", password="pass", firstname="O", lastname="T")
+        self.staff = User.objects.create_user(email="staff@example.com", password="pass", firstname="S", lastname="T")
+        self.staff.is_staff = True
+        self.staff.save()
+        people = [
+            User.objects.create_user(email=f"p{i}@example.com", password="pass", firstname="P", lastname="X")
+            for i in range(3)
+        ]
+
+        project = ProjectLead.objects.create(
+            owner=self.owner, projectname="Api", description="D", skills=mask_for(["python", "django"])
+        )
+        other_project = ProjectLead.objects.create(
+            owner=self.other, projectname="Site", description="D", skills=mask_for(["python"])
+        )
+        for person in people:
+            ProjectRequest.objects.create(project=project, member=person)
+        ProjectRequest.objects.create(project=other_project, member=people[0])
+
+        ProjectMembers.objects.create(project=project, member=people[0])
+        ProjectRequestRejected.objects.create(project=project, user=people[1])
+        # Accepted requests are deleted by the client afterwards
+        ProjectRequest.objects.filter(project=project, member=people[0]).delete()
+        relay_once()
+
+        self.client = APIClient()
+
+    def test_owner_statistics(self):
+        self.client.force_authenticate(self.owner)
+        data = self.client.get("/api/analytics/mine/?days=7").json()
+
+        self.assertEqual(data["totals"], {
+            "projects_created": 1, "requests": 3, "accepted": 1, "rejected": 1,
+            "acceptance_rate": 0.5, "avg_decision_hours": 0.0,
+        })
+        self.assertEqual(len(data["days"]), 1)
+        self.assertEqual(data["skills"], {"python": 3, "django": 3})
+
+    def test_platform_statistics_are_for_staff(self):
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.client.get("/api/analytics/").status_code, 403)
+
+        self.client.force_authenticate(self.staff)
+        data = self.client.get("/api/analytics/").json()
+        self.assertEqual((data["totals"]["projects_created"], data["totals"]["requests"]), (2, 4))
+        self.assertEqual(data["skills"], {"python": 4, "django": 3})
+
+    def test_reads_only_rollups(self):
+        with self.assertNumQueries(2):
+            summarize(30)
+
+    def test_backfill_rebuilds_the_same_totals(self):
+        live = summarize(30)
+
+        chunks = list(backfill(chunk_size=2))
+
+        self.assertEqual([source for source, _ in chunks].count("requests"), 2)
+        self.assertEqual(summarize(30), live)
+
+
+class RequestExpiryTests(TestCase):
+    """
+    Verifies that expire_requests archives old pending requests in batches
+    and leaves tombstones for delta sync.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(email="owner@example.com", password="pass", firstname="O", lastname="W")
+        self.project = ProjectLead.objects.create(owner=self.owner, projectname="P", description="D")
+        self.requests = [
+            ProjectRequest.objects.create(
+                project=self.project,
+                member=User.objects.create_user(email=f"m{i}@example.com", password="pass", firstname="M", lastname="X"),
+            )
+            for i in range(3)
+        ]
+        old = timezone.now() - timedelta(days=40)
+        ProjectRequest.objects.filter(pk__in=[r.pk for r in self.requests[:2]]).update(created_at=old)
+
+    def test_expires_old_requests_in_batches(self):
+        out = StringIO()
+        with self.assertLogs("projects.management.commands.expire_requests", "INFO") as logs:
+            call_command("expire_requests", "--batch-size", "1", stdout=out)
+
+        self.assertEqual(list(ProjectRequest.objects.values_list("pk", flat=True)), [self.requests[2].pk])
+        self.assertEqual(
+            sorted(ExpiredProjectRequest.objects.values_list("member__email", flat=True)),
+            ["m0@example.com", "m1@example.com"],
+        )
+        self.assertIn("batch 2: 1 expired, 2 total", out.getvalue())
+        self.assertIn("batch 2: 1 expired, 2 total", logs.output[1])
+        self.assertEqual(
+            Tombstone.objects.filter(kind=Tombstone.REQUEST, object_id=self.requests[0].pk).count(), 2
+        )
+
+    def test_policy_age(self):
+        call_command("expire_requests", "--days", "60", stdout=StringIO())
+        self.assertEqual(ProjectRequest.objects.count(), 3)
+
+
+class RejectionRetentionTests(TestCase):
+    """
+    Verifies that prune_rejections removes rejections past the retention
+    period and, on PostgreSQL, keeps the monthly partitions current.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(email="owner@example.com", password="pass", firstname="O", lastname="W")
+        self.project = ProjectLead.objects.create(owner=self.owner, projectname="P", description="D")
+        self.users = [
+            User.objects.create_user(email=f"r{i}@example.com", password="pass", firstname="R", lastname="X")
+            for i in range(3)
+        ]
+        self.rejections = [
+            ProjectRequestRejected.objects.create(project=self.project, user=user) for user in self.users
+        ]
+        ProjectRequestRejected.objects.filter(pk=self.rejections[0].pk).update(
+            rejected_on=timezone.now() - timedelta(days=500)
+        )
+
+    def test_drops_old_rejections(self):
+        out = StringIO()
+        call_command("prune_rejections", "--keep-months", "12", stdout=out)
+
+        self.assertEqual(
+            sorted(ProjectRequestRejected.objects.values_list("user__email", flat=True)),
+            ["r1@example.com", "r2@example.com"],
+        )
+        if connection.vendor != "postgresql":
+            self.assertIn("deleted 1 rejections", out.getvalue())
+
+    def test_pruning_bumps_the_affected_versions(self):
+        keys = [user_key("r0@example.com"), user_key("owner@example.com"), project_key("owner@example.com", "P")]
+
+        def versions():
+            found = dict(DataVersion.objects.values_list("key", "version"))
+            return [found.get(key, 0) for key in keys + [user_key("r1@example.com")]]
+
+        before = versions()
+        call_command("prune_rejections", "--keep-months", "12", stdout=StringIO())
+        after = versions()
+
+        self.assertTrue(all(new > old for new, old in zip(after[:3], before[:3])))
+        self.assertEqual(after[3], before[3])
+
+    @skipUnless(connection.vendor == "postgresql", "monthly partitions need PostgreSQL")
+    def test_partitions_and_unique_pairs(self):
+        current = month_start(timezone.localdate())
+        call_command("prune_rejections", "--ahead", "2", stdout=StringIO())
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT tableoid::regclass::text FROM projects_projectrequestrejected WHERE id = %s",
+                [self.rejections[1].pk],
+            )
+            self.assertEqual(cursor.fetchone()[0], partition_name(current))
+            cursor.execute("SELECT to_regclass(%s)", [partition_name(add_months(current, 2))])
+            self.assertIsNotNone(cursor.fetchone()[0])
+
+        rejection, created = ProjectRequestRejected.objects.insert_or_get(
+            ("project", "user"), project=self.project, user=self.users[1]
+        )
+        self.assertFalse(created)
+        self.assertEqual(rejection.pk, self.rejections[1].pk)
+        self.assertEqual(ProjectRequestRejected.objects.filter(user=self.users[1]).count(), 1)
+
+
+class ProjectArchivalTests(TestCase):
+    """
+    Verifies that deleting a project archives it at once and that the purger
+    removes its rows in batches later.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(email="owner@example.com", password="pass", firstname="O", lastname="W")
+        self.project = ProjectLead.objects.create(owner=self.owner, projectname="P", description="D")
+        self.members = [
+            User.objects.create_user(email=f"m{i}@example.com", password="pass", firstname="M", lastname="X")
+            for i in range(3)
+        ]
+        for member in self.members:
+            ProjectMembers.objects.create(project=self.project, member=member)
+        self.request = ProjectRequest.objects.create(
+            project=self.project,
+            member=User.objects.create_user(email="a@example.com", password="pass", firstname="A", lastname="P"),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_delete_archives_project(self):
+        cursor = self.client.get("/api/sync/").json()["cursor"]
+        response = self.client.delete(f"/api/projectleads/{self.project.pk}/")
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(ProjectLead.objects.filter(pk=self.project.pk).exists())
+        self.assertIsNotNone(ProjectLead.all_objects.get(pk=self.project.pk).archived_at)
+        self.assertEqual(ProjectMembers.objects.filter(project=self.project).count(), 3)
+
+        data = self.client.get(f"/api/sync/?since={cursor}").json()
+        self.assertEqual(data["projects"]["deleted"], [self.project.pk])
+        counts = self.client.get("/api/projectcount/?email=m0@example.com").json()
+        self.assertEqual(counts["joinedprojects"], 0)
+
+    def test_name_of_archived_project_can_be_reused(self):
+        def create():
+            return self.client.post("/api/projectleads/", {
+                "email": "owner@example.com", "projectname": "P", "description": "D",
+                "frontend": False, "backend": True,
+            }, format="json")
+
+        self.assertEqual(create().status_code, 400)
+        self.client.delete(f"/api/projectleads/{self.project.pk}/")
+        self.assertEqual(create().status_code, 201)
+
+        other = ProjectLead.objects.create(owner=self.owner, projectname="Q", description="D")
+        response = self.client.patch(f"/api/projectleads/{other.pk}/", {"projectname": "P"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("projectname", response.json())
+
+    def test_purge_task_resumes_in_a_new_task_before_its_lease_ends(self):
+        self.client.delete(f"/api/projectleads/{self.project.pk}/")
+        Task.objects.all().delete()
+
+        with override_settings(TASK_LEASE_SECONDS=0):
+            purge_project(self.project.pk, batch_size=2)
+        self.assertTrue(ProjectLead.all_objects.filter(pk=self.project.pk).exists())
+        self.assertEqual(list(Task.objects.values_list("name", "kwargs")), [
+            ("projects.purge_project", {"project_id": self.project.pk, "batch_size": 2}),
+        ])
+
+        self.assertEqual(work(burst=True), (1, 0))
+        self.assertFalse(ProjectLead.all_objects.filter(pk=self.project.pk).exists())
+
+    def test_purge_deletes_rows_in_batches(self):
+        self.client.delete(f"/api/projectleads/{self.project.pk}/")
+        out = StringIO()
+        call_command("purge_archived_projects", "--batch-size", "2", stdout=out)
+
+        self.assertFalse(ProjectLead.all_objects.filter(pk=self.project.pk).exists())
+        self.assertFalse(ProjectMembers.objects.exists())
+        self.assertFalse(ProjectRequest.objects.exists())
+        self.assertIn("projects_projectmembers: 1 deleted, 3 total", out.getvalue())
+        self.assertEqual(
+            Tombstone.objects.filter(kind=Tombstone.MEMBER, user_id=self.owner.pk).count(), 3
+        )
+        self.assertEqual(Tombstone.objects.filter(kind=Tombstone.PROJECT).count(), 1)
+
+
+class AccountDeletionTests(TestCase):
+    """
+    Verifies that deleting an account deactivates it at once and that the
+    worker deletes its data in batches, resuming after an interruption.
+    """
+
+    def setUp(self):
+        self.leaver = User.objects.create_user(email="leaver@example.com", password="pass", firstname="L", lastname="V")
+        self.other = User.objects.create_user(email="other@example.com", password="pass", firstname="O", lastname="T")
+        self.owned = ProjectLead.objects.create(owner=self.leaver, projectname="Mine", description="D")
+        for i in range(3):
+            member = User.objects.create_user(email=f"m{i}@example.com", password="pass", firstname="M", lastname="X")
+            ProjectMembers.objects.create(project=self.owned, member=member)
+
+        self.joined = ProjectLead.objects.create(
+            owner=self.other, projectname="Joined", description="D", max_members=2, seats_taken=1
+        )
+        ProjectMembers.objects.create(project=self.joined, member=self.leaver)
+        applied = ProjectLead.objects.create(owner=self.other, projectname="Applied", description="D")
+        ProjectRequest.objects.create(project=applied, member=self.leaver)
+        rejected = ProjectLead.objects.create(owner=self.other, projectname="Rejected", description="D")
+        ProjectRequestRejected.objects.create(project=rejected, user=self.leaver)
+        self.refresh = RefreshToken.for_user(self.leaver)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.leaver)
+
+    def test_delete_deactivates_and_revokes_tokens(self):
+        response = self.client.delete("/api/accounts/me/")
+
+        self.assertEqual(response.status_code, 202)
+        self.leaver.refresh_from_db()
+        self.assertFalse(self.leaver.is_active)
+        self.assertTrue(BlacklistedToken.objects.filter(token__user=self.leaver).exists())
+        self.assertFalse(ProjectLead.objects.filter(owner=self.leaver).exists())
+
+        refreshed = APIClient().post("/api/token/refresh/", {"refresh": str(self.refresh)}, format="json")
+        self.assertEqual(refreshed.status_code, 401)
+
+    def test_worker_resumes_after_interruption(self):
+        self.client.delete("/api/accounts/me/")
+        deletion = AccountDeletion.objects.get(user=self.leaver)
+
+        # A worker stopped after two batches
+        batches = process_deletion(deletion.pk, batch_size=2)
+        next(batches), next(batches)
+        batches.close()
+        deletion.refresh_from_db()
+        self.assertIsNone(deletion.completed_at)
+        self.assertEqual(deletion.deleted_rows, 3)
+
+        out = StringIO()
+        call_command("process_account_deletions", "--batch-size", "2", stdout=out)
+
+        deletion.refresh_from_db()
+        self.assertIsNotNone(deletion.completed_at)
+        self.assertIsNone(deletion.user_id)
+        self.assertFalse(User.objects.filter(email="leaver@example.com").exists())
+        self.assertFalse(ProjectLead.all_objects.filter(projectname="Mine").exists())
+        self.assertEqual(ProjectMembers.objects.filter(project=self.joined).count(), 0)
+        self.assertFalse(ProjectRequestRejected.objects.exists())
+        self.joined.refresh_from_db()
+        self.assertEqual(self.joined.seats_taken, 0)
+        self.assertIn("leaver@example.com: memberships 1 deleted", out.getvalue())
+
+
+ran_tasks = []
+
+
+@task("tests.record")
+def record_task(label):
+    ran_tasks.append(label)
+
+
+@task("tests.fail")
+def failing_task():
+    raise RuntimeError("boom")
+
+
+class TaskQueueTests(TestCase):
+    """
+    Verifies that the task queue runs tasks by lane, retries failures with
+    backoff and requeues tasks whose worker lease expired.
+    """
+
+    def setUp(self):
+        ran_tasks.clear()
+
+    def test_runs_tasks_by_lane(self):
+        enqueue("tests.record", label="default")
+        enqueue("tests.record", lane=Task.LOW, label="low")
+        enqueue("tests.record", lane=Task.HIGH, label="high")
+        enqueue("tests.record", delay=60, label="later")
+
+        self.assertEqual(work(batch_size=2, burst=True), (3, 0))
+        self.assertEqual(ran_tasks, ["high", "default", "low"])
+        self.assertEqual(list(Task.objects.values_list("kwargs__label", flat=True)), ["later"])
+
+        self.assertEqual(work(lanes=[Task.HIGH], burst=True), (0, 0))
+
+    def test_retries_with_backoff_then_fails(self):
+        queued = enqueue("tests.fail", max_attempts=2)
+
+        self.assertEqual(work(burst=True), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Task.QUEUED, 1))
+        self.assertGreater(queued.run_at, timezone.now())
+        self.assertIn("RuntimeError: boom", queued.last_error)
+
+        Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        work(burst=True)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Task.FAILED, 2))
+
+    def test_expired_lease_is_requeued(self):
+        stuck = enqueue("tests.record", label="stuck")
+        Task.objects.filter(pk=stuck.pk).update(
+            status=Task.RUNNING, attempts=1, locked_until=timezone.now() - timedelta(seconds=1)
+        )
+
+        work(burst=True)
+        self.assertEqual(ran_tasks, ["stuck"])
+        self.assertFalse(Task.objects.exists())
+
+    def test_account_deletion_runs_as_task(self):
+        user = User.objects.create_user(email="gone@example.com", password="pass", firstname="G", lastname="O")
+        ProjectLead.objects.create(owner=user, projectname="P", description="D")
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            client.delete("/api/accounts/me/")
+            work(burst=True)
+
+        self.assertFalse(User.objects.filter(email="gone@example.com").exists())
+        self.assertIsNotNone(AccountDeletion.objects.get(email="gone@example.com").completed_at)
+
+
+class StubServer:
+    """
+    Local keep-alive HTTP server standing in for webhook receivers: records
+    the headers and body of every POST and answers with `status`.
+    """
+
+    def __init__(self, status=200):
+        self.status = status
+        self.received = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.received.append((dict(self.headers), body))
+                self.send_response(stub.status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hook"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@override_settings(OUTBOX_RELAY_LAG_SECONDS=0)
+class OutboxTests(TestCase):
+    """
+    Verifies that changes record outbox events in their own transaction and
+    that the relay delivers them in batches, per consumer.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(email="owner@example.com", password="pass", firstname="O", lastname="W")
+        self.people = [
+            User.objects.create_user(email=f"p{i}@example.com", password="pass", firstname="P", lastname="X")
+            for i in range(2)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def decide(self, endpoint, email):
+        return self.client.post(endpoint, {
+            "email": email, "owner": "owner@example.com", "projectname": "Api", "message": "Hi",
+        }, format="json")
+
+    def make_changes(self):
+        self.client.post("/api/projectleads/", {
+            "email": "owner@example.com", "projectname": "Api", "description": "D",
+            "frontend": True, "backend": False, "max_members": 1,
+        }, format="json")
+        for person in self.people:
+            self.client.post("/api/projectrequests/", {
+                "owner_email": "owner@example.com", "projectname": "Api", "member_email": person.email,
+            }, format="json")
+        self.decide("/api/projectmembers/", "p0@example.com")
+        self.decide("/api/projectreject/", "p1@example.com")
+
+    def test_changes_record_events(self):
+        self.make_changes()
+        # The team is full: the accept rolls back, and so does its event
+        self.assertEqual(self.decide("/api/projectmembers/", "p1@example.com").status_code, 409)
+        ProjectMembers.objects.get(member=self.people[0]).delete()
+
+        self.assertEqual(list(OutboxEvent.objects.order_by("id").values_list("kind", flat=True)), [
+            OutboxEvent.PROJECT_CREATED, OutboxEvent.REQUEST_SUBMITTED, OutboxEvent.REQUEST_SUBMITTED,
+            OutboxEvent.REQUEST_ACCEPTED, OutboxEvent.REQUEST_REJECTED, OutboxEvent.MEMBER_LEFT,
+        ])
+        accepted = OutboxEvent.objects.get(kind=OutboxEvent.REQUEST_ACCEPTED)
+        self.assertEqual((accepted.user_id, accepted.payload["owner"]), (self.people[0].pk, self.owner.pk))
+
+    def test_decisions_are_timed_after_requests_and_their_events_are_gone(self):
+        self.make_changes()
+        ProjectRequest.objects.all().delete()
+        # Submission events are pruned well before requests expire
+        OutboxEvent.objects.filter(kind=OutboxEvent.REQUEST_SUBMITTED).delete()
+
+        relay_once(consumer_map={"analytics": AnalyticsConsumer()})
+        self.assertEqual(summarize(1)["totals"]["avg_decision_hours"], 0.0)
+
+    def test_relay_delivers_batches_to_every_consumer(self):
+        self.make_changes()
+
+        self.assertEqual(relay_once(batch_size=3), {"analytics": 3, "notifications": 3, "webhooks": 3})
+        self.assertEqual(relay_once(batch_size=3), {"analytics": 2, "notifications": 2, "webhooks": 2})
+        self.assertEqual(relay_once(batch_size=3), {"analytics": 0, "notifications": 0, "webhooks": 0})
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["owner@example.com", "owner@example.com", "p0@example.com", "p1@example.com"],
+        )
+        self.assertEqual(summarize(1)["totals"]["requests"], 2)
+
+    def test_failing_consumer_is_retried_alone(self):
+        self.make_changes()
+
+        class Flaky(Consumer):
+            failures = 1
+
+            def deliver(self, events):
+                if self.failures:
+                    self.failures -= 1
+                    raise ConnectionError("down")
+
+        consumer_map = {"analytics": AnalyticsConsumer(), "flaky": Flaky()}
+        with self.assertLogs("projects.outbox", "ERROR"):
+            outcomes = relay_once(consumer_map=consumer_map)
+        self.assertIsInstance(outcomes["flaky"], ConnectionError)
+        self.assertEqual(outcomes["analytics"], 5)
+
+        self.assertEqual(relay_once(consumer_map=consumer_map), {"analytics": 0, "flaky": 5})
+        self.assertEqual(OutboxCursor.objects.get(consumer="flaky").last_id, OutboxEvent.objects.latest("id").pk)
+
+    @override_settings(OUTBOX_RELAY_LAG_SECONDS=60)
+    def test_recent_events_wait_for_the_lag(self):
+        self.make_changes()
+        self.assertEqual(relay_once(), {"analytics": 0, "notifications": 0, "webhooks": 0})
+
+    @override_settings(OUTBOX_RELAY_LAG_SECONDS=60)
+    def test_relay_never_passes_over_a_recent_event(self):
+        self.make_changes()
+        ids = list(OutboxEvent.objects.order_by("id").values_list("id", flat=True))
+        OutboxEvent.objects.exclude(pk=ids[1]).update(created_at=timezone.now() - timedelta(minutes=5))
+
+        self.assertEqual(relay_once(), {"analytics": 1, "notifications": 1, "webhooks": 1})
+        self.assertEqual(OutboxCursor.objects.get(consumer="analytics").last_id, ids[0])
+
+    def test_prunes_relayed_events_past_retention(self):
+        self.make_changes()
+        relay_once(batch_size=2)
+        OutboxEvent.objects.update(created_at=timezone.now() - timedelta(days=30))
+
+        self.assertEqual(prune(), 2)
+        self.assertEqual(OutboxEvent.objects.count(), 3)
+
+
+@override_settings(OUTBOX_RELAY_LAG_SECONDS=0, WEBHOOK_ALLOW_PRIVATE_ADDRESSES=True)
+class WebhookTests(TestCase):
+    """
+    Verifies webhook subscriptions, signed delivery off the request path,
+    retries with backoff, dead-lettering and connection reuse.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(email="owner@example.com", password="pass", firstname="O", lastname="W")
+        self.member = User.objects.create_user(email="m@example.com", password="pass", firstname="M", lastname="X")
+        self.project = ProjectLead.objects.create(owner=self.owner, projectname="Api", description="D")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def subscribe(self, url, **extra):
+        return self.client.post(
+            f"/api/projectleads/{self.project.pk}/webhooks/", {"url": url, **extra}, format="json"
+        )
+
+    def request_to_join(self):
+        client = APIClient()
+        client.force_authenticate(self.member)
+        client.post("/api/projectrequests/", {
+            "owner_email": "owner@example.com", "projectname": "Api", "member_email": "m@example.com",
+        }, format="json")
+
+    def test_subscriptions_are_managed_by_the_owner(self):
+        response = self.subscribe("http://127.0.0.1:9/hook", events=["request.submitted"])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()["secret"]), 64)
+        self.assertEqual(self.subscribe("ftp://example.com/").status_code, 400)
+        self.assertEqual(self.subscribe("http://x.example", events=["nope"]).status_code, 400)
+
+        other = APIClient()
+        other.force_authenticate(self.member)
+        self.assertEqual(other.get(f"/api/projectleads/{self.project.pk}/webhooks/").status_code, 404)
+
+        hook_id = response.json()["id"]
+        self.assertEqual(len(self.client.get(f"/api/projectleads/{self.project.pk}/webhooks/").json()), 1)
+        self.assertEqual(self.client.delete(f"/api/projectleads/{self.project.pk}/webhooks/{hook_id}/").status_code, 204)
+        self.assertFalse(WebhookSubscription.objects.exists())
+
+    def test_events_are_delivered_signed_off_the_request_path(self):
+        with StubServer() as stub:
+            secret = self.subscribe(stub.url, events=["request.submitted"]).json()["secret"]
+            self.request_to_join()
+            self.assertEqual(stub.received, [])
+
+            relay_once()
+            self.assertEqual(WebhookDelivery.objects.count(), 1)
+            self.assertEqual(deliver_batch(), (1, 0))
+
+        headers, body = stub.received[0]
+        self.assertEqual(headers["X-Webhook-Event"], "request.submitted")
+        self.assertEqual(
+            headers["X-Webhook-Signature"], "sha256=" + sign(secret, headers["X-Webhook-Timestamp"], body)
+        )
+        self.assertEqual(json.loads(body)["user"], self.member.pk)
+        self.assertFalse(WebhookDelivery.objects.exists())
+
+    @override_settings(WEBHOOK_MAX_ATTEMPTS=2)
+    def test_failures_are_retried_then_dead_lettered(self):
+        with StubServer(status=500) as stub:
+            self.subscribe(stub.url, events=["request.submitted"])
+            self.request_to_join()
+            relay_once()
+
+            self.assertEqual(deliver_batch(), (0, 1))
+            delivery = WebhookDelivery.objects.get()
+            self.assertEqual((delivery.status, delivery.attempts, delivery.response_status), ("pending", 1, 500))
+            self.assertGreater(delivery.next_attempt_at, timezone.now())
+            self.assertEqual(deliver_batch(), (0, 0))
+
+            WebhookDelivery.objects.update(next_attempt_at=timezone.now())
+            deliver_batch()
+            self.assertEqual(WebhookDelivery.objects.get().status, WebhookDelivery.DEAD)
+
+            stub.status = 200
+            self.assertEqual(retry_dead(), 1)
+            self.assertEqual(deliver_batch(), (1, 0))
+
+        self.assertEqual(len(stub.received), 3)
+
+    @override_settings(WEBHOOK_ALLOW_PRIVATE_ADDRESSES=False)
+    def test_internal_addresses_are_refused(self):
+        for url in ["http://127.0.0.1:9/hook", "http://169.254.169.254/latest", "http://10.0.0.1/", "http://[::1]/"]:
+            self.assertEqual(self.subscribe(url).status_code, 400, url)
+
+        with StubServer() as stub:
+            # Made before the check, or pointed inside since by DNS
+            WebhookSubscription.objects.create(project=self.project, url=stub.url)
+            self.request_to_join()
+            relay_once()
+            self.assertEqual(deliver_batch(), (0, 2))
+
+        self.assertEqual(stub.received, [])
+        self.assertIn("not a public address", WebhookDelivery.objects.first().last_error)
+
+    @override_settings(WEBHOOK_TIMEOUT_SECONDS=10, WEBHOOK_LEASE_SECONDS=120)
+    def test_lease_covers_the_whole_batch(self):
+        self.subscribe("http://127.0.0.1:9/hook")
+        self.request_to_join()
+        relay_once()
+
+        before = timezone.now()
+        self.assertEqual(len(claim(batch_size=3, concurrency=1)), 2)
+        # Each of the serial requests may time out before the last is sent
+        leased_until = WebhookDelivery.objects.values_list("next_attempt_at", flat=True)[0]
+        self.assertGreaterEqual(leased_until, before + timedelta(seconds=3 * 10 + 120))
+
+    def test_client_reuses_connections_within_its_bound(self):
+        async def post_all(client, url):
+            await asyncio.gather(*(client.post(url, b"{}", {}) for _ in range(20)))
+            await client.close()
+
+        with StubServer() as stub:
+            client = HTTPClient(concurrency=2, timeout=5)
+            asyncio.run(post_all(client, stub.url))
+
+        self.assertEqual(len(stub.received), 20)
+        self.assertLessEqual(client.connections_opened, 2)
+
+    def test_client_skips_interim_responses_and_drops_large_bodies(self):
+        async def respond(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            await reader.readexactly(2)
+            writer.write(
+                b"HTTP/1.1 100 Continue\r\n\r\n"
+                b"HTTP/1.1 200 OK\r\nContent-Length: 100000000\r\n\r\n" + b"x" * 1024
+            )
+            await writer.drain()
+            # Never sends the rest of the body
+            await reader.read()
+            writer.close()
+
+        async def post_twice():
+            server = await asyncio.start_server(respond, "127.0.0.1", 0)
+            url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/hook"
+            client = HTTPClient(concurrency=1, timeout=2)
+            statuses = [await client.post(url, b"{}", {}) for _ in range(2)]
+            await client.close()
+            server.close()
+            return statuses, client.connections_opened
+
+        self.assertEqual(asyncio.run(post_twice()), ([200, 200], 2))
+
+
+class DigestTests(TestCase):
+    """
+    Verifies that daily digests summarize every owner's pending requests in
+    one query and are sent in batches, inline or from a worker pool.
+    """
+
+    def setUp(self):
+        def user(email):
+            return User.objects.create_user(email=email, password="pass", firstname=email[0].upper(), lastname="X")
+
+        self.owners = [user(f"owner{i}@example.com") for i in range(3)]
+        applicants = [user(f"a{i}@example.com") for i in range(3)]
+
+        api = ProjectLead.objects.create(owner=self.owners[0], projectname="Api", description="D")
+        site = ProjectLead.objects.create(owner=self.owners[0], projectname="Site", description="D")
+        quiet = ProjectLead.objects.create(owner=self.owners[1], projectname="Quiet", description="D")
+        busy = ProjectLead.objects.create(owner=self.owners[2], projectname="Busy", description="D")
+
+        for applicant in applicants:
+            ProjectRequest.objects.create(project=api, member=applicant)
+        ProjectRequest.objects.create(project=site, member=applicants[0])
+        ProjectRequest.objects.create(project=busy, member=applicants[0])
+        # Owner 1 only has a request older than a day: no digest
+        old = ProjectRequest.objects.create(project=quiet, member=applicants[0])
+        ProjectRequest.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=3))
+        ProjectRequest.objects.filter(project=api, member=applicants[2]).update(
+            created_at=timezone.now() - timedelta(days=3)
+        )
+
+    def test_summaries_come_from_one_query(self):
+        with self.assertNumQueries(1):
+            summaries = list(pending_summaries(digest_since(24)))
+
+        self.assertEqual([summary["email"] for summary in summaries], ["owner0@example.com", "owner2@example.com"])
+        self.assertEqual((summaries[0]["pending"], summaries[0]["new"]), (4, 3))
+        self.assertEqual(summaries[0]["projects"], [
+            {"name": "Api", "pending": 3, "new": 2},
+            {"name": "Site", "pending": 1, "new": 1},
+        ])
+
+    def test_sends_digests_in_batches(self):
+        out = StringIO()
+        call_command("send_digests", "--workers", "0", "--batch-size", "1", stdout=out)
+
+        self.assertIn("batch 2: 1 sent, 2 total", out.getvalue())
+        self.assertEqual([message.to for message in mail.outbox], [["owner0@example.com"], ["owner2@example.com"]])
+        self.assertEqual(mail.outbox[0].subject, "3 new join requests for your projects")
+        self.assertIn("3 new join requests in the last 24 hours.", mail.outbox[0].body)
+        self.assertIn("- Api: 3 pending (2 new)", mail.outbox[0].body)
+
+    def test_worker_pool_sends_and_resumes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            backend = "django.core.mail.backends.filebased.EmailBackend"
+            with override_settings(EMAIL_BACKEND=backend, EMAIL_FILE_PATH=directory):
+                batches = list(send_digests(digest_since(24), workers=2, batch_size=1))
+                resumed = list(send_digests(digest_since(24), workers=2, start_after=self.owners[0].pk))
+
+            sent = "".join(Path(directory, name).read_text() for name in os.listdir(directory))
+
+        self.assertEqual(batches, [(1, self.owners[0].pk), (1, self.owners[2].pk)])
+        self.assertEqual(resumed, [(1, self.owners[2].pk)])
+        self.assertEqual(sent.count("To: owner2@example.com"), 2)
+        self.assertEqual(sent.count("To: owner0@example.com"), 1)
@@ -0,0 +1,335 @@
+"""
+trending.py
+
+This module ranks "hot right now" projects by how many join requests they
+received and members they accepted over the last hour, day and week.
+
+Counts are kept in memory in fixed time buckets (`TRENDING_BUCKET_SECONDS`
+long) per project, and every window keeps running totals: an event adds to
+the totals of the windows it falls in, and when a bucket slides out of a
+window its counts are subtracted again. No query over the request and
+membership tables is needed to rank projects.
+
+Each process records the events it commits and checkpoints them every
+`TRENDING_CHECKPOINT_SECONDS` into `TrendingRollup` by adding its counts to
+the rows of the same bucket. Right after a checkpoint the buckets are
+reloaded from the rollup table, which brings in the counts checkpointed by
+other processes.
+
+The best `TRENDING_TOP_SIZE` projects of a window are selected with a heap
+(`heapq.nlargest`) whenever the totals have changed, so serving the top K
+reads K entries of a ready list.
+"""
+
+import heapq
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from .models import ProjectLead, TrendingRollup
+
+WINDOWS = {"1h": 3600, "24h": 24 * 3600, "7d": 7 * 24 * 3600}
+
+REQUEST = 0
+JOIN = 1
+
+# An accepted member says more about a project's pull than a request
+JOIN_WEIGHT = 3
+
+
+def score(counts):
+    """Trending score of `[requests, joins]` counts."""
+    return counts[REQUEST] + JOIN_WEIGHT * counts[JOIN]
+
+
+def _add(table, key, counts, sign=1):
+    """Add `[requests, joins]` counts to `table[key]`, dropping empty entries."""
+    entry = table.setdefault(key, [0, 0])
+    entry[REQUEST] += sign * counts[REQUEST]
+    entry[JOIN] += sign * counts[JOIN]
+    if not entry[REQUEST] and not entry[JOIN]:
+        del table[key]
+
+
+class TrendingCounters:
+    """
+    Bucketed sliding-window activity counters of projects.
+
+    Attributes:
+        bucket_seconds (int): Length of a bucket.
+        checkpoint_interval (float): Seconds between checkpoints.
+        top_size (int): Number of projects ranked per window.
+    """
+
+    def __init__(self, bucket_seconds, checkpoint_interval, top_size):
+        self.bucket_seconds = bucket_seconds
+        self.checkpoint_interval = checkpoint_interval
+        self.top_size = top_size
+        self._lock = threading.RLock()
+        self._buckets = None
+        self._unsaved = {}
+        self._checkpointed_at = time.monotonic()
+        self._checkpointing = False
+
+    def _spans(self):
+        """Number of buckets in each window."""
+        return {window: -(-seconds // self.bucket_seconds) for window, seconds in WINDOWS.items()}
+
+    def _bucket_of(self, when=None):
+        """Bucket number of a datetime, or of now."""
+        timestamp = when.timestamp() if when is not None else time.time()
+        return int(timestamp // self.bucket_seconds)
+
+    def _bucket_start(self, bucket):
+        return datetime.fromtimestamp(bucket * self.bucket_seconds, tz=timezone.utc)
+
+    def reset(self):
+        """Drop the counters, including events not checkpointed yet."""
+        with self._lock:
+            self._buckets = None
+            self._unsaved = {}
+            self._checkpointed_at = time.monotonic()
+
+    def record(self, kind, project_ids, when=None):
+        """
+        Count join requests (`REQUEST`) or accepted members (`JOIN`).
+
+        Parameters:
+            kind (int): `REQUEST` or `JOIN`.
+            project_ids (Iterable[int]): One project id per event.
+            when (datetime, optional): When the events happened (now).
+        """
+        bucket = self._bucket_of(when)
+        counts = [0, 0]
+        counts[kind] = 1
+
+        with self._lock:
+            for project_id in project_ids:
+                _add(self._unsaved, (bucket, project_id), counts)
+                if self._buckets is not None:
+                    self._count(bucket, project_id, counts)
+
+        self._maybe_checkpoint()
+
+    def _count(self, bucket, project_id, counts):
+        """Add counts to a loaded bucket and the windows it is part of."""
+        self._advance(self._bucket_of())
+        age = self._current - bucket
+        if age < 0 or age >= max(self._spans().values()):
+            return
+
+        _add(self._buckets.setdefault(bucket, {}), project_id, counts)
+        for window, span in self._spans().items():
+            if age < span:
+                _add(self._totals[window], project_id, counts)
+                self._top[window] = None
+
+    def _advance(self, now):
+        """Slide every window forward to end at bucket `now`."""
+        if now <= self._current:
+            return
+
+        spans = self._spans()
+        if now - self._current >= max(spans.values()):
+            self._current = now
+            self._retotal()
+            return
+
+        while self._current < now:
+            self._current += 1
+            for window, span in spans.items():
+                expired = self._buckets.get(self._current - span, {})
+                for project_id, counts in expired.items():
+                    _add(self._totals[window], project_id, counts, sign=-1)
+                if expired:
+                    self._top[window] = None
+            self._buckets.pop(self._current - max(spans.values()), None)
+
+    def _retotal(self):
+        """Recompute the window totals from the buckets."""
+        oldest = self._current - max(self._spans().values())
+        for bucket in [bucket for bucket in self._buckets if bucket <= oldest]:
+            del self._buckets[bucket]
+
+        self._totals = {window: {} for window in WINDOWS}
+        self._top = dict.fromkeys(WINDOWS)
+        for bucket, projects in self._buckets.items():
+            for window, span in self._spans().items():
+                if self._current - bucket < span:
+                    for project_id, counts in projects.items():
+                        _add(self._totals[window], project_id, counts)
+
+    def _read_rollups(self):
+        """
+        Read the checkpointed buckets of the longest window.
+
+        Returns:
+            dict[int, dict[int, list[int]]]: Counts per bucket and project.
+        """
+        oldest = self._bucket_of() - max(self._spans().values()) + 1
+        rows = TrendingRollup.objects.filter(bucket_start__gte=self._bucket_start(oldest)).values_list(
+            "bucket_start", "project_id", "requests", "joins"
+        )
+
+        buckets = {}
+        for bucket_start, project_id, requests, joins in rows.iterator(chunk_size=10_000):
+            _add(buckets.setdefault(self._bucket_of(bucket_start), {}), project_id, [requests, joins])
+        return buckets
+
+    def _install(self, buckets):
+        """Swap in buckets read from the rollups plus the unsaved events."""
+        for (bucket, project_id), counts in self._unsaved.items():
+            _add(buckets.setdefault(bucket, {}), project_id, counts)
+        self._buckets = buckets
+        self._current = self._bucket_of()
+        self._retotal()
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._buckets is None:
+                self._install(self._read_rollups())
+
+    def _maybe_checkpoint(self):
+        """Start a background checkpoint when the last one is old enough."""
+        if connection.in_atomic_block:
+            # Wait for a call outside any transaction (e.g. the next commit
+            # callback), so the checkpoint never competes with an open one
+            return
+
+        with self._lock:
+            if self._checkpointing or time.monotonic() - self._checkpointed_at < self.checkpoint_interval:
+                return
+            self._checkpointing = True
+
+        threading.Thread(target=self._checkpoint_and_reload, name="trending-checkpoint", daemon=True).start()
+
+    def _checkpoint_and_reload(self):
+        try:
+            close_old_connections()
+            self.checkpoint()
+            buckets = self._read_rollups()
+            with self._lock:
+                if self._buckets is not None:
+                    self._install(buckets)
+        finally:
+            with self._lock:
+                self._checkpointing = False
+            close_old_connections()
+
+    def checkpoint(self, batch_size=500):
+        """
+        Add the events recorded since the last checkpoint to the rollup
+        table and delete rollups older than the longest window.
+
+        Returns:
+            int: Number of (project, bucket) rows written.
+        """
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {}
+            self._checkpointed_at = time.monotonic()
+
+        try:
+            # Events of projects deleted since must not violate the foreign key
+            existing = set(
+                ProjectLead.objects.filter(id__in={project_id for _, project_id in unsaved}).values_list("id", flat=True)
+            )
+            rows = [
+                {
+                    "project": project_id,
+                    "bucket_start": self._bucket_start(bucket),
+                    "requests": counts[REQUEST],
+                    "joins": counts[JOIN],
+                }
+                for (bucket, project_id), counts in unsaved.items()
+                if project_id in existing
+            ]
+
+            with transaction.atomic():
+                for start in range(0, len(rows), batch_size):
+                    TrendingRollup.objects.add(("project", "bucket_start"), rows[start:start + batch_size])
+
+                oldest = self._bucket_of() - max(self._spans().values()) + 1
+                TrendingRollup.objects.filter(bucket_start__lt=self._bucket_start(oldest)).delete()
+        except Exception:
+            with self._lock:
+                for key, counts in unsaved.items():
+                    _add(self._unsaved, key, counts)
+            raise
+
+        return len(rows)
+
+    def top(self, window):
+        """
+        Return the ranking of a window.
+
+        Parameters:
+            window (str): One of `WINDOWS`.
+
+        Returns:
+            list[tuple[int, int, int, int]]: `(project_id, requests, joins,
+            score)`, best first, at most `top_size` entries.
+        """
+        self._ensure_loaded()
+        self._maybe_checkpoint()
+
+        with self._lock:
+            self._advance(self._bucket_of())
+            if self._top[window] is None:
+                best = heapq.nlargest(
+                    self.top_size,
+                    self._totals[window].items(),
+                    key=lambda item: (score(item[1]), -item[0]),
+                )
+                self._top[window] = [
+                    (project_id, counts[REQUEST], counts[JOIN], score(counts)) for project_id, counts in best
+                ]
+            return self._top[window]
+
+
+trending = TrendingCounters(
+    bucket_seconds=getattr(settings, "TRENDING_BUCKET_SECONDS", 300),
+    checkpoint_interval=getattr(settings, "TRENDING_CHECKPOINT_SECONDS", 60),
+    top_size=getattr(settings, "TRENDING_TOP_SIZE", 500),
+)
+
+
+def record_on_commit(kind, project_ids):
+    """Count events once the current transaction commits."""
+    project_ids = list(project_ids)
+    if project_ids:
+        transaction.on_commit(lambda: trending.record(kind, project_ids))
+
+
+def trending_projects(window, candidates, limit=20, batch_size=100):
+    """
+    Return the top trending projects of a window among `candidates`.
+
+    Parameters:
+        window (str): One of `WINDOWS`.
+        candidates (QuerySet): Projects that may be listed, e.g. the
+                               projects the user can discover.
+        limit (int): Maximum number of results.
+        batch_size (int): Ranked ids checked against `candidates` per query.
+
+    Returns:
+        list[ProjectLead]: Best first, each annotated with `requests`,
+        `joins` and `score`.
+    """
+    ranking = trending.top(window)
+
+    results = []
+    for start in range(0, len(ranking), batch_size):
+        batch = ranking[start:start + batch_size]
+        allowed = {p.pk: p for p in candidates.filter(id__in=[entry[0] for entry in batch]).select_related("owner")}
+        for project_id, requests, joins, total in batch:
+            project = allowed.get(project_id)
+            if project is not None:
+                project.requests, project.joins, project.score = requests, joins, total
+                results.append(project)
+                if len(results) == limit:
+                    return results
+
+    return results
@@ -0,0 +1,215 @@
+"""
+versioning.py
+
+This module implements per-user and per-project data version counters and
+the conditional GET support built on top of them. Writes to projects, join
+requests and memberships bump the counters of every scope they affect; list
+views combine the counters of the scopes they read into a strong ETag and
+answer a matching `If-None-Match` with 304 Not Modified before touching the
+list query or the serializer.
+
+Validating an ETag costs a single primary-key lookup on `DataVersion`, or no
+query at all when `DATA_VERSION_CACHE_ALIAS` points at a shared cache (two
+lookups when the cache misses: the counters are read again after filling
+it, so a bump committed meanwhile is not masked by the older value).
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import DataVersion
+
+PROJECTS_KEY = "projects"
+CACHE_PREFIX = "dataversion:"
+
+
+def user_key(email):
+    """Return the version scope for everything owned or requested by a user."""
+    return f"user:{email}"
+
+
+def project_key(owner_email, projectname):
+    """Return the version scope for a single project's requests and members."""
+    return f"project:{owner_email}/{projectname}"
+
+
+def _cache():
+    """
+    Return the cache used for version lookups, or None if caching is disabled.
+
+    The cache must be shared between all server processes (Redis, Memcached,
+    database cache...) because invalidation only reaches the cache it runs on.
+    """
+    alias = getattr(settings, "DATA_VERSION_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def bump_versions(keys):
+    """
+    Increment the version counter of every given scope.
+
+    Existing counters are bumped with a single UPDATE; counters seen for the
+    first time are created individually so a concurrent creation is never
+    lost.
+
+    Parameters:
+        keys (Iterable[str]): Scope identifiers to bump.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+
+    existing = set(DataVersion.objects.filter(key__in=keys).values_list("key", flat=True))
+    if existing:
+        DataVersion.objects.filter(key__in=existing).update(version=F("version") + 1)
+
+    for key in keys - existing:
+        try:
+            with transaction.atomic():
+                DataVersion.objects.create(key=key, version=1)
+        except IntegrityError:
+            DataVersion.objects.filter(key=key).update(version=F("version") + 1)
+
+    cache = _cache()
+    if cache is not None:
+        transaction.on_commit(
+            lambda: cache.delete_many([CACHE_PREFIX + key for key in keys])
+        )
+
+
+def get_versions(keys):
+    """
+    Fetch the current version of every given scope.
+
+    Parameters:
+        keys (list[str]): Scope identifiers.
+
+    Returns:
+        dict[str, int]: Version per scope, 0 for scopes never written.
+    """
+    versions = {}
+    cache = _cache()
+
+    if cache is not None:
+        cached = cache.get_many([CACHE_PREFIX + key for key in keys])
+        versions = {key[len(CACHE_PREFIX):]: value for key, value in cached.items()}
+
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        found = dict(
+            DataVersion.objects.filter(key__in=missing).values_list("key", "version")
+        )
+        fetched = {key: found.get(key, 0) for key in missing}
+        versions.update(fetched)
+
+        if cache is not None:
+            cache.set_many(
+                {CACHE_PREFIX + key: value for key, value in fetched.items()},
+                timeout=getattr(settings, "DATA_VERSION_CACHE_TIMEOUT", 300),
+            )
+            # A bump committed between the read and the fill has already
+            # cleared the cache and would be hidden by the old values: read
+            # again and drop the entries that moved on
+            found = dict(
+                DataVersion.objects.filter(key__in=missing).values_list("key", "version")
+            )
+            moved = {key: found.get(key, 0) for key in missing if found.get(key, 0) != fetched[key]}
+            if moved:
+                cache.delete_many([CACHE_PREFIX + key for key in moved])
+                versions.update(moved)
+
+    return versions
+
+
+def compute_etag(request, basename, versions):
+    """
+    Build a strong ETag for a list response.
+
+    The tag covers the endpoint, its query parameters, the negotiated media
+    type and the versions of every scope the list depends on.
+
+    Returns:
+        str: Quoted ETag value.
+    """
+    params = sorted(request.query_params.lists())
+    parts = [basename, repr(params), request.accepted_media_type or ""]
+    parts += [f"{key}={versions[key]}" for key in sorted(versions)]
+
+    digest = hashlib.sha1("|".join(parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+class ConditionalListMixin:
+    """
+    Adds ETag / If-None-Match handling to a viewset's `list` action.
+
+    Views declare which version scopes their list depends on by overriding
+    `get_version_keys()`. When it returns no keys (for example because a
+    required query parameter is missing) the list is served normally and
+    without an ETag.
+
+    Attributes:
+        data_versions (dict[str, int] | None):
+            Versions read for the current request, available to the response
+            builder so it does not have to read them again.
+    """
+
+    data_versions = None
+
+    def get_version_keys(self):
+        """
+        Return the version scopes the current list request depends on.
+
+        Returns:
+            list[str]: Scope identifiers, or an empty list to disable ETags.
+        """
+        return []
+
+    def list(self, request, *args, **kwargs):
+        """
+        Serve the list, or 304 Not Modified if the client's ETag is current.
+        """
+        return self.conditional_response(
+            request, lambda: super(ConditionalListMixin, self).list(request, *args, **kwargs)
+        )
+
+    def conditional_response(self, request, build_response):
+        """
+        Answer with 304 Not Modified when `If-None-Match` carries the current
+        ETag, otherwise build the response and tag it.
+
+        Parameters:
+            request (Request): Incoming GET request.
+            build_response (Callable[[], Response]): Produces the full response.
+
+        Returns:
+            Response: 304 without a body, or the built response with an ETag.
+        """
+        keys = self.get_version_keys()
+        if not keys:
+            self.data_versions = None
+            return build_response()
+
+        self.data_versions = get_versions(keys)
+        etag = compute_etag(request, self.basename, self.data_versions)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept, Authorization"}
+
+        client_etags = [
+            tag.removeprefix("W/") for tag in parse_etags(request.headers.get("If-None-Match", ""))
+        ]
+        if etag in client_etags or "*" in client_etags:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response = build_response()
+        if response.status_code == status.HTTP_200_OK:
+            for name, value in headers.items():
+                response[name] = value
+
+        return response
@@ -6,41 +6,107 @@ filtering, join request submission, approval, and rejection workflows.
 Author: Pranav Singh
 """
 
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.views import APIView
+from accounts.skills import flags_mask, mask_for
 from .serializers import (
     ProjectLeadCreateSerializer,
     ProjectLeadSerializer,
     ProjectDisplaySerializer,
+    SimilarProjectSerializer,
+    TrendingProjectSerializer,
+    CandidateSerializer,
+    ProjectInviteSerializer,
     ProjectRequestCreateSerializer,
+    ProjectRequestBulkSerializer,
     ProjectRequestSerializer,
     ProjectMemberCreateSerializer,
     ProjectRejectedCreateSerializer,
     JoinedProjectsSerializer,
     ProjectMembersDescription,
-    PendingProjectRequests
+    PendingProjectRequests,
+    SyncProjectSerializer,
+    SyncRequestSerializer,
+    SyncMemberSerializer,
+    WebhookSubscriptionSerializer,
+)
+from .models import (
+    HAS_OPEN_SEATS, ProjectLead, ProjectRequest, ProjectMembers, ProjectRequestRejected, Tombstone, WebhookSubscription,
 )
-from .models import ProjectLead, ProjectRequest, ProjectMembers, ProjectRequestRejected
+from .bulk_io import (
+    CONTENT_TYPES,
+    FORMATS,
+    BulkImportError,
+    committed_rows,
+    import_projects,
+    iter_export,
+    iter_roster,
+    read_rows,
+)
+from .analytics import summarize
+from .archival import archive_project
+from .caching import CachedListMixin
+from .candidates import suggest_candidates
+from .collabgraph import collaboration_graph
+from .idempotency import idempotent
+from .lookups import get_user, get_project
+from .similarity import similar_projects
+from .trending import WINDOWS, trending_projects
+from .versioning import PROJECTS_KEY, project_key, user_key
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework import status
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 
-class ProjectLeadView(viewsets.ModelViewSet):
+class FileContentNegotiation(BaseContentNegotiation):
+    """
+    Content negotiation for file transfer actions, which stream their own
+    body and must not be rejected for Accept/Content-Type values (text/csv,
+    application/x-ndjson) that no DRF renderer or parser handles.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
+
+
+class ProjectLeadView(CachedListMixin, viewsets.ModelViewSet):
     """
     Handles CRUD operations for projects created by users (team leads).
 
     Endpoints:
         - POST /api/projectleads/ → create a new project.
+        - DELETE /api/projectleads/<id>/ → archive a project; its rows are
+          purged later in the background.
         - GET /api/projectleads/?email=<email> → list projects owned by a user.
+        - POST /api/projectleads/import/ → bulk-import projects (CSV/NDJSON).
+        - GET /api/projectleads/export/ → stream own projects (CSV/NDJSON).
+        - GET /api/projectleads/<id>/roster/ → stream a project's requests,
+          members and rejections (CSV/NDJSON).
+        - GET /api/projectleads/<id>/candidates/ → users ranked by skill fit.
+        - POST /api/projectleads/<id>/invite/ → invite several users at once.
+        - GET/POST /api/projectleads/<id>/webhooks/ → list or add webhook
+          subscriptions; DELETE .../webhooks/<webhook_id>/ removes one.
     """
 
     serializer_class = ProjectLeadCreateSerializer
     queryset = ProjectLead.objects.all()
     permission_classes = [IsAuthenticated]
+    lookup_value_regex = r"\d+"
 
     def create(self, request, *args, **kwargs):
         """
@@ -63,6 +129,20 @@ class ProjectLeadView(viewsets.ModelViewSet):
 
         return Response(project.data, status=status.HTTP_201_CREATED)
 
+    def perform_destroy(self, instance):
+        """
+        Archive the project instead of deleting it with all its rows in one
+        transaction; a queued task purges it in batches.
+        """
+        archive_project(instance)
+
+    def get_version_keys(self):
+        """
+        Version scopes for the list: the owner's projects.
+        """
+        email = self.request.query_params.get("email")
+        return [user_key(email)] if email else []
+
     def get_queryset(self):
         """
         Filter projects created by a specific user using their email.
@@ -78,30 +158,287 @@ class ProjectLeadView(viewsets.ModelViewSet):
 
         if email:
             try:
-                user = User.objects.get(email=email)
+                user = get_user(email)
                 queryset = queryset.filter(owner=user)
             except User.DoesNotExist:
                 pass
 
         return queryset
 
+    @action(
+        detail=False, methods=["post"], url_path="import",
+        content_negotiation_class=FileContentNegotiation,
+    )
+    def import_file(self, request):
+        """
+        Import projects for the authenticated user from a CSV or NDJSON body.
+
+        endpoint:
+            POST /api/projectleads/import/
+            Content-Type: text/csv | application/x-ndjson
+
+        The body is read as a stream and inserted in chunks, so large files
+        use constant memory. Any owner_email column is ignored: every row is
+        created for the authenticated user.
+
+        Returns:
+            Response: Counts of created and skipped (duplicate) projects;
+                      400 Bad Request for malformed input found before
+                      anything was imported, or 207 Multi-Status when it
+                      was found after the chunks before it were committed,
+                      with their counts and `committed_rows`, the number of
+                      leading rows imported.
+        """
+        content_type = request.content_type.split(";")[0].strip()
+        fmt = "ndjson" if content_type == CONTENT_TYPES["ndjson"] else "csv"
+        lines = (line.decode("utf-8") for line in request._request)
+
+        try:
+            totals = import_projects(read_rows(lines, fmt), owner=request.user)
+        except BulkImportError as e:
+            committed = committed_rows(e.totals)
+            if not committed:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(
+                {
+                    "error": str(e),
+                    "created": e.totals["created"],
+                    "skipped": e.totals["skipped"],
+                    "committed_rows": committed,
+                },
+                status=status.HTTP_207_MULTI_STATUS,
+            )
+
+        return Response(
+            {"created": totals["created"], "skipped": totals["skipped"]},
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["get"], content_negotiation_class=FileContentNegotiation)
+    def export(self, request):
+        """
+        Stream the authenticated user's projects as CSV or NDJSON.
+
+        endpoint:
+            GET /api/projectleads/export/?filetype=<csv|ndjson>
+
+        Returns:
+            StreamingHttpResponse: The file, streamed from a server-side cursor.
+        """
+        fmt = request.query_params.get("filetype", "csv")
+        if fmt not in FORMATS:
+            return Response(
+                {"error": f"filetype must be one of {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return self._stream_file(iter_export(fmt, owner=request.user), fmt, "projects")
+
+    @action(detail=True, methods=["get"], content_negotiation_class=FileContentNegotiation)
+    def roster(self, request, pk=None):
+        """
+        Stream the join requests, members and rejections of an owned project.
+
+        endpoint:
+            GET /api/projectleads/<id>/roster/?filetype=<csv|ndjson>
+
+        Returns:
+            StreamingHttpResponse: One row per person with a `status` column
+                                   (requested, member or rejected), or
+                                   404 Not Found if the project is not the
+                                   authenticated user's.
+        """
+        fmt = request.query_params.get("filetype", "csv")
+        if fmt not in FORMATS:
+            return Response(
+                {"error": f"filetype must be one of {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        project = self._owned_project(pk)
+        if project is None:
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return self._stream_file(iter_roster(fmt, project), fmt, f"roster-{project.pk}")
+
+    @action(detail=True, methods=["get"])
+    def candidates(self, request, pk=None):
+        """
+        Suggest users for an owned project, ranked by skill fit.
+
+        endpoint:
+            GET /api/projectleads/<id>/candidates/?offset=<n>&limit=<n>
+
+        Members, pending requesters, rejected and already invited users are
+        left out.
+
+        Returns:
+            Response: `count` of candidates and the page of `results`
+                      (best first, each with a `score`), or 404 Not Found if
+                      the project is not the authenticated user's.
+        """
+        project = self._owned_project(pk)
+        if project is None:
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            offset = max(int(request.query_params.get("offset", 0)), 0)
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), settings.CANDIDATE_PAGE_MAX_SIZE)
+        except ValueError:
+            return Response({"error": "offset and limit must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        total, users = suggest_candidates(project, offset, limit)
+
+        return Response(
+            {"count": total, "results": CandidateSerializer(users, many=True).data},
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=["post"])
+    def invite(self, request, pk=None):
+        """
+        Invite several users to an owned project.
+
+        endpoint:
+            POST /api/projectleads/<id>/invite/
+
+        Request body:
+            {"emails": ["a@b.com", ...], "message": "..."}
+
+        Returns:
+            Response: `{"results": [{"email", "status"}, ...]}` in input order,
+                      400 Bad Request for an invalid body, or 404 Not Found if
+                      the project is not the authenticated user's.
+        """
+        project = self._owned_project(pk)
+        if project is None:
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = ProjectInviteSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        outcomes = serializer.create({**serializer.validated_data, "project": project})
+
+        return Response({"results": outcomes}, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["get", "post"])
+    def webhooks(self, request, pk=None):
+        """
+        List or add webhook subscriptions of an owned project.
+
+        endpoints:
+            GET /api/projectleads/<id>/webhooks/
+            POST /api/projectleads/<id>/webhooks/
+
+        Request body (POST):
+            {"url": "https://...", "events": ["request.submitted", ...]}
+
+        Returns:
+            Response: The subscriptions, or the new one (201) with the
+                      secret its deliveries are signed with; 400 Bad Request
+                      for an invalid body, or 404 Not Found if the project is
+                      not the authenticated user's.
+        """
+        project = self._owned_project(pk)
+        if project is None:
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        if request.method == "GET":
+            subscriptions = project.webhooks.order_by("id")
+            return Response(WebhookSubscriptionSerializer(subscriptions, many=True).data, status=status.HTTP_200_OK)
+
+        serializer = WebhookSubscriptionSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        subscription = serializer.create({**serializer.validated_data, "project": project})
+
+        return Response(WebhookSubscriptionSerializer(subscription).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["delete"], url_path=r"webhooks/(?P<webhook_id>\d+)")
+    def delete_webhook(self, request, pk=None, webhook_id=None):
+        """
+        Remove a webhook subscription, with its pending deliveries.
+
+        endpoint:
+            DELETE /api/projectleads/<id>/webhooks/<webhook_id>/
+        """
+        deleted, _ = WebhookSubscription.objects.filter(
+            pk=webhook_id, project_id=pk, project__owner=request.user
+        ).delete()
+        if not deleted:
+            return Response({"error": "Webhook not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def _owned_project(self, pk):
+        """Return the authenticated user's project with this id, or None."""
+        return ProjectLead.objects.filter(pk=pk, owner=self.request.user).first()
+
+    def _stream_file(self, lines, fmt, name):
+        """Wrap encoded lines in a streaming file download."""
+        response = StreamingHttpResponse(lines, content_type=CONTENT_TYPES[fmt])
+        response["Content-Disposition"] = f'attachment; filename="{name}.{fmt}"'
+        return response
+
 
-class ProjectsDisplayView(viewsets.ModelViewSet):
+def discoverable_projects(user):
+    """
+    Projects a user can still join: not their own, not already requested or
+    joined, and not full.
+
+    Parameters:
+        user (Users): The user browsing projects.
+
+    Returns:
+        QuerySet of ProjectLead
+    """
+    queryset = ProjectLead.objects.filter(HAS_OPEN_SEATS).exclude(owner=user)
+
+    projectsrequest = ProjectRequest.objects.all()
+    projectsrequest = projectsrequest.filter(member=user).values_list("project",flat=True)
+
+    projectsjoined = ProjectMembers.objects.all()
+    projectsjoined = projectsjoined.filter(member=user).values_list("project",flat=True)
+
+    queryset = queryset.exclude(id__in = projectsrequest)
+    queryset = queryset.exclude(id__in = projectsjoined)
+
+    return queryset
+
+
+class ProjectsDisplayView(CachedListMixin, viewsets.ModelViewSet):
     """
     Displays projects available to other users (not owned by them).
 
     Endpoints:
         GET /api/projects/?email=<email>&?frontend=<true/false>&?backend=<true/false>
+        GET /api/projects/<id>/similar/?limit=<n>
+        GET /api/projects/trending/?window=<1h|24h|7d>&limit=<n>
 
     Supports filtering by:
         - Frontend requirement
         - Backend requirement
+        - Any of a set of skills, or of the user's own skills (bitwise
+          match on the skills mask)
+
+    Projects that have reached `max_members` are not listed.
     """
 
     serializer_class = ProjectDisplaySerializer
     queryset = ProjectLead.objects.all()
     permission_classes = [IsAuthenticated]
 
+    def get_version_keys(self):
+        """
+        Version scopes for the list: all projects plus the user's own
+        requests and memberships, which are excluded from the results.
+        """
+        email = self.request.query_params.get("email")
+        return [user_key(email), PROJECTS_KEY] if email else []
+
     def get_queryset(self):
         """
         Filter projects based on user email and technology requirements.
@@ -110,58 +447,131 @@ class ProjectsDisplayView(viewsets.ModelViewSet):
             email (str): Exclude projects owned by this user.
             frontend (str: "true"/"false"): Filter frontend-required.
             backend (str: "true"/"false"): Filter backend-required.
+            skills (str): Comma-separated skill names; keep projects that
+                          need any of them.
+            match (str: "true"/"false"): Keep projects that need any of
+                                         the user's own skills.
 
         Returns:
             QuerySet of ProjectLead
         """
-        queryset = ProjectLead.objects.all()
+        queryset = ProjectLead.objects.filter(HAS_OPEN_SEATS)
         email = self.request.query_params.get("email")
         frontend = self.request.query_params.get("frontend")
         backend = self.request.query_params.get("backend")
+        skills = self.request.query_params.get("skills")
 
         if email:
             try:
-                user = User.objects.get(email=email)
-                queryset = queryset.exclude(owner=user)
+                user = get_user(email)
+                queryset = discoverable_projects(user)
             except User.DoesNotExist:
-                pass
-
-            if frontend == "true" and backend == "true":
-                pass
-            elif frontend == "true":
-                queryset = queryset.filter(frontend=True)
-            elif backend == "true":
-                queryset = queryset.filter(backend=True)
-        
-            projectsrequest = ProjectRequest.objects.all()
-            projectsrequest = projectsrequest.filter(member=user).values_list("project",flat=True)
-
-            projectsjoined = ProjectMembers.objects.all()
-            projectsjoined = projectsjoined.filter(member=user).values_list("project",flat=True)
-
-            # projectsreject = ProjectRequestRejected.objects.all()
-            # projectsreject = projectsreject.filter(user=user).values_list("project",flat=True)
-
-            queryset = queryset.exclude(id__in = projectsrequest)
-            queryset = queryset.exclude(id__in = projectsjoined)
-            # queryset = queryset.exclude(id__in = projectsreject)
+                user = None
+
+            wanted = 0
+            if skills:
+                try:
+                    wanted = mask_for(name.strip() for name in skills.split(","))
+                except KeyError as e:
+                    raise ValidationError({"skills": f"Unknown skill {e}"})
+
+            # Both legacy flags together mean "any project"
+            if not (frontend == "true" and backend == "true"):
+                wanted |= flags_mask(frontend == "true", backend == "true")
+
+            if self.request.query_params.get("match") == "true":
+                if user is None:
+                    # No skills to match against
+                    return ProjectLead.objects.none()
+                wanted |= user.skills
+
+            if wanted:
+                queryset = queryset.alias(skill_match=F("skills").bitand(wanted)).filter(skill_match__gt=0)
         else:
             queryset = ProjectLead.objects.none()
 
         return queryset
 
+    @action(detail=True, methods=["get"])
+    def similar(self, request, pk=None):
+        """
+        Suggest projects similar to a project, by the words in their names
+        and descriptions.
+
+        endpoint:
+            GET /api/projects/<id>/similar/?limit=<n>
+
+        Only projects the authenticated user could still join are suggested,
+        as in the project list.
+
+        Returns:
+            Response: Up to `limit` projects (default 10), most similar first,
+                      each with a `similarity`; 400 Bad Request if limit is
+                      not an integer, or 404 Not Found for an unknown project.
+        """
+        project = ProjectLead.objects.filter(pk=pk).first()
+        if project is None:
+            return Response({"error": "Project not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), settings.SIMILAR_PROJECTS_PAGE_MAX_SIZE)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        projects = similar_projects(project, discoverable_projects(request.user), limit)
+
+        return Response(SimilarProjectSerializer(projects, many=True).data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"])
+    def trending(self, request):
+        """
+        List the projects with the most join requests and accepted members
+        over a recent window.
+
+        endpoint:
+            GET /api/projects/trending/?window=<1h|24h|7d>&limit=<n>
+
+        Only projects the authenticated user could still join are listed,
+        as in the project list.
+
+        Returns:
+            Response: Up to `limit` projects (default 20), best first, each
+                      with its `requests`, `joins` and `score` in the window
+                      (default 24h); 400 Bad Request for an unknown window or
+                      a limit that is not an integer.
+        """
+        window = request.query_params.get("window", "24h")
+        if window not in WINDOWS:
+            return Response(
+                {"error": f"window must be one of {', '.join(WINDOWS)}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), settings.TRENDING_PAGE_MAX_SIZE)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        projects = trending_projects(window, discoverable_projects(request.user), limit)
+
+        return Response(TrendingProjectSerializer(projects, many=True).data, status=status.HTTP_200_OK)
+
 class ProjectRequestView(viewsets.ModelViewSet):
     """
     Handles join request creation submitted by users.
 
     endpoint:
         POST /api/projectrequests/
+        POST /api/projectrequests/bulk/
+
+    Retried submissions are safe: send an `Idempotency-Key` header to replay
+    the original response, and duplicates return the existing request.
     """
 
     serializer_class = ProjectRequestCreateSerializer
     queryset = ProjectRequest.objects.all()
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         """
         Submit a join request for a project.
@@ -170,7 +580,8 @@ class ProjectRequestView(viewsets.ModelViewSet):
             request (Request): User request containing join request details.
 
         Returns:
-            Response: Created join request or validation errors.
+            Response: Created join request (201), the existing request on a
+                      retried submission (200), or validation errors.
         """
         data = request.data
         serializer = ProjectRequestCreateSerializer(data=data)
@@ -179,11 +590,38 @@ class ProjectRequestView(viewsets.ModelViewSet):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         new_request = serializer.create(serializer.validated_data)
+        response_status = status.HTTP_201_CREATED if serializer.created else status.HTTP_200_OK
         new_request = ProjectRequestCreateSerializer(new_request)
 
-        return Response(new_request.data, status=status.HTTP_201_CREATED)
+        return Response(new_request.data, status=response_status)
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Submit join requests to several projects at once.
+
+        endpoint:
+            POST /api/projectrequests/bulk/
+
+        Parameters:
+            request (Request): Contains `requests`, a list of
+                               `{"project": id, "message": str}` entries.
+                               The authenticated user is the requester.
+
+        Returns:
+            Response: 200 OK with per-entry outcomes in input order, or
+                      400 Bad Request with validation errors.
+        """
+        serializer = ProjectRequestBulkSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        outcomes = serializer.create({**serializer.validated_data, "member": request.user})
+
+        return Response({"results": outcomes}, status=status.HTTP_200_OK)
     
-class ProjectRequestDisplayView(viewsets.ModelViewSet):
+class ProjectRequestDisplayView(CachedListMixin, viewsets.ModelViewSet):
     """
     Displays all join requests for a given project owned by a team lead.
 
@@ -195,6 +633,14 @@ class ProjectRequestDisplayView(viewsets.ModelViewSet):
     queryset = ProjectRequest.objects.all()
     permission_classes = [IsAuthenticated]
 
+    def get_version_keys(self):
+        """
+        Version scopes for the list: the requested project.
+        """
+        email = self.request.query_params.get("email")
+        projectname = self.request.query_params.get("projectname")
+        return [project_key(email, projectname)] if email and projectname else []
+
     def get_queryset(self):
         """
         Fetch join requests for a specific project owned by a user.
@@ -212,8 +658,8 @@ class ProjectRequestDisplayView(viewsets.ModelViewSet):
 
         if email and projectname:
             try:
-                user = User.objects.get(email=email)
-                project = ProjectLead.objects.get(owner=user, projectname=projectname)
+                user = get_user(email)
+                project = get_project(user, projectname)
                 queryset = queryset.filter(project=project)
             except (User.DoesNotExist, ProjectLead.DoesNotExist):
                 pass
@@ -227,12 +673,16 @@ class ProjectMembersView(viewsets.ModelViewSet):
 
     endpoint:
         POST /api/projectmembers/
+
+    Retried accepts are safe: send an `Idempotency-Key` header to replay
+    the original response, and duplicates return the existing member.
     """
 
     serializer_class = ProjectMemberCreateSerializer
     queryset = ProjectMembers.objects.all()
     permission_classes = [IsAuthenticated]
     
+    @idempotent
     def create(self, request, *args, **kwargs):
         """
         Add a member to a project after their request is approved.
@@ -241,7 +691,8 @@ class ProjectMembersView(viewsets.ModelViewSet):
             request (Request): Contains owner email, applicant email, and project name.
 
         Returns:
-            Response: Newly created ProjectMember record.
+            Response: Newly created ProjectMember record (201), or the existing
+                      record on a retried accept (200).
         """
         data = request.data
         serializer = ProjectMemberCreateSerializer(data=data)
@@ -250,9 +701,10 @@ class ProjectMembersView(viewsets.ModelViewSet):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         new_member = serializer.create(serializer.validated_data)
+        response_status = status.HTTP_201_CREATED if serializer.created else status.HTTP_200_OK
         new_member = ProjectMemberCreateSerializer(new_member)
 
-        return Response(new_member.data, status=status.HTTP_201_CREATED)
+        return Response(new_member.data, status=response_status)
 
 
 class ProjectRejectedView(viewsets.ModelViewSet):
@@ -261,12 +713,16 @@ class ProjectRejectedView(viewsets.ModelViewSet):
 
     endpoint:
         POST /api/projectreject/
+
+    Retried rejections are safe: send an `Idempotency-Key` header to replay
+    the original response, and duplicates return the existing record.
     """
 
     serializer_class = ProjectRejectedCreateSerializer
     queryset = ProjectRequestRejected.objects.all()
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         """
         Log a rejected project join request.
@@ -275,7 +731,8 @@ class ProjectRejectedView(viewsets.ModelViewSet):
             request (Request): Includes owner email, applicant email, and project name.
 
         Returns:
-            Response: Created rejection record.
+            Response: Created rejection record (201), or the existing record on
+                      a retried reject (200).
         """
         data = request.data
         serializer = ProjectRejectedCreateSerializer(data=data)
@@ -284,11 +741,12 @@ class ProjectRejectedView(viewsets.ModelViewSet):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         rejected_request = serializer.create(serializer.validated_data)
+        response_status = status.HTTP_201_CREATED if serializer.created else status.HTTP_200_OK
         rejected_request = ProjectRejectedCreateSerializer(rejected_request)
 
-        return Response(rejected_request.data, status=status.HTTP_201_CREATED)
+        return Response(rejected_request.data, status=response_status)
 
-class JoinedProjectDisplayView(viewsets.ModelViewSet):
+class JoinedProjectDisplayView(CachedListMixin, viewsets.ModelViewSet):
     """
     Displays all projects joined by a specific user.
 
@@ -300,6 +758,14 @@ class JoinedProjectDisplayView(viewsets.ModelViewSet):
     queryset = ProjectMembers.objects.all()
     permission_classes = [IsAuthenticated]
 
+    def get_version_keys(self):
+        """
+        Version scopes for the list: the user's memberships and the project
+        details shown alongside them.
+        """
+        email = self.request.query_params.get("email")
+        return [user_key(email), PROJECTS_KEY] if email else []
+
     def get_queryset(self):
         """
         Filter joined projects based on email.
@@ -315,15 +781,15 @@ class JoinedProjectDisplayView(viewsets.ModelViewSet):
 
         if email:
             try:
-                user = User.objects.get(email=email)
-                queryset = queryset.filter(member=user)
+                user = get_user(email)
+                queryset = queryset.filter(member=user, project__archived_at__isnull=True)
             except:
                 pass
 
         return queryset
 
 
-class ProjectMembersDisplayView(viewsets.ModelViewSet):
+class ProjectMembersDisplayView(CachedListMixin, viewsets.ModelViewSet):
     """
     Returns all members of a specific project for a given owner.
 
@@ -335,6 +801,14 @@ class ProjectMembersDisplayView(viewsets.ModelViewSet):
     queryset = ProjectMembers.objects.all()
     permission_classes = [IsAuthenticated]
 
+    def get_version_keys(self):
+        """
+        Version scopes for the list: the requested project.
+        """
+        email = self.request.query_params.get("email")
+        projectname = self.request.query_params.get("projectname")
+        return [project_key(email, projectname)] if email and projectname else []
+
     def get_queryset(self):
         """
         Get members of a project using owner email and project name.
@@ -352,15 +826,15 @@ class ProjectMembersDisplayView(viewsets.ModelViewSet):
 
         if email and projectname:
             try:
-                user = User.objects.get(email=email)
-                project = ProjectLead.objects.get(owner=user, projectname=projectname)
+                user = get_user(email)
+                project = get_project(user, projectname)
                 queryset = ProjectMembers.objects.filter(project=project)
             except:
                 pass
 
         return queryset
 
-class PendingProjectsView(viewsets.ModelViewSet):
+class PendingProjectsView(CachedListMixin, viewsets.ModelViewSet):
     """
     Displays pending project join requests for a user.
 
@@ -372,6 +846,14 @@ class PendingProjectsView(viewsets.ModelViewSet):
     queryset = ProjectRequest.objects.all()
     permission_classes = [IsAuthenticated]
 
+    def get_version_keys(self):
+        """
+        Version scopes for the list: the user's join requests and the project
+        details shown alongside them.
+        """
+        email = self.request.query_params.get("email")
+        return [user_key(email), PROJECTS_KEY] if email else []
+
     def get_queryset(self):
         """
         Filter pending join requests based on user email.
@@ -387,14 +869,14 @@ class PendingProjectsView(viewsets.ModelViewSet):
 
         if email:
             try:
-                user = User.objects.get(email=email)
-                queryset = ProjectRequest.objects.filter(member=user)
+                user = get_user(email)
+                queryset = ProjectRequest.objects.filter(member=user, project__archived_at__isnull=True)
             except:
                 pass
 
         return queryset
     
-class ProjectCountView(viewsets.ModelViewSet):
+class ProjectCountView(CachedListMixin, viewsets.ModelViewSet):
     """
     Returns a summary count of projects for a user, including:
     - Number of projects created by the user
@@ -407,6 +889,13 @@ class ProjectCountView(viewsets.ModelViewSet):
 
     permission_classes = [IsAuthenticated]
     
+    def get_version_keys(self):
+        """
+        Version scopes for the list: the user's projects, memberships and requests.
+        """
+        email = self.request.query_params.get("email")
+        return [user_key(email)] if email else []
+
     def list(self, request):
         """
         Handle GET request to return project counts for a user.
@@ -421,19 +910,27 @@ class ProjectCountView(viewsets.ModelViewSet):
                 - joinedprojects (int): Total projects the user has joined.
                 - pendingrequests (int): Total pending join requests for the user.
         """
+        return self.conditional_response(
+            request, lambda: self.cached_response(request, lambda: self._counts(request))
+        )
+
+    def _counts(self, request):
+        """
+        Compute the project counts for the user given in the query string.
+        """
         email = self.request.query_params.get("email")
 
         if email:
             try:
-                user = User.objects.get(email=email)
+                user = get_user(email)
             except User.DoesNotExist:
                 return Response(
                     {"error": "User not found"}, status=404
                 )
 
             createdprojects = ProjectLead.objects.filter(owner=user).count()
-            joinedprojects = ProjectMembers.objects.filter(member=user).count()
-            pendingrequests = ProjectRequest.objects.filter(member=user).count()
+            joinedprojects = ProjectMembers.objects.filter(member=user, project__archived_at__isnull=True).count()
+            pendingrequests = ProjectRequest.objects.filter(member=user, project__archived_at__isnull=True).count()
 
             data = {
                 "createdprojects": createdprojects,
@@ -445,4 +942,202 @@ class ProjectCountView(viewsets.ModelViewSet):
         else:
             return Response(
                 {"error": "Email query parameter is required"}, status=400
-            )
\ No newline at end of file
+            )
+
+
+class SyncView(APIView):
+    """
+    Returns what changed for the authenticated user since a cursor.
+
+    Endpoint:
+        GET /api/sync/?since=<cursor>
+
+    The response covers every dashboard tab: projects (all projects, for
+    discovery and the user's own), join requests (sent by the user or
+    received on the user's projects) and memberships (projects the user
+    joined and members of the user's projects). Each section lists upserted
+    rows and the ids of deleted rows. Without `since` a full snapshot is
+    returned. Clients store the returned `cursor` and pass it on the next
+    call.
+
+    Cursors overlap by `SYNC_CURSOR_OVERLAP_SECONDS` so rows committed late
+    by concurrent transactions are not missed; clients merge rows by id, so
+    seeing a change twice is harmless.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Return inserted, updated and deleted rows relevant to the caller.
+
+        Query Params:
+            since (str, optional): Cursor returned by a previous call.
+
+        Returns:
+            Response:
+                - 200 OK with `cursor`, `projects`, `requests` and `members`.
+                - 400 Bad Request if the cursor is malformed.
+        """
+        now = datetime.now(timezone.utc)
+        since = request.query_params.get("since")
+
+        if since:
+            try:
+                since = datetime.fromtimestamp(int(since) / 1_000_000, timezone.utc)
+            except (ValueError, OverflowError, OSError):
+                return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+            since -= timedelta(seconds=getattr(settings, "SYNC_CURSOR_OVERLAP_SECONDS", 5))
+
+        user = request.user
+        changed = Q(updated_at__gt=since) if since else Q()
+        related = (Q(member=user) | Q(project__owner=user)) & Q(project__archived_at__isnull=True)
+
+        projects = ProjectLead.objects.filter(changed).select_related("owner")
+        requests = (
+            ProjectRequest.objects.filter(changed, related)
+            .select_related("project__owner", "member")
+        )
+        members = (
+            ProjectMembers.objects.filter(changed, related)
+            .select_related("project__owner", "member")
+        )
+
+        deleted = {Tombstone.PROJECT: [], Tombstone.REQUEST: [], Tombstone.MEMBER: []}
+        if since:
+            tombstones = Tombstone.objects.filter(
+                Q(user_id=user.pk) | Q(user_id__isnull=True), deleted_at__gt=since
+            ).values_list("kind", "object_id")
+            for kind, object_id in tombstones:
+                deleted[kind].append(object_id)
+
+        data = {
+            "cursor": str(int(now.timestamp() * 1_000_000)),
+            "projects": {
+                "upserted": SyncProjectSerializer(projects, many=True).data,
+                "deleted": deleted[Tombstone.PROJECT],
+            },
+            "requests": {
+                "upserted": SyncRequestSerializer(requests, many=True).data,
+                "deleted": deleted[Tombstone.REQUEST],
+            },
+            "members": {
+                "upserted": SyncMemberSerializer(members, many=True).data,
+                "deleted": deleted[Tombstone.MEMBER],
+            },
+        }
+
+        return Response(data)
+
+
+class CollaboratorsView(APIView):
+    """
+    Returns the people the authenticated user has worked with and friends of
+    those collaborators.
+
+    Endpoint:
+        GET /api/collaborators/?limit=<n>
+
+    Both lists are answered from the in-memory collaboration graph (see
+    `collabgraph.py`); the database is only used to fetch the names of the
+    returned users.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Return collaborators and two-hop suggestions.
+
+        Query Params:
+            limit (int, optional): Maximum entries per list (default 20).
+
+        Returns:
+            Response:
+                - 200 OK with `collaborators` (each with `shared_projects`)
+                  and `suggestions` (each with `mutual` collaborators and a
+                  `score`), best first.
+                - 400 Bad Request if limit is not an integer.
+        """
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), settings.COLLAB_GRAPH_PAGE_MAX_SIZE)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        collaborators = collaboration_graph.collaborators(request.user.pk)[:limit]
+        suggestions = collaboration_graph.suggestions(request.user.pk, limit)
+
+        ids = [user_id for user_id, _ in collaborators] + [user_id for user_id, _, _ in suggestions]
+        users = {
+            user["id"]: user
+            for user in User.objects.filter(id__in=ids, is_active=True).values("id", "email", "firstname", "lastname")
+        }
+
+        def describe(user_id, **extra):
+            user = users[user_id]
+            return {"email": user["email"], "firstname": user["firstname"], "lastname": user["lastname"], **extra}
+
+        return Response({
+            "collaborators": [
+                describe(user_id, shared_projects=shared)
+                for user_id, shared in collaborators if user_id in users
+            ],
+            "suggestions": [
+                describe(user_id, mutual=mutual, score=score)
+                for user_id, score, mutual in suggestions if user_id in users
+            ],
+        })
+
+
+class AnalyticsView(APIView):
+    """
+    Returns platform-wide statistics for staff users.
+
+    Endpoint:
+        GET /api/analytics/?days=<n>
+
+    Statistics are read from the daily rollups only (see `analytics.py`).
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get_owner(self, request):
+        """Owner whose projects are counted, or None for every owner."""
+        return None
+
+    def get(self, request):
+        """
+        Return statistics for the last `days` days.
+
+        Query Params:
+            days (int, optional): Number of days, today included (default 30).
+
+        Returns:
+            Response:
+                - 200 OK with `totals`, one entry per active day in `days`
+                  (projects created, requests, accepted, rejected,
+                  acceptance rate and average hours to a decision) and
+                  requests per `skills` name.
+                - 400 Bad Request if days is not an integer.
+        """
+        try:
+            days = min(max(int(request.query_params.get("days", 30)), 1), settings.ANALYTICS_MAX_DAYS)
+        except ValueError:
+            return Response({"error": "days must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(summarize(days, owner=self.get_owner(request)))
+
+
+class OwnerAnalyticsView(AnalyticsView):
+    """
+    Returns the same statistics as `AnalyticsView`, restricted to the
+    authenticated user's projects.
+
+    Endpoint:
+        GET /api/analytics/mine/?days=<n>
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get_owner(self, request):
+        return request.user
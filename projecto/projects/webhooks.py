@@ -0,0 +1,445 @@
+"""
+webhooks.py
+
+This module delivers project events to the owners' webhook subscriptions
+(`WebhookSubscription`), entirely off the request path.
+
+The outbox relay's `webhooks` consumer (`WebhookConsumer`) turns each batch
+of outbox events into one `WebhookDelivery` row per subscription that wants
+the event, in the relay's transaction. Senders (the `deliver_webhooks`
+command) then claim due deliveries with `SELECT ... FOR UPDATE SKIP LOCKED`,
+pushing their `next_attempt_at` back by a lease covering the whole batch
+(see `lease_seconds()`) so no other sender takes them meanwhile, and POST a
+whole batch concurrently through `HTTPClient`: an asyncio HTTP/1.1 client
+that keeps connections alive and reuses them per origin, with at most
+`WEBHOOK_CONCURRENCY` requests in flight.
+
+Every request carries the event as JSON with these headers:
+
+    X-Webhook-Id         Delivery id, the same on every retry.
+    X-Webhook-Event      Event kind, e.g. "request.submitted".
+    X-Webhook-Timestamp  Unix time the request was signed at.
+    X-Webhook-Signature  "sha256=" and the hex HMAC-SHA256 of
+                         "<timestamp>.<body>" keyed with the secret.
+
+Endpoints must resolve to public addresses only: loopback, private,
+link-local (cloud metadata services) and reserved addresses are rejected
+when a subscription is made and again on every connection, which goes to
+the address that was checked, so a DNS change cannot point a subscription
+inside the network later. `WEBHOOK_ALLOW_PRIVATE_ADDRESSES` lifts this for
+development.
+
+A 2xx response deletes the delivery. Anything else (another status, a
+connection error, a timeout) schedules a retry with exponential backoff
+from `WEBHOOK_RETRY_BASE_SECONDS` up to `WEBHOOK_RETRY_MAX_SECONDS`; after
+`WEBHOOK_MAX_ATTEMPTS` the delivery is dead-lettered (kept as DEAD) until
+`retry_dead()` queues it again. Delivery is at least once.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import math
+import socket
+import ssl
+import time
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import WebhookDelivery, WebhookSubscription
+from .outbox import Consumer, event_data
+from .taskqueue import backoff
+
+
+class WebhookConsumer(Consumer):
+    """
+    Outbox consumer queuing a delivery of each event to every active
+    subscription of its project that wants the event kind.
+    """
+
+    def deliver(self, events):
+        subscriptions = {}
+        for subscription in WebhookSubscription.objects.filter(
+            project_id__in={outbox_event.project_id for outbox_event in events}, is_active=True
+        ).only("id", "project_id", "events"):
+            subscriptions.setdefault(subscription.project_id, []).append(subscription)
+
+        deliveries = [
+            WebhookDelivery(
+                subscription_id=subscription.pk,
+                event_id=outbox_event.pk,
+                kind=outbox_event.kind,
+                payload=event_data(outbox_event),
+            )
+            for outbox_event in events
+            for subscription in subscriptions.get(outbox_event.project_id, ())
+            if not subscription.events or outbox_event.kind in subscription.events
+        ]
+        WebhookDelivery.objects.bulk_create(deliveries, batch_size=1000, ignore_conflicts=True)
+
+
+def sign(secret, timestamp, body):
+    """
+    Signature of a request body.
+
+    Parameters:
+        secret (str): The subscription's secret.
+        timestamp (str): Value of the X-Webhook-Timestamp header.
+        body (bytes): Request body.
+
+    Returns:
+        str: Hex HMAC-SHA256 of "<timestamp>.<body>".
+    """
+    return hmac.new(secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256).hexdigest()
+
+
+def public_addresses(infos):
+    """
+    Addresses of `getaddrinfo()` results, checked to be public.
+
+    Raises:
+        ValueError: If any address is loopback, private, link-local,
+                    multicast or reserved (unless
+                    `WEBHOOK_ALLOW_PRIVATE_ADDRESSES`).
+    """
+    addresses = [info[4][0] for info in infos]
+    if not settings.WEBHOOK_ALLOW_PRIVATE_ADDRESSES:
+        for address in addresses:
+            ip = ipaddress.ip_address(address)
+            if not ip.is_global or ip.is_multicast:
+                raise ValueError(f"{address} is not a public address")
+    return addresses
+
+
+def resolve(host, port):
+    """
+    Resolve a webhook host to its public addresses.
+
+    Raises:
+        OSError: If the host cannot be resolved.
+        ValueError: If it resolves to a non-public address.
+    """
+    return public_addresses(socket.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+
+
+class HTTPClient:
+    """
+    Minimal asyncio HTTP/1.1 client for POSTing webhooks. Connections are
+    kept alive and reused per origin; a semaphore bounds the requests in
+    flight (and with them the open connections).
+
+    Response bodies are not used: at most `max_body` bytes of one are read
+    (to keep its connection), so an endpoint cannot make the sender buffer
+    large responses.
+
+    Attributes:
+        connections_opened (int): Connections opened so far.
+        max_body (int): Longest response body read.
+    """
+
+    max_body = 64 * 1024
+
+    def __init__(self, concurrency, timeout):
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._slots = asyncio.Semaphore(concurrency)
+        self._idle = {}
+
+    async def post(self, url, body, headers):
+        """
+        POST a body and read the response.
+
+        Returns:
+            int: Response status code.
+
+        Raises:
+            OSError, asyncio.TimeoutError, ValueError: When no response
+            arrives in time, or the URL, its address or the response is
+            unusable.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL {url!r}")
+
+        origin = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        head = [
+            f"POST {target} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            f"Content-Length: {len(body)}",
+            *(f"{name}: {value}" for name, value in headers.items()),
+        ]
+        request = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+        async with self._slots:
+            return await asyncio.wait_for(self._send(origin, request), self.timeout)
+
+    async def _send(self, origin, request):
+        while True:
+            connection, reused = await self._connect(origin)
+            try:
+                status, keep_alive = await self._exchange(connection, request)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self._close(connection)
+                if reused:
+                    # The server closed the idle connection: use a new one
+                    continue
+                raise
+            except BaseException:
+                self._close(connection)
+                raise
+
+            if keep_alive:
+                self._idle.setdefault(origin, []).append(connection)
+            else:
+                self._close(connection)
+            return status
+
+    async def _connect(self, origin):
+        """Return an idle connection to the origin, or a new one."""
+        idle = self._idle.get(origin, [])
+        while idle:
+            connection = idle.pop()
+            if not connection[0].at_eof():
+                return connection, True
+            self._close(connection)
+
+        scheme, host, port = origin
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        address = public_addresses(infos)[0]
+        context = ssl.create_default_context() if scheme == "https" else None
+        connection = await asyncio.open_connection(
+            address, port, ssl=context, server_hostname=host if context else None
+        )
+        self.connections_opened += 1
+        return connection, False
+
+    async def _exchange(self, connection, request):
+        """
+        Write a request and read its response.
+
+        Interim (1xx) responses are skipped. The body is read only up to
+        `max_body` bytes; a longer body, or one delimited by the server
+        closing the connection, is not read and the connection is dropped.
+
+        Returns:
+            tuple[int, bool]: Status code and whether the connection can be
+            reused.
+        """
+        reader, writer = connection
+        writer.write(request)
+        await writer.drain()
+
+        version, status, headers = await self._read_head(reader)
+        while 100 <= status < 200:
+            version, status, headers = await self._read_head(reader)
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection") != "close"
+        if headers.get("transfer-encoding") == "chunked":
+            keep_alive = await self._skip_chunks(reader) and keep_alive
+        elif "content-length" in headers:
+            length = int(headers["content-length"])
+            if length > self.max_body:
+                keep_alive = False
+            else:
+                await reader.readexactly(length)
+        elif status not in (204, 304):
+            # The body would end when the server closes the connection
+            keep_alive = False
+
+        return status, keep_alive
+
+    async def _read_head(self, reader):
+        """
+        Read a status line and headers.
+
+        Returns:
+            tuple[str, int, dict[str, str]]: HTTP version, status code and
+            lowercased headers.
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before the response")
+        version, code, *_ = status_line.decode("latin-1").split(" ", 2)
+
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip().lower()
+        return version, int(code), headers
+
+    async def _skip_chunks(self, reader):
+        """
+        Read a chunked body of at most `max_body` bytes.
+
+        Returns:
+            bool: False if the body was too long and was left unread.
+        """
+        total = 0
+        while size := int((await reader.readline()).split(b";")[0], 16):
+            total += size
+            if total > self.max_body:
+                return False
+            await reader.readexactly(size + 2)
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        return True
+
+    def _close(self, connection):
+        connection[1].close()
+
+    async def close(self):
+        """Close the idle connections."""
+        for connections in self._idle.values():
+            for connection in connections:
+                self._close(connection)
+        self._idle.clear()
+
+
+def lease_seconds(batch_size, concurrency):
+    """
+    How long a claimed batch is leased: the longest sending it can take,
+    every request in turn waiting for a slot and then timing out, plus
+    `WEBHOOK_LEASE_SECONDS` to claim and record it.
+    """
+    rounds = math.ceil(batch_size / concurrency)
+    return rounds * settings.WEBHOOK_TIMEOUT_SECONDS + settings.WEBHOOK_LEASE_SECONDS
+
+
+def claim(batch_size, concurrency=None):
+    """
+    Claim due deliveries for this sender.
+
+    Parameters:
+        batch_size (int): Maximum number of deliveries.
+        concurrency (int, optional): Requests they will be sent with at
+                                     once (`WEBHOOK_CONCURRENCY`).
+
+    Returns:
+        list[WebhookDelivery]: Deliveries with their subscription, leased
+        for `lease_seconds()` and counted as attempted.
+    """
+    lease = lease_seconds(batch_size, concurrency or settings.WEBHOOK_CONCURRENCY)
+    now = timezone.now()
+    due = WebhookDelivery.objects.filter(status=WebhookDelivery.PENDING, next_attempt_at__lte=now)
+
+    with transaction.atomic():
+        deliveries = list(
+            due.select_related("subscription")
+            .order_by("next_attempt_at", "id")
+            .select_for_update(skip_locked=True, of=("self",))[:batch_size]
+        )
+        if deliveries:
+            WebhookDelivery.objects.filter(id__in=[delivery.pk for delivery in deliveries]).update(
+                next_attempt_at=now + timedelta(seconds=lease),
+                attempts=F("attempts") + 1,
+            )
+            for delivery in deliveries:
+                delivery.attempts += 1
+
+    return deliveries
+
+
+async def _post(client, delivery):
+    """POST one delivery; return its status code (if any) and error (if failed)."""
+    body = json.dumps(delivery.payload, separators=(",", ":")).encode()
+    timestamp = str(int(time.time()))
+    headers = {
+        "Content-Type": "application/json",
+        "User-Agent": "Projecto-Webhooks/1.0",
+        "X-Webhook-Id": str(delivery.pk),
+        "X-Webhook-Event": delivery.kind,
+        "X-Webhook-Timestamp": timestamp,
+        "X-Webhook-Signature": "sha256=" + sign(delivery.subscription.secret, timestamp, body),
+    }
+
+    try:
+        status = await client.post(delivery.subscription.url, body, headers)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    return status, None if 200 <= status < 300 else f"HTTP {status}"
+
+
+async def _post_all(deliveries, concurrency, timeout):
+    client = HTTPClient(concurrency, timeout)
+    try:
+        return await asyncio.gather(*(_post(client, delivery) for delivery in deliveries))
+    finally:
+        await client.close()
+
+
+def send(deliveries, concurrency=None):
+    """
+    POST claimed deliveries concurrently.
+
+    Returns:
+        list[tuple[int | None, str | None]]: Status code and error of each
+        delivery, in order; the error is None for delivered ones.
+    """
+    concurrency = concurrency or settings.WEBHOOK_CONCURRENCY
+    return asyncio.run(_post_all(deliveries, concurrency, settings.WEBHOOK_TIMEOUT_SECONDS))
+
+
+def record(deliveries, outcomes):
+    """
+    Delete delivered rows and reschedule or dead-letter failed ones.
+
+    Returns:
+        tuple[int, int]: Numbers of deliveries delivered and failed.
+    """
+    delivered = [delivery.pk for delivery, (_, error) in zip(deliveries, outcomes) if error is None]
+    WebhookDelivery.objects.filter(id__in=delivered).delete()
+
+    now = timezone.now()
+    failed = 0
+    for delivery, (response_status, error) in zip(deliveries, outcomes):
+        if error is None:
+            continue
+        failed += 1
+        changes = {"response_status": response_status, "last_error": error}
+        if delivery.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+            changes["status"] = WebhookDelivery.DEAD
+        else:
+            delay = backoff(delivery.attempts, settings.WEBHOOK_RETRY_BASE_SECONDS, settings.WEBHOOK_RETRY_MAX_SECONDS)
+            changes["next_attempt_at"] = now + timedelta(seconds=delay)
+        WebhookDelivery.objects.filter(pk=delivery.pk).update(**changes)
+
+    return len(delivered), failed
+
+
+def deliver_batch(batch_size=None, concurrency=None):
+    """
+    Claim, send and record one batch of due deliveries.
+
+    Returns:
+        tuple[int, int]: Numbers of deliveries delivered and failed; (0, 0)
+        when none was due.
+    """
+    deliveries = claim(batch_size or settings.WEBHOOK_BATCH_SIZE, concurrency)
+    if not deliveries:
+        return 0, 0
+    return record(deliveries, send(deliveries, concurrency))
+
+
+def retry_dead(subscription=None):
+    """
+    Queue dead-lettered deliveries again, with fresh attempts.
+
+    Parameters:
+        subscription (WebhookSubscription, optional): Only this
+                                                      subscription's.
+
+    Returns:
+        int: Number of deliveries queued again.
+    """
+    dead = WebhookDelivery.objects.filter(status=WebhookDelivery.DEAD)
+    if subscription is not None:
+        dead = dead.filter(subscription=subscription)
+    return dead.update(status=WebhookDelivery.PENDING, attempts=0, next_attempt_at=timezone.now())
@@ -0,0 +1,245 @@
+"""
+writebuffer.py
+
+This module implements an opt-in group-commit buffer for join request
+inserts. Instead of every request running its own INSERT and commit,
+submissions are queued in-process and a background flusher commits them in
+micro-batches (every `PROJECT_REQUEST_BUFFER_MAX_DELAY_MS` milliseconds or
+`PROJECT_REQUEST_BUFFER_MAX_ROWS` rows, whichever comes first) with a single
+multi-row insert. Each caller still blocks until its own row is committed
+and receives its own created/existing result.
+
+The buffer is enabled with `PROJECT_REQUEST_BUFFER_ENABLED`. It is bypassed
+inside an open transaction (e.g. an atomic batch), because a buffered row
+would be committed independently of that transaction.
+
+A caller that waits longer than `PROJECT_REQUEST_BUFFER_TIMEOUT` withdraws
+its item if no flush has picked it up yet and gets 503 Service Unavailable
+with `Retry-After`, so nothing it submitted is committed behind its back. An
+item already being flushed is waited for instead.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import OutboxEvent, ProjectLead, ProjectRequest
+from .outbox import event, record_many
+from .trending import REQUEST, record_on_commit
+from .versioning import bump_versions, project_key, user_key
+
+
+class BufferBusy(APIException):
+    """Raised when a buffered join request was not committed in time."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Join requests are queued up; please retry shortly."
+    default_code = "buffer_busy"
+    # Sent back as Retry-After by the exception handler
+    wait = 1
+
+
+class GroupCommitBuffer:
+    """
+    Queues items and hands them to a flush function in micro-batches.
+
+    Attributes:
+        flush (Callable[[list], list]): Commits a batch and returns one
+            result per item, in order. An Exception instance as a result is
+            raised in that item's caller only.
+        max_rows (int): Largest batch handed to `flush`.
+        max_delay (float): Seconds to wait for a batch to fill up.
+    """
+
+    def __init__(self, flush, max_rows, max_delay):
+        self.flush = flush
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, item, timeout=None):
+        """
+        Queue an item and wait until its batch has been committed.
+
+        Parameters:
+            item (Any): Payload passed to the flush function.
+            timeout (float, optional): Seconds to wait for the result.
+
+        Returns:
+            Any: The flush function's result for this item.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the item was not picked up by
+                a flush within `timeout`; it is withdrawn and never flushed.
+            Exception: Whatever the flush function raised for the batch.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future))
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            if future.cancel():
+                raise
+            # Already being flushed: its result is on the way
+            return future.result()
+
+    def _ensure_started(self):
+        """Start the flusher thread on first use (after any worker fork)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="group-commit-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self):
+        """
+        Block for the first item, then gather more until the batch is full
+        or the delay has passed.
+        """
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+
+        while len(batch) < self.max_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        """Flusher loop: commit batches and resolve their futures."""
+        while True:
+            # Skip items withdrawn by callers that gave up waiting
+            batch = [(item, future) for item, future in self._collect() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+
+            try:
+                close_old_connections()
+                results = self.flush(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+def flush_project_requests(items):
+    """
+    Commit a batch of join requests with one multi-row insert.
+
+    Parameters:
+        items (list[dict]): `project`, `member` and `message` of each request.
+
+    Returns:
+        list[tuple[ProjectRequest, bool] | Exception]: Row and created flag
+        per item, or the error that item alone ran into.
+    """
+    try:
+        return _flush_batch(items)
+    except DatabaseError:
+        # One bad row (e.g. a project deleted meanwhile) must not fail the
+        # others: retry the items one by one so each caller gets its own result
+        results = []
+        for item in items:
+            try:
+                with transaction.atomic():
+                    results.append(ProjectRequest.objects.insert_or_get(("project", "member"), **item))
+            except DatabaseError as e:
+                results.append(e)
+        return results
+
+
+def _flush_batch(items):
+    """Insert a whole batch in one transaction and bump affected versions."""
+    with transaction.atomic():
+        results = ProjectRequest.objects.insert_many_or_get(("project", "member"), items)
+
+        created = [item for item, (_, was_created) in zip(items, results) if was_created]
+        touched = {user_key(item["member"].email) for item in created}
+        projects = ProjectLead.objects.filter(
+            id__in={item["project"].pk for item in created}
+        ).values_list("owner__email", "projectname")
+        for owner_email, projectname in projects:
+            touched.add(user_key(owner_email))
+            touched.add(project_key(owner_email, projectname))
+        bump_versions(touched)
+        record_many([
+            event(
+                OutboxEvent.REQUEST_SUBMITTED, item["project"].pk, item["member"].pk, new_request.created_at,
+                owner=item["project"].owner_id, projectname=item["project"].projectname,
+                skills=item["project"].skills,
+            )
+            for item, (new_request, was_created) in zip(items, results) if was_created
+        ])
+        record_on_commit(REQUEST, [item["project"].pk for item in created])
+
+    return results
+
+
+_request_buffer = None
+_request_buffer_lock = threading.Lock()
+
+
+def get_request_buffer():
+    """Return the process-wide join request buffer, creating it on first use."""
+    global _request_buffer
+
+    with _request_buffer_lock:
+        if _request_buffer is None:
+            _request_buffer = GroupCommitBuffer(
+                flush_project_requests,
+                max_rows=getattr(settings, "PROJECT_REQUEST_BUFFER_MAX_ROWS", 200),
+                max_delay=getattr(settings, "PROJECT_REQUEST_BUFFER_MAX_DELAY_MS", 5) / 1000,
+            )
+        return _request_buffer
+
+
+def buffering_enabled():
+    """
+    Return whether join requests should go through the buffer right now.
+    """
+    return (
+        getattr(settings, "PROJECT_REQUEST_BUFFER_ENABLED", False)
+        and not connection.in_atomic_block
+    )
+
+
+def submit_project_request(project, member, message):
+    """
+    Insert a join request through the group-commit buffer.
+
+    Returns:
+        tuple[ProjectRequest, bool]: The row and whether it was created.
+
+    Raises:
+        BufferBusy: If the request was not committed in time; it was
+            withdrawn from the buffer.
+    """
+    try:
+        return get_request_buffer().submit(
+            {"project": project, "member": member, "message": message},
+            timeout=getattr(settings, "PROJECT_REQUEST_BUFFER_TIMEOUT", 10),
+        )
+    except FutureTimeoutError:
+        raise BufferBusy()